@@ -0,0 +1,99 @@
+"""Generators of synthetic source trees and configs for the benchmarks."""
+
+import os
+from xml.sax.saxutils import escape
+
+# name: (number of files, size of one file in bytes,
+#        files in one directory, depth of directories)
+DATASETS = {
+    "tiny": (1_000_000, 64, 1000, 1),
+    "medium": (10_000, 1024 * 1024, 1000, 1),
+    "huge": (3, 1024 * 1024 * 1024, 1, 1),
+    "deep": (10_000, 4096, 10, 32),
+    "flat": (100_000, 4096, 100_000, 1),
+}
+
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+
+def get_dataset_size(name: str, scale: float = 1.0) -> tuple:
+    """
+    Get the number of files and the size of one file of the dataset.
+
+    Args:
+        name (str): name of the dataset.
+        scale (float, optional): multiplier of the number of files
+            and of the size of huge files. Defaults to 1.0.
+
+    Returns:
+        tuple: number of files and size of one file in bytes.
+    """
+    count, size, _, _ = DATASETS[name]
+    if count < 10:
+        return count, max(1, int(size * scale))
+    return max(1, int(count * scale)), size
+
+
+def _write_file(file_path: str, size: int) -> None:
+    """Write the file of the given size with not compressible content."""
+    block = os.urandom(min(size, WRITE_BLOCK_SIZE))
+    with open(file_path, "wb") as file:
+        written = 0
+        while written < size:
+            written += file.write(block[:size - written])
+
+
+def _get_directory(root: str, index: int, depth: int) -> str:
+    """Get the path of the directory with the index at the given depth."""
+    parts = [f"d{index}"]
+    parts.extend(f"level{level}" for level in range(1, depth))
+    return os.path.join(root, *parts)
+
+
+def generate(name: str, root: str, scale: float = 1.0) -> tuple:
+    """
+    Generate the source tree and the config that copies it.
+
+    The tree is created in root/source, the copies are defined
+    in root/destination. Each source directory is copied
+    to its own destination directory.
+
+    Args:
+        name (str): name of the dataset.
+        root (str): directory of the generated dataset.
+        scale (float, optional): multiplier of the dataset size.
+            Defaults to 1.0.
+
+    Returns:
+        tuple: path to the config, number of files and total bytes.
+    """
+    count, size = get_dataset_size(name, scale)
+    _, _, files_in_directory, depth = DATASETS[name]
+    source_root = os.path.join(root, "source")
+    destination_root = os.path.join(root, "destination")
+    os.makedirs(destination_root, exist_ok=True)
+    config_file_path = os.path.join(root, f"{name}.xml")
+    with open(config_file_path, "w", encoding="utf-8") as config:
+        config.write('<?xml version="1.0"?>\n<files>\n')
+        for num in range(count):
+            directory_index = num // files_in_directory
+            source_path = _get_directory(source_root, directory_index, depth)
+            if num % files_in_directory == 0:
+                os.makedirs(source_path, exist_ok=True)
+            file_name = f"file{num}.bin"
+            _write_file(os.path.join(source_path, file_name), size)
+            destination_path = os.path.join(
+                destination_root,
+                f"d{directory_index}",
+            )
+            config.write(
+                "    <file>\n"
+                f"        <name>{escape(file_name)}</name>\n"
+                f"        <source_path>{escape(source_path)}</source_path>\n"
+                "        <destination_path>"
+                f"{escape(destination_path)}"
+                "</destination_path>\n"
+                "    </file>\n",
+            )
+        config.write("</files>\n")
+    return config_file_path, count, count * size
@@ -0,0 +1,259 @@
+"""
+Benchmarks of the files copier.
+
+Each dataset is generated in the temporary directory, then the copier
+is run end to end and by phases (parse, validate, copy). Each run is made
+in a fresh process, so its peak RSS isn't affected by other runs.
+
+Usage:
+    python -m benchmarks.run --dataset medium --scale 0.1
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --baseline baseline.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import datasets
+from files_copier.copier import FilesCopier
+
+PHASES = ("end_to_end", "parse", "validate", "copy")
+
+
+def _silence_output() -> None:
+    """Redirect stdout and stderr of the process to /dev/null."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.dup2(devnull, sys.stderr.fileno())
+
+
+def _run_phase(
+    phase: str,
+    config_file_path: str,
+    log_file_path: str,
+    workers: int,
+) -> float:
+    """Run the phase of copying and get its duration in seconds."""
+    copier = FilesCopier(config_file_path, log_file_path, workers=workers)
+    if phase == "end_to_end":
+        started_at = time.perf_counter()
+        try:
+            copier.copy_files()
+        except SystemExit:
+            pass
+        return time.perf_counter() - started_at
+    if phase == "parse":
+        started_at = time.perf_counter()
+        for _ in copier._iter_file_parameters():
+            pass
+        return time.perf_counter() - started_at
+    files = list(copier._iter_file_parameters())
+    if phase == "validate":
+        started_at = time.perf_counter()
+        for task in files:
+            copier._check_task(task)
+        return time.perf_counter() - started_at
+    files = [task for task in files if copier._check_task(task)]
+    started_at = time.perf_counter()
+    copier._copy_files_in_mode(files)
+    return time.perf_counter() - started_at
+
+
+def _measure(
+    phase: str,
+    config_file_path: str,
+    log_file_path: str,
+    workers: int,
+    results: multiprocessing.Queue,
+) -> None:
+    """Run the phase in the child process and put its measures."""
+    _silence_output()
+    seconds = _run_phase(phase, config_file_path, log_file_path, workers)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((seconds, peak_rss_kb))
+
+
+def measure_phase(
+    phase: str,
+    config_file_path: str,
+    log_file_path: str,
+    workers: int,
+) -> tuple:
+    """
+    Run the phase in a fresh process.
+
+    Returns:
+        tuple: duration in seconds and peak RSS in kilobytes.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=_measure,
+        args=(phase, config_file_path, log_file_path, workers, results),
+    )
+    process.start()
+    measures = results.get()
+    process.join()
+    return measures
+
+
+def run_dataset(name: str, scale: float, workers: int) -> dict:
+    """
+    Generate the dataset and measure all phases of copying it.
+
+    Returns:
+        dict: measures of each phase: seconds, files/s, MB/s
+            and peak RSS in MB.
+    """
+    root = tempfile.mkdtemp(prefix=f"files_copier_{name}_")
+    try:
+        config_file_path, count, total_bytes = datasets.generate(
+            name,
+            root,
+            scale,
+        )
+        log_file_path = os.path.join(root, "benchmark.log")
+        report = {}
+        for phase in PHASES:
+            destination_root = os.path.join(root, "destination")
+            shutil.rmtree(destination_root, ignore_errors=True)
+            os.makedirs(destination_root)
+            seconds, peak_rss_kb = measure_phase(
+                phase,
+                config_file_path,
+                log_file_path,
+                workers,
+            )
+            seconds = max(seconds, 1e-9)
+            report[phase] = {
+                "seconds": round(seconds, 4),
+                "files_per_second": round(count / seconds, 1),
+                "mb_per_second": round(total_bytes / seconds / 2 ** 20, 1),
+                "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+            }
+        return report
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare_with_baseline(
+    reports: dict,
+    baseline: dict,
+    tolerance: float,
+) -> list:
+    """
+    Find the measures that are worse than in the baseline.
+
+    The throughput is worse if it is less than the baseline one
+    by more than tolerance, peak RSS is worse if it is more.
+
+    Returns:
+        list: descriptions of the regressions.
+    """
+    regressions = []
+    for name, report in reports.items():
+        for phase, measures in report.items():
+            expected = baseline.get(name, {}).get(phase)
+            if expected is None:
+                continue
+            for key in ("files_per_second", "mb_per_second"):
+                if measures[key] < expected[key] * (1 - tolerance):
+                    regressions.append(
+                        f"{name}/{phase}: {key} {measures[key]} "
+                        f"< baseline {expected[key]}",
+                    )
+            if measures["peak_rss_mb"] > expected["peak_rss_mb"] * (
+                1 + tolerance
+            ):
+                regressions.append(
+                    f"{name}/{phase}: peak_rss_mb {measures['peak_rss_mb']} "
+                    f"> baseline {expected['peak_rss_mb']}",
+                )
+    return regressions
+
+
+def print_report(reports: dict) -> None:
+    """Print the measures as the table."""
+    header = (
+        f"{'dataset':<8} {'phase':<10} {'seconds':>10} "
+        f"{'files/s':>12} {'MB/s':>10} {'RSS MB':>8}"
+    )
+    print(header)
+    for name, report in reports.items():
+        for phase, measures in report.items():
+            print(
+                f"{name:<8} {phase:<10} {measures['seconds']:>10} "
+                f"{measures['files_per_second']:>12} "
+                f"{measures['mb_per_second']:>10} "
+                f"{measures['peak_rss_mb']:>8}",
+            )
+
+
+def get_arguments() -> argparse.Namespace:
+    """Parse arguments of the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--dataset",
+        action="append",
+        choices=sorted(datasets.DATASETS),
+        help="dataset to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="multiplier of the datasets size (default: 1.0)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="number of workers of the copier (default: 8)",
+    )
+    parser.add_argument("--save", help="save the results as the baseline")
+    parser.add_argument("--baseline", help="compare with the baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative regression (default: 0.1)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Run the benchmarks and get the exit code."""
+    arguments = get_arguments()
+    names = arguments.dataset or sorted(datasets.DATASETS)
+    reports = {
+        name: run_dataset(name, arguments.scale, arguments.workers)
+        for name in names
+    }
+    print_report(reports)
+    if arguments.save:
+        with open(arguments.save, "w") as baseline_file:
+            json.dump(reports, baseline_file, indent=4)
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_with_baseline(
+            reports,
+            baseline,
+            arguments.tolerance,
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,154 @@
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from logging import handlers
+from typing import Dict
+
+# Level between INFO and WARNING for the summary of the copying. The logger
+# with this level writes only the summary and errors, not every file.
+SUMMARY = 25
+logging.addLevelName(SUMMARY, "SUMMARY")
+
+BATCH_CAPACITY = 1000
+BATCH_INTERVAL = 1.0
+
+_listeners: Dict[str, handlers.QueueListener] = {}
+_queue_handlers: Dict[str, handlers.QueueHandler] = {}
+_lock = threading.Lock()
+
+
+class BatchFileHandler(logging.FileHandler):
+    """
+    Write log messages to the file by batches.
+
+    Messages are buffered and written with one write and one flush
+    when the buffer is full, when the error is logged or when
+    BATCH_INTERVAL seconds have passed since the last flush.
+    """
+
+    def __init__(
+        self,
+        log_file_path: str,
+        capacity: int = BATCH_CAPACITY,
+        interval: float = BATCH_INTERVAL,
+    ) -> None:
+        """
+        Open the log file.
+
+        Args:
+            log_file_path (str): the path to the file for log messages write.
+            capacity (int, optional): maximum number of buffered messages.
+                Defaults to BATCH_CAPACITY.
+            interval (float, optional): maximum number of seconds
+                the message is buffered. Defaults to BATCH_INTERVAL.
+        """
+        super().__init__(log_file_path)
+        self.capacity = capacity
+        self.interval = interval
+        self._buffer = []
+        self._flushed_at = time.monotonic()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Buffer the message and write the buffer if it is time."""
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if (
+            len(self._buffer) >= self.capacity
+            or record.levelno >= logging.ERROR
+            or time.monotonic() - self._flushed_at >= self.interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered messages to the file."""
+        self.acquire()
+        try:
+            if self._buffer and self.stream is not None:
+                self.stream.write(self.terminator.join(self._buffer))
+                self.stream.write(self.terminator)
+                self._buffer.clear()
+                self.stream.flush()
+            self._flushed_at = time.monotonic()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Write the buffered messages and close the file."""
+        self.flush()
+        super().close()
+
+
+class BatchQueueListener(handlers.QueueListener):
+    """
+    Background writer that flushes the handlers when it is idle.
+
+    The batch of the file handler is written when the next message
+    arrives, so if no message arrives for BATCH_INTERVAL seconds,
+    the listener flushes the handlers itself.
+    """
+
+    def __init__(
+        self,
+        messages: queue.SimpleQueue,
+        *handlers_: logging.Handler,
+        interval: float = BATCH_INTERVAL,
+    ) -> None:
+        """
+        Initialize the writer of the queue to the handlers.
+
+        Args:
+            messages (queue.SimpleQueue): queue of the log records.
+            handlers_ (logging.Handler): handlers of the records.
+            interval (float, optional): number of seconds without messages
+                after which the handlers are flushed.
+                Defaults to BATCH_INTERVAL.
+        """
+        super().__init__(messages, *handlers_, respect_handler_level=True)
+        self.interval = interval
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        """Wait for the next record and flush the handlers while idle."""
+        if not block:
+            return self.queue.get(block)
+        while True:
+            try:
+                return self.queue.get(timeout=self.interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class LevelLoggerAdapter(logging.LoggerAdapter):
+    """
+    Logger of the log file with its own minimum level.
+
+    The loggers of one log file share the logger and its handlers,
+    so the level is kept by the adapter, and changing it doesn't change
+    the level of the other copiers writing to the same file.
+    """
+
+    def __init__(self, logger: logging.Logger, level: int) -> None:
+        """Initialize the adapter of the shared logger."""
+        super().__init__(logger, {})
+        self.level = level
+
+    def setLevel(self, level: int) -> None:
+        """Set the minimum level of the messages of this adapter."""
+        self.level = level
+
+    def getEffectiveLevel(self) -> int:
+        """Get the minimum level of the messages of this adapter."""
+        return self.level
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Check that the messages of the level are written."""
+        return level >= self.level and self.logger.isEnabledFor(level)
 
 
 def _get_file_handler(log_file_path: str) -> logging.FileHandler:
@@ -11,7 +161,7 @@ def _get_file_handler(log_file_path: str) -> logging.FileHandler:
     Returns:
         logging.FileHandler: file handler of the logger
     """
-    file_handler = logging.FileHandler(log_file_path)
+    file_handler = BatchFileHandler(log_file_path)
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(
         logging.Formatter("%(asctime)s - %(levelname)s: %(message)s"),
@@ -34,19 +184,110 @@ def _get_stream_handler() -> logging.StreamHandler:
     return stream_handler
 
 
-def get_logger(name: str, log_file_path: str) -> logging.Logger:
+def _get_queue_handler(log_file_path: str) -> handlers.QueueHandler:
+    """
+    Get the handler that passes messages to the background writer.
+
+    The writer and its file and console handlers are created once
+    for each log file and are shared by all loggers writing to it.
+
+    Args:
+        log_file_path (str): the path to the file for log messages write.
+
+    Returns:
+        logging.handlers.QueueHandler: handler of the logger.
+    """
+    log_file_path = os.path.abspath(log_file_path)
+    with _lock:
+        queue_handler = _queue_handlers.get(log_file_path)
+        if queue_handler is None:
+            messages = queue.SimpleQueue()
+            queue_handler = handlers.QueueHandler(messages)
+            listener = BatchQueueListener(
+                messages,
+                _get_file_handler(log_file_path),
+                _get_stream_handler(),
+            )
+            listener.start()
+            _queue_handlers[log_file_path] = queue_handler
+            _listeners[log_file_path] = listener
+        return queue_handler
+
+
+def get_logger(
+    name: str,
+    log_file_path: str,
+    level: int = logging.INFO,
+) -> logging.Logger:
     """
     Define all parameters of logging.
 
+    Messages are written to the file and to the console by the background
+    thread, so logging doesn't block the caller. The handlers are added
+    to the logger only once, no matter how many times it is requested.
+
     Args:
         name (str): name of the logger.
         log_file_path (str): the path to the file for log messages write.
+        level (int, optional): minimum level of messages. SUMMARY writes
+            only the summary and errors. Defaults to logging.INFO.
 
     Returns:
         logging.Logger: logger with specified parameters.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    logger.addHandler(_get_file_handler(log_file_path))
-    logger.addHandler(_get_stream_handler())
+    logger.setLevel(level)
+    queue_handler = _get_queue_handler(log_file_path)
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
     return logger
+
+
+def get_file_logger(
+    log_file_path: str,
+    level: int = logging.INFO,
+) -> LevelLoggerAdapter:
+    """
+    Get the logger of the log file with its own minimum level.
+
+    All loggers of one log file share the logger named after the file,
+    the level is set only for the returned adapter.
+
+    Args:
+        log_file_path (str): the path to the file for log messages write.
+        level (int, optional): minimum level of messages. SUMMARY writes
+            only the summary and errors. Defaults to logging.INFO.
+
+    Returns:
+        LevelLoggerAdapter: logger of the log file.
+    """
+    logger = get_logger(
+        f"files_copier.{os.path.abspath(log_file_path)}",
+        log_file_path,
+        logging.DEBUG,
+    )
+    return LevelLoggerAdapter(logger, level)
+
+
+def flush() -> None:
+    """Wait until all logged messages are written to the files."""
+    with _lock:
+        for listener in _listeners.values():
+            listener.stop()
+            for handler in listener.handlers:
+                handler.flush()
+            listener.start()
+
+
+def _shutdown() -> None:
+    """Write all logged messages and close the log files."""
+    with _lock:
+        for listener in _listeners.values():
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        _listeners.clear()
+        _queue_handlers.clear()
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,201 @@
+import asyncio
+import functools
+from concurrent import futures
+from typing import AsyncIterator, Optional, Set
+
+from files_copier import app_logger, throttle, transfer
+from files_copier.copier import FilesCopier
+from files_copier.task import CopyTask
+
+
+class AsyncFilesCopier(FilesCopier):
+    """
+    Copy files defined in xml config inside the asyncio event loop.
+
+    The configuration is parsed and files are copied in the thread pools,
+    so the event loop isn't blocked. The number of files copied
+    at the same time is limited by the number of workers.
+    Unlike copy_files, nothing is raised when there is nothing to copy.
+    In the "batch" durability mode the results are yielded before
+    the copies are renamed to their destinations at commit points.
+    The copies are reported and committed in the thread of the parser,
+    so the fsync of the batch doesn't block the event loop and
+    the journal is used by one thread. Deduplication and copying
+    by devices need all files of the config before copying,
+    so they aren't supported.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the copier with the parameters of FilesCopier.
+
+        Raises:
+            ValueError: if deduplication, hardlinks or copying by devices
+                are set.
+        """
+        super().__init__(*args, **kwargs)
+        if self.deduplicate or self.transfer_options.allow_hardlinks:
+            raise ValueError(
+                "Deduplication isn't supported by the asynchronous copying",
+            )
+        if self.workers_per_device is not None:
+            raise ValueError(
+                "Workers per device aren't supported "
+                "by the asynchronous copying",
+            )
+
+    async def copy_files_async(self) -> AsyncIterator[transfer.TransferResult]:
+        """
+        Copy files and yield the result of each file as soon as it is copied.
+
+        If the iteration is stopped or cancelled, the files that aren't
+        started to copy yet are cancelled.
+
+        Yields:
+            TransferResult: result of copying one file.
+        """
+        self._start_copying()
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.workers)
+        parser = futures.ThreadPoolExecutor(max_workers=1)
+        executor = futures.ThreadPoolExecutor(
+            max_workers=self.workers,
+            initializer=(
+                throttle.set_idle_priority if self.idle_priority else None
+            ),
+        )
+        copying: Set[asyncio.Task] = set()
+
+        async def copy(copied_file: CopyTask) -> None:
+            path_to_file = copied_file.source_file
+            destination_path = copied_file.destination_path
+            try:
+                while True:
+                    try:
+                        result = await copy_once(copied_file)
+                    except OSError as error:
+                        delay = await loop.run_in_executor(
+                            parser,
+                            functools.partial(
+                                self._fail_copy,
+                                copied_file,
+                                error,
+                                is_queued=False,
+                            ),
+                        )
+                        if delay is None:
+                            result = transfer.TransferResult(
+                                transfer.FAILED,
+                                path_to_file,
+                                copied_file.destination_file,
+                                error=error,
+                            )
+                            break
+                        # the worker copies other files during the delay
+                        semaphore.release()
+                        try:
+                            await asyncio.sleep(delay)
+                        finally:
+                            await semaphore.acquire()
+                    else:
+                        await loop.run_in_executor(
+                            parser,
+                            self._complete_copy,
+                            path_to_file,
+                            destination_path,
+                            result,
+                        )
+                        break
+            finally:
+                semaphore.release()
+            await results.put(result)
+
+        async def copy_once(
+            copied_file: CopyTask,
+        ) -> transfer.TransferResult:
+            path_to_file = copied_file.source_file
+            await loop.run_in_executor(
+                executor,
+                self.throttle.acquire_file,
+                path_to_file,
+            )
+            return await loop.run_in_executor(
+                executor,
+                transfer.copy_file,
+                path_to_file,
+                copied_file.destination_path,
+                self.transfer_options,
+                self._get_chunks_progress(
+                    path_to_file,
+                    copied_file.destination_path,
+                ),
+                None,
+                self.retry_queue.is_resumed(copied_file),
+                self.throttle.get_byte_limit(),
+                copied_file.destination_file,
+            )
+
+        def finish(is_completed: bool) -> None:
+            try:
+                self._commit_writes()
+                if is_completed:
+                    self._finish_journal()
+            finally:
+                self._close_journal()
+                self._close_manifest()
+
+        async def produce() -> None:
+            try:
+                await loop.run_in_executor(parser, self._open_manifest)
+                copied_files = await loop.run_in_executor(
+                    parser,
+                    self._open_journal,
+                    self.iter_copied_files_from_conf(),
+                )
+                while True:
+                    copied_file = await loop.run_in_executor(
+                        parser,
+                        next,
+                        copied_files,
+                        None,
+                    )
+                    if copied_file is None:
+                        break
+                    await semaphore.acquire()
+                    task = loop.create_task(copy(copied_file))
+                    copying.add(task)
+                    task.add_done_callback(copying.discard)
+                if copying:
+                    await asyncio.wait(set(copying))
+            finally:
+                await results.put(None)
+
+        producer = loop.create_task(produce())
+        is_completed = False
+        try:
+            while True:
+                result: Optional[transfer.TransferResult] = await results.get()
+                if result is None:
+                    break
+                yield result
+            await producer
+            is_completed = True
+        finally:
+            producer.cancel()
+            for task in copying:
+                task.cancel()
+            try:
+                await loop.run_in_executor(parser, finish, is_completed)
+            finally:
+                parser.shutdown(wait=False)
+                executor.shutdown(wait=False)
+
+        if sum(self.statistics.values()):
+            self._finish_copying()
+        else:
+            self._log_empty_config()
+            self.logger.log(
+                app_logger.SUMMARY,
+                "Copying is completed. Nothing is copied.",
+            )
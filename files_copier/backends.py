@@ -0,0 +1,429 @@
+import errno
+import os
+import shutil
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+REFLINK = "reflink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+BUFFERED = "buffered"
+HARDLINK = "hardlink"
+SPARSE = "sparse"
+
+DEFAULT_BACKENDS = (REFLINK, COPY_FILE_RANGE, SENDFILE, BUFFERED)
+
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+BLOCK_UNIT = 512  # unit of st_blocks
+CHUNK_SIZE = 8 * 1024 * 1024
+BUFFER_SIZE = 1024 * 1024
+TRUNCATED_FILE_ERROR = "File is truncated during copying"
+
+# Called with the number of bytes after each copied block,
+# waits while the copying is faster than the limit.
+ByteLimit = Callable[[int], None]
+
+# Errors meaning that the backend can't be used for these files,
+# and the next backend of the chain should be tried.
+FALLBACK_ERRORS = frozenset(
+    (
+        errno.EXDEV,
+        errno.EINVAL,
+        errno.ENOSYS,
+        errno.ENOTSUP,
+        errno.EOPNOTSUPP,
+        errno.ENOTTY,
+        errno.EBADF,
+        errno.ETXTBSY,
+    ),
+)
+
+
+def _copy_by_reflink(
+    source_fd: int,
+    destination_fd: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """
+    Clone the file content, the data blocks are shared by both files.
+
+    The data isn't copied, so it isn't limited.
+    """
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "Reflink isn't supported")
+    fcntl.ioctl(destination_fd, FICLONE, source_fd)
+
+
+def _copy_by_copy_file_range(
+    source_fd: int,
+    destination_fd: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """Copy the file content inside the kernel with copy_file_range."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range isn't supported")
+    while True:
+        copied = os.copy_file_range(source_fd, destination_fd, CHUNK_SIZE)
+        if not copied:
+            break
+        if limit is not None:
+            limit(copied)
+
+
+def _copy_by_sendfile(
+    source_fd: int,
+    destination_fd: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """Copy the file content inside the kernel with sendfile."""
+    if not hasattr(os, "sendfile"):
+        raise OSError(errno.ENOSYS, "sendfile isn't supported")
+    offset = 0
+    while True:
+        sent = os.sendfile(destination_fd, source_fd, offset, CHUNK_SIZE)
+        if not sent:
+            break
+        offset += sent
+        if limit is not None:
+            limit(sent)
+
+
+def _copy_by_buffer(
+    source_fd: int,
+    destination_fd: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """Copy the file content through the buffer in the user space."""
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(source_fd, "rb", buffering=0, closefd=False) as source:
+        while True:
+            read = source.readinto(buffer)
+            if not read:
+                break
+            written = 0
+            while written < read:
+                written += os.write(destination_fd, view[written:read])
+            if limit is not None:
+                limit(read)
+
+
+def _iter_data_extents(source_fd: int) -> Iterator[Tuple[int, int]]:
+    """Get ranges (offset, length) of the file that have data."""
+    offset = 0
+    while True:
+        try:
+            data_offset = os.lseek(source_fd, offset, os.SEEK_DATA)
+        except OSError as error:
+            if error.errno == errno.ENXIO:  # no data after the offset
+                return
+            raise
+        offset = os.lseek(source_fd, data_offset, os.SEEK_HOLE)
+        yield data_offset, offset - data_offset
+
+
+def _copy_range_by_buffer(
+    source_fd: int,
+    destination_fd: int,
+    source_offset: int,
+    destination_offset: int,
+    length: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """Copy the range of bytes by positional reads and writes."""
+    while length:
+        block = os.pread(source_fd, min(BUFFER_SIZE, length), source_offset)
+        if not block:
+            raise OSError(errno.EIO, TRUNCATED_FILE_ERROR)
+        view = memoryview(block)
+        while view:
+            written = os.pwrite(destination_fd, view, destination_offset)
+            view = view[written:]
+            source_offset += written
+            destination_offset += written
+            length -= written
+        if limit is not None:
+            limit(len(block))
+
+
+def copy_range(
+    source_fd: int,
+    destination_fd: int,
+    offset: int,
+    length: int,
+    destination_offset: Optional[int] = None,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """
+    Copy the range of bytes between the files.
+
+    The range is copied in the kernel by copy_file_range if it is possible,
+    so it may be copied on the server of the network file system,
+    otherwise by positional reads and writes.
+
+    Args:
+        source_fd (int): descriptor of the copied file.
+        destination_fd (int): descriptor of the copy.
+        offset (int): offset of the range in the copied file.
+        length (int): number of bytes of the range.
+        destination_offset (int, optional): offset of the range
+            in the copy. Defaults to None (the same offset).
+        limit (Callable, optional): called after each copied block.
+            Defaults to None (the copying isn't limited).
+
+    Raises:
+        OSError: if the range can't be copied or the copied file
+            is shorter than the range.
+    """
+    if destination_offset is None:
+        destination_offset = offset
+    if hasattr(os, "copy_file_range"):
+        try:
+            while length:
+                copied = os.copy_file_range(
+                    source_fd,
+                    destination_fd,
+                    min(CHUNK_SIZE, length),
+                    offset,
+                    destination_offset,
+                )
+                if not copied:
+                    raise OSError(errno.EIO, TRUNCATED_FILE_ERROR)
+                offset += copied
+                destination_offset += copied
+                length -= copied
+                if limit is not None:
+                    limit(copied)
+            return
+        except OSError as error:
+            if error.errno not in FALLBACK_ERRORS:
+                raise
+    _copy_range_by_buffer(
+        source_fd,
+        destination_fd,
+        offset,
+        destination_offset,
+        length,
+        limit,
+    )
+
+
+def _copy_by_extents(
+    source_fd: int,
+    destination_fd: int,
+    limit: Optional[ByteLimit] = None,
+) -> None:
+    """
+    Copy only the ranges of the sparse file that have data.
+
+    The ranges are found by SEEK_DATA and SEEK_HOLE, the holes
+    between them are left unallocated in the copy.
+    """
+    if not hasattr(os, "SEEK_DATA"):
+        raise OSError(errno.ENOSYS, "SEEK_DATA isn't supported")
+    for offset, length in _iter_data_extents(source_fd):
+        copy_range(source_fd, destination_fd, offset, length, limit=limit)
+    os.ftruncate(destination_fd, os.fstat(source_fd).st_size)
+
+
+COPY_FUNCTIONS: Dict[str, Callable[[int, int, Optional[ByteLimit]], None]] = {
+    REFLINK: _copy_by_reflink,
+    SPARSE: _copy_by_extents,
+    COPY_FILE_RANGE: _copy_by_copy_file_range,
+    SENDFILE: _copy_by_sendfile,
+    BUFFERED: _copy_by_buffer,
+}
+
+
+def get_physical_size(file_stat: os.stat_result) -> int:
+    """Get the number of bytes allocated on the disk for the file."""
+    if not hasattr(file_stat, "st_blocks"):
+        return file_stat.st_size
+    return file_stat.st_blocks * BLOCK_UNIT
+
+
+def is_sparse_file(file_path: str) -> bool:
+    """Check that the file has less allocated bytes than its size."""
+    file_stat = os.stat(file_path)
+    return get_physical_size(file_stat) < file_stat.st_size
+
+
+def get_sparse_backends(backends: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Get the backends for the sparse file.
+
+    The sparse backend is tried after reflink, which also keeps holes,
+    and before the backends that write the holes as zeros.
+    """
+    backends = tuple(backend for backend in backends if backend != SPARSE)
+    if REFLINK in backends:
+        position = backends.index(REFLINK) + 1
+    else:
+        position = 0
+    return backends[:position] + (SPARSE,) + backends[position:]
+
+
+def copy_data(
+    source_file: str,
+    destination_file: str,
+    backends: Sequence[str] = DEFAULT_BACKENDS,
+    limit: Optional[ByteLimit] = None,
+) -> str:
+    """
+    Copy the file content with the first backend that works.
+
+    Backends are tried in the given order. If the backend isn't supported
+    by the system or the file system, the destination file is truncated
+    and the next backend is tried.
+
+    Args:
+        source_file (str): path to the copied file.
+        destination_file (str): path to the copy of the file.
+        backends (Sequence[str], optional): names of the backends.
+            Defaults to DEFAULT_BACKENDS.
+        limit (Callable, optional): called after each copied block.
+            Defaults to None (the copying isn't limited).
+
+    Raises:
+        OSError: if the file can't be copied by any of the backends.
+
+    Returns:
+        str: name of the backend that copied the file.
+    """
+    if os.path.exists(destination_file) and os.path.samefile(
+        source_file,
+        destination_file,
+    ):
+        raise shutil.SameFileError(
+            f"{source_file} and {destination_file} are the same file",
+        )
+    source_fd = os.open(source_file, os.O_RDONLY)
+    try:
+        destination_fd = os.open(
+            destination_file,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o666,
+        )
+        try:
+            return _copy_with_fallback(
+                source_fd,
+                destination_fd,
+                backends,
+                limit,
+            )
+        finally:
+            os.close(destination_fd)
+    finally:
+        os.close(source_fd)
+
+
+def _copy_with_fallback(
+    source_fd: int,
+    destination_fd: int,
+    backends: Sequence[str],
+    limit: Optional[ByteLimit] = None,
+) -> str:
+    """Try the backends one by one until the content is copied."""
+    last_error = OSError(errno.EINVAL, "No backends for copying")
+    for backend in backends:
+        try:
+            COPY_FUNCTIONS[backend](source_fd, destination_fd, limit)
+        except OSError as error:
+            if error.errno not in FALLBACK_ERRORS:
+                raise
+            last_error = error
+            os.lseek(source_fd, 0, os.SEEK_SET)
+            os.lseek(destination_fd, 0, os.SEEK_SET)
+            os.ftruncate(destination_fd, 0)
+        else:
+            return backend
+    raise last_error
+
+
+def clone(source_fd: int, destination_fd: int) -> bool:
+    """
+    Clone the file content by reflink if the file system supports it.
+
+    Raises:
+        OSError: if reflink is supported, but the file can't be cloned.
+
+    Returns:
+        bool: False if reflink isn't supported for these files.
+    """
+    try:
+        _copy_by_reflink(source_fd, destination_fd)
+    except OSError as error:
+        if error.errno not in FALLBACK_ERRORS:
+            raise
+        return False
+    return True
+
+
+def copy(
+    source_file: str,
+    destination_file: str,
+    backends: Sequence[str] = DEFAULT_BACKENDS,
+    limit: Optional[ByteLimit] = None,
+) -> str:
+    """
+    Copy the file content and metadata like shutil.copy2 does.
+
+    Returns:
+        str: name of the backend that copied the content.
+    """
+    backend = copy_data(source_file, destination_file, backends, limit)
+    shutil.copystat(source_file, destination_file)
+    return backend
+
+
+def link_file(
+    linked_file: str,
+    destination_file: str,
+    allow_hardlink: bool = False,
+) -> Optional[str]:
+    """
+    Make the destination file share the data with the already copied file.
+
+    The file is cloned by reflink. If reflink isn't supported and
+    hardlinks are allowed, the destination file becomes the hardlink.
+    Both are possible only if the files are on the same file system.
+
+    Args:
+        linked_file (str): path to the already copied file.
+        destination_file (str): path to the new copy.
+        allow_hardlink (bool, optional): make the hardlink if reflink
+            isn't supported. Defaults to False.
+
+    Raises:
+        OSError: if the linked file can't be read or the destination
+            file can't be written.
+
+    Returns:
+        str, optional: name of the way of linking, None if the files
+            can't be linked and the file should be copied.
+    """
+    if os.path.abspath(linked_file) == os.path.abspath(destination_file):
+        return None
+    linked_device = os.stat(linked_file).st_dev
+    destination_path = os.path.dirname(os.path.abspath(destination_file))
+    if linked_device != os.stat(destination_path).st_dev:
+        return None
+    try:
+        return copy(linked_file, destination_file, (REFLINK,))
+    except OSError as error:
+        if error.errno not in FALLBACK_ERRORS:
+            raise
+    if not allow_hardlink:
+        return None
+    temporary_file = f"{destination_file}.{os.getpid()}.link"
+    os.link(linked_file, temporary_file)
+    try:
+        os.replace(temporary_file, destination_file)
+    except OSError:
+        os.remove(temporary_file)
+        raise
+    return HARDLINK
@@ -0,0 +1,166 @@
+import errno
+import hashlib
+import os
+import shutil
+import threading
+import zlib
+from typing import Callable, Dict, Optional
+
+SHA256 = "sha256"
+BLAKE2B = "blake2b"
+CRC32 = "crc32"
+
+BUFFER_SIZE = 1024 * 1024
+
+
+class Crc32Hash(object):
+    """Fast non-cryptographic hash with the interface of hashlib hashes."""
+
+    def __init__(self) -> None:
+        """Initialize the hash of the empty data."""
+        self._value = 0
+
+    def update(self, data: bytes) -> None:
+        """Add the data to the hash."""
+        self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self) -> str:
+        """Get the hash as the hexadecimal string."""
+        return f"{self._value:08x}"
+
+
+HASHES: Dict[str, Callable] = {
+    SHA256: hashlib.sha256,
+    BLAKE2B: hashlib.blake2b,
+    CRC32: Crc32Hash,
+}
+
+
+def check_algorithm(algorithm: str) -> None:
+    """
+    Check that the hash algorithm is supported.
+
+    Raises:
+        ValueError: if the algorithm is unknown.
+    """
+    if algorithm not in HASHES:
+        raise ValueError(f"Unknown checksum algorithm - {algorithm}")
+
+
+def get_file_checksum(file_path: str, algorithm: str) -> str:
+    """Get the hash of the file content as the hexadecimal string."""
+    file_hash = HASHES[algorithm]()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as hashed_file:
+        for read in iter(lambda: hashed_file.readinto(buffer), 0):
+            file_hash.update(view[:read])
+    return file_hash.hexdigest()
+
+
+def _drop_written_pages(file_descriptor: int) -> None:
+    """
+    Write the copy to the disk and drop its pages from the page cache.
+
+    So the verification reads the copy from the disk instead of
+    the cached pages of the written data.
+    """
+    os.fsync(file_descriptor)
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+def copy(
+    source_file: str,
+    destination_file: str,
+    algorithm: str,
+    verify: bool = False,
+    limit: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Copy the file and hash its content in the same pass.
+
+    The content is read once, each block is added to the hash and
+    written to the copy. Metadata is copied like shutil.copy2 does.
+
+    Args:
+        source_file (str): path to the copied file.
+        destination_file (str): path to the copy of the file.
+        algorithm (str): name of the hash algorithm.
+        verify (bool, optional): write the copy to the disk, drop it
+            from the page cache, read it again and compare its hash
+            with the hash of the copied data. Defaults to False.
+        limit (Callable, optional): called with the number of bytes
+            after each copied block. Defaults to None.
+
+    Raises:
+        OSError: if the file can't be copied or the hash of the copy
+            doesn't match.
+
+    Returns:
+        str: hash of the file content as the hexadecimal string.
+    """
+    if os.path.exists(destination_file) and os.path.samefile(
+        source_file,
+        destination_file,
+    ):
+        raise shutil.SameFileError(
+            f"{source_file} and {destination_file} are the same file",
+        )
+    file_hash = HASHES[algorithm]()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(source_file, "rb", buffering=0) as source, open(
+        destination_file,
+        "wb",
+        buffering=0,
+    ) as destination:
+        for read in iter(lambda: source.readinto(buffer), 0):
+            file_hash.update(view[:read])
+            written = 0
+            while written < read:
+                written += destination.write(view[written:read])
+            if limit is not None:
+                limit(read)
+        if verify:
+            _drop_written_pages(destination.fileno())
+    shutil.copystat(source_file, destination_file)
+    checksum = file_hash.hexdigest()
+    if verify and get_file_checksum(destination_file, algorithm) != checksum:
+        raise OSError(
+            errno.EIO,
+            f"Checksum of the copy doesn't match - {destination_file}",
+        )
+    return checksum
+
+
+class ChecksumManifest(object):
+    """
+    File with checksums of the copied files.
+
+    Each line has the format of sha256sum and similar utilities:
+    the hash, two spaces and the path to the copy.
+    """
+
+    def __init__(self, manifest_file_path: str) -> None:
+        """
+        Open the manifest for appending.
+
+        Args:
+            manifest_file_path (str): path to the manifest file.
+        """
+        self._manifest = open(manifest_file_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, checksum: str, destination_file: str) -> None:
+        """Write the checksum of the copy to the manifest."""
+        with self._lock:
+            self._manifest.write(f"{checksum}  {destination_file}\n")
+
+    def close(self) -> None:
+        """Close the manifest."""
+        self._manifest.close()
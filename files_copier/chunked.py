@@ -0,0 +1,139 @@
+import errno
+import os
+import shutil
+from concurrent import futures
+from typing import Callable, Iterator, Optional, Tuple
+
+from files_copier import backends
+
+CHUNKED = "chunked"
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_CHUNK_WORKERS = 4
+
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def _iter_chunks(file_size: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split the file into ranges of bytes (offset, length)."""
+    for offset in range(0, file_size, chunk_size):
+        yield offset, min(chunk_size, file_size - offset)
+
+
+def _preallocate(destination_fd: int, file_size: int) -> None:
+    """Allocate the space for the whole copy before the chunks are written."""
+    os.ftruncate(destination_fd, file_size)
+    if not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(destination_fd, 0, file_size)
+    except OSError as error:
+        if error.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+            raise
+
+
+def copy(
+    source_file: str,
+    destination_file: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_CHUNK_WORKERS,
+    progress: Optional[ProgressCallback] = None,
+    limit: Optional[backends.ByteLimit] = None,
+    reflink: bool = False,
+) -> str:
+    """
+    Copy the large file by chunks in parallel.
+
+    The copy is preallocated, then the chunks are copied concurrently
+    to the same offsets, then metadata is copied like shutil.copy2 does.
+    If reflink is allowed and supported, the file is cloned instead.
+
+    Args:
+        source_file (str): path to the copied file.
+        destination_file (str): path to the copy of the file.
+        chunk_size (int, optional): size of one chunk in bytes.
+            Defaults to DEFAULT_CHUNK_SIZE.
+        workers (int, optional): number of chunks copied at the same time.
+            Defaults to DEFAULT_CHUNK_WORKERS.
+        progress (Callable, optional): called after each chunk is copied
+            with the number of copied chunks, the total number of chunks
+            and the number of copied bytes. Defaults to None.
+        limit (Callable, optional): called after each copied block
+            of each chunk. Defaults to None (the copying isn't limited).
+        reflink (bool, optional): try to clone the file by reflink
+            before splitting it into chunks. Defaults to False.
+
+    Raises:
+        OSError: if the file can't be copied.
+
+    Returns:
+        str: name of the way of copying.
+    """
+    if os.path.exists(destination_file) and os.path.samefile(
+        source_file,
+        destination_file,
+    ):
+        raise shutil.SameFileError(
+            f"{source_file} and {destination_file} are the same file",
+        )
+    source_fd = os.open(source_file, os.O_RDONLY)
+    try:
+        file_size = os.fstat(source_fd).st_size
+        destination_fd = os.open(
+            destination_file,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o666,
+        )
+        try:
+            if reflink and backends.clone(source_fd, destination_fd):
+                backend = backends.REFLINK
+            else:
+                _copy_chunks(
+                    source_fd,
+                    destination_fd,
+                    file_size,
+                    chunk_size,
+                    workers,
+                    progress,
+                    limit,
+                )
+                backend = CHUNKED
+        finally:
+            os.close(destination_fd)
+    finally:
+        os.close(source_fd)
+    shutil.copystat(source_file, destination_file)
+    return backend
+
+
+def _copy_chunks(
+    source_fd: int,
+    destination_fd: int,
+    file_size: int,
+    chunk_size: int,
+    workers: int,
+    progress: Optional[ProgressCallback],
+    limit: Optional[backends.ByteLimit],
+) -> None:
+    """Preallocate the copy and copy the chunks concurrently."""
+    _preallocate(destination_fd, file_size)
+    chunks = list(_iter_chunks(file_size, chunk_size))
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        submitted = {
+            executor.submit(
+                backends.copy_range,
+                source_fd,
+                destination_fd,
+                offset,
+                length,
+                limit=limit,
+            ): length
+            for offset, length in chunks
+        }
+        copied_bytes = 0
+        completed = futures.as_completed(submitted)
+        for num, future in enumerate(completed, start=1):
+            future.result()
+            copied_bytes += submitted[future]
+            if progress is not None:
+                progress(num, len(chunks), copied_bytes)
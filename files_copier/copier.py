@@ -1,11 +1,46 @@
+import collections
+import itertools
+import logging
 import os
-import shutil
-import sys
 import time
-from typing import Union
+from concurrent import futures
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from xml.etree import ElementTree
 
-from files_copier import app_logger
+from files_copier import (
+    app_logger,
+    backends,
+    chunked,
+    delta,
+    durability,
+    metrics,
+    plan_cache,
+    retry,
+    throttle,
+    transfer,
+    walker,
+)
+from files_copier.checksums import ChecksumManifest
+from files_copier.dedup import Deduplicator
+from files_copier.durability import WriteBatch
+from files_copier.journal import CopyJournal
+from files_copier.metrics import JobMetrics
+from files_copier.plan_cache import PlanCache
+from files_copier.progress import Progress
+from files_copier.retry import RetryPolicy, RetryQueue
+from files_copier.scheduler import DeviceScheduler
+from files_copier.task import CopyTask
+from files_copier.throttle import Throttle
+from files_copier.validation_cache import ValidationCache
 
 
 class FilesCopier(object):
@@ -32,13 +67,71 @@ class FilesCopier(object):
             <source_path>path_to_source_directory</source_path>
             <destination_path>path_to_destination_directory</destination_path>
         </file>
+
+        <directory>
+            <source_path>path_to_source_directory</source_path>
+            <destination_path>path_to_destination_directory</destination_path>
+            <recursive>true</recursive>
+            <include>*.txt</include>
+            <exclude>tmp_*</exclude>
+        </directory>
     </files>
+
+    All files of the "directory" entry that match one of "include"
+    patterns (all files if there are no patterns) and don't match
+    any of "exclude" patterns are copied. The tags "recursive",
+    "include" and "exclude" are optional.
     """
 
+    executors = {
+        "thread": futures.ThreadPoolExecutor,
+        "process": futures.ProcessPoolExecutor,
+    }
+
     def __init__(
         self,
         config_file_path: str,
         log_file_path: str,
+        workers: int = 1,
+        executor: str = "thread",
+        stream: bool = False,
+        validation_cache_lifetime: Optional[float] = None,
+        incremental: bool = False,
+        compare_content: bool = False,
+        modify_window: float = 0,
+        journal_file_path: Optional[str] = None,
+        copy_backends: Sequence[str] = backends.DEFAULT_BACKENDS,
+        large_file_threshold: Optional[int] = None,
+        chunk_size: int = chunked.DEFAULT_CHUNK_SIZE,
+        chunk_workers: int = chunked.DEFAULT_CHUNK_WORKERS,
+        workers_per_device: Optional[int] = None,
+        deduplicate: bool = False,
+        deduplicate_content: bool = False,
+        allow_hardlinks: bool = False,
+        checksum: Optional[str] = None,
+        checksum_manifest_path: Optional[str] = None,
+        verify_checksum: bool = False,
+        metrics_json_path: Optional[str] = None,
+        metrics_prometheus_path: Optional[str] = None,
+        log_level: int = logging.INFO,
+        walk_workers: int = walker.DEFAULT_WALK_WORKERS,
+        use_plan_cache: bool = False,
+        plan_cache_directory: Optional[str] = None,
+        bytes_per_second: Optional[float] = None,
+        files_per_second: Optional[float] = None,
+        idle_priority: bool = False,
+        delta_mode: Optional[str] = None,
+        delta_block_size: int = delta.DEFAULT_BLOCK_SIZE,
+        atomic_writes: bool = False,
+        durability_mode: str = durability.NONE,
+        durability_batch_files: int = durability.DEFAULT_BATCH_FILES,
+        durability_batch_interval: float = durability.DEFAULT_BATCH_INTERVAL,
+        sparse: bool = False,
+        retry_attempts: int = 0,
+        retry_backoff: float = retry.DEFAULT_BACKOFF,
+        retry_max_backoff: float = retry.DEFAULT_MAX_BACKOFF,
+        retryable_errnos: Optional[Iterable[int]] = None,
+        resume_partial_copies: bool = True,
     ) -> None:
         """
         Initialize attributes of class and logger to file and console.
@@ -48,13 +141,233 @@ class FilesCopier(object):
                                     to the configuration file
             log_file_path (str): an absolute or relative path
                                  to the log file
+            workers (int, optional): number of files copied at the same time.
+                Defaults to 1 (sequential copying).
+            executor (str, optional): kind of the worker pool,
+                "thread" or "process". Defaults to "thread".
+            stream (bool, optional): parse the configuration incrementally
+                and start copying before it is read completely.
+                Defaults to False.
+            validation_cache_lifetime (float, optional): number of seconds
+                during which the result of a source or destination
+                directory check is reused for other files. Defaults to None
+                (each directory is checked once per copying).
+            incremental (bool, optional): don't copy files whose copies
+                in the destination have the same size and modification time.
+                Defaults to False.
+            compare_content (bool, optional): in the incremental mode also
+                compare hashes of the files content. Defaults to False.
+            modify_window (float, optional): in the incremental mode
+                modification times that differ by no more than this number
+                of seconds are equal, like rsync --modify-window does.
+                Defaults to 0.
+            journal_file_path (str, optional): path to the journal
+                of the copied files. If it is set, the interrupted copying
+                is resumed from the first not copied file. Defaults to None.
+            copy_backends (Sequence[str], optional): ways to copy the file
+                content in order of preference: "reflink",
+                "copy_file_range", "sendfile" and "buffered". The next one
+                is used if the previous isn't supported. Defaults to all.
+            large_file_threshold (int, optional): files of this size
+                in bytes and larger are split into chunks that are copied
+                in parallel, unless they are cloned by reflink.
+                Defaults to None (files aren't split).
+            chunk_size (int, optional): size of one chunk in bytes.
+                Defaults to 64 MiB.
+            chunk_workers (int, optional): number of chunks of one file
+                copied at the same time. Defaults to 4.
+            workers_per_device (int, optional): if it is set, files are
+                grouped by devices of their source and destination and
+                no more than this number of files of one group are copied
+                at the same time. The pool has the given number of workers,
+                so it can't be less than workers per device. All files
+                of the config are read before copying. Defaults to None
+                (files are copied in config order).
+            deduplicate (bool, optional): copy the same source file
+                (the same inode) only once and clone the other copies
+                from the first one by reflink. All files of the config
+                are read before copying. Defaults to False.
+            deduplicate_content (bool, optional): also treat different
+                source files with the same content as the same file.
+                Defaults to False.
+            allow_hardlinks (bool, optional): make the other copies
+                hardlinks to the first one if reflink isn't supported.
+                Defaults to False.
+            checksum (str, optional): hash the content of each file while
+                it is copied by the algorithm "sha256", "blake2b"
+                or "crc32". Defaults to None.
+            checksum_manifest_path (str, optional): path to the file
+                the checksums of the copies are appended to.
+                Defaults to None.
+            verify_checksum (bool, optional): read each copy again
+                from the disk, not from the page cache, and compare
+                its hash with the hash of the copied data.
+                Defaults to False.
+            metrics_json_path (str, optional): path to the JSON report
+                with timings of the copying. Defaults to None.
+            metrics_prometheus_path (str, optional): path to the report
+                with timings of the copying in the Prometheus text format.
+                Defaults to None.
+            log_level (int, optional): minimum level of the log messages.
+                app_logger.SUMMARY writes only the summary and errors
+                instead of the message about each file.
+                Defaults to logging.INFO.
+            walk_workers (int, optional): number of directories scanned
+                at the same time when the "directory" entries
+                of the config are expanded. Defaults to 4.
+            use_plan_cache (bool, optional): save the parsed and checked
+                entries of the config as the compiled plan and use it
+                instead of parsing while the config isn't changed.
+                Defaults to False.
+            plan_cache_directory (str, optional): directory of the plans.
+                Defaults to None (the plan is saved next to the config).
+            bytes_per_second (float, optional): maximum number of bytes
+                copied per second by all workers together.
+                Defaults to None (not limited).
+            files_per_second (float, optional): maximum number of files
+                copied per second by all workers together.
+                Defaults to None (not limited).
+            idle_priority (bool, optional): copy files in the workers
+                with the lowest CPU and I/O priority and drop the copied
+                files from the page cache. Defaults to False.
+            delta_mode (str, optional): update the existing copies
+                of files that aren't smaller than the delta block
+                by their changed blocks: "in_place" rewrites only
+                the changed blocks, "temporary" builds the new copy
+                from the blocks of the old one. Defaults to None.
+            delta_block_size (int, optional): size of the compared blocks
+                in bytes. Defaults to 1 MiB.
+            atomic_writes (bool, optional): write each copy under
+                the temporary name and rename it when it is complete,
+                so the crash doesn't leave torn copies. Defaults to False.
+            durability_mode (str, optional): how the atomic copies
+                are written to the disk: "none" by the system later,
+                "file" by fsync of each copy, "batch" by one syncfs
+                per destination file system at commit points, the copies
+                are renamed after it. Defaults to "none".
+            durability_batch_files (int, optional): in the "batch" mode
+                the copies are committed when this number of them
+                is written. Defaults to 1000.
+            durability_batch_interval (float, optional): in the "batch"
+                mode the copies are committed when the first of them
+                is written this number of seconds ago. Defaults to 1.
+            sparse (bool, optional): copy only the ranges of sparse files
+                that have data, so the holes aren't written as zeros.
+                It can't be used with the checksum. Defaults to False.
+            retry_attempts (int, optional): maximum number of retries
+                of the file that is failed with the transient error.
+                The file waits for its retry in the queue while
+                the other files are copied. Defaults to 0.
+            retry_backoff (float, optional): delay before the first retry
+                in seconds, it is doubled for each next retry.
+                Defaults to 1.
+            retry_max_backoff (float, optional): maximum delay
+                before the retry in seconds. Defaults to 60.
+            retryable_errnos (Iterable[int], optional): error numbers
+                that are retried. Defaults to None (I/O, network
+                and stale NFS handle errors).
+            resume_partial_copies (bool, optional): the retry keeps
+                the beginning of the partial copy that is the same
+                as in the copied file. Defaults to True.
+
+        Raises:
+            ValueError: if workers, chunk size, chunk workers,
+                workers per device or delta block size are less than 1,
+                number of retries, their delays or the modify window
+                are negative, workers are less than workers per device,
+                executor, one of copy backends, checksum algorithm,
+                delta mode or durability mode is unknown,
+                durability mode is set without atomic writes
+                or sparse copying is set with the checksum.
         """
+        if workers < 1:
+            raise ValueError(f"Number of workers must be positive - {workers}")
+        if executor not in self.executors:
+            raise ValueError(f"Unknown executor - {executor}")
         self.config_file = config_file_path
         self.log_file_path = log_file_path
-        self.logger = app_logger.get_logger(
-            str(self.__hash__()),
+        self.workers = workers
+        self.executor = executor
+        self.stream = stream
+        self.validation_cache = ValidationCache(validation_cache_lifetime)
+        self.transfer_options = transfer.TransferOptions(
+            incremental=incremental,
+            compare_content=compare_content,
+            modify_window=modify_window,
+            backends=copy_backends,
+            large_file_threshold=large_file_threshold,
+            chunk_size=chunk_size,
+            chunk_workers=chunk_workers,
+            allow_hardlinks=allow_hardlinks,
+            checksum=checksum,
+            verify_checksum=verify_checksum,
+            drop_cache=idle_priority,
+            delta_mode=delta_mode,
+            delta_block_size=delta_block_size,
+            atomic_writes=atomic_writes,
+            durability=durability_mode,
+            sparse=sparse,
+        )
+        self.statistics = collections.Counter()
+        self.journal_file_path = journal_file_path
+        self.journal: Optional[CopyJournal] = None
+        if workers_per_device is not None and workers_per_device < 1:
+            raise ValueError(
+                f"Workers per device must be positive - {workers_per_device}",
+            )
+        if workers_per_device is not None and workers < workers_per_device:
+            raise ValueError(
+                f"Number of workers - {workers} is less than "
+                f"workers per device - {workers_per_device}",
+            )
+        self.workers_per_device = workers_per_device
+        self.deduplicate = deduplicate or deduplicate_content
+        self.deduplicate_content = deduplicate_content
+        self.deduplicator: Optional[Deduplicator] = None
+        self.checksum_manifest_path = checksum_manifest_path
+        self.checksum_manifest: Optional[ChecksumManifest] = None
+        self.metrics_json_path = metrics_json_path
+        self.metrics_prometheus_path = metrics_prometheus_path
+        self.metrics = JobMetrics()
+        self.walk_workers = walk_workers
+        self.plan_cache: Optional[PlanCache] = None
+        if use_plan_cache:
+            self.plan_cache = PlanCache(plan_cache_directory)
+        self.throttle = Throttle(bytes_per_second, files_per_second)
+        self.write_batch = WriteBatch(
+            durability_batch_files,
+            durability_batch_interval,
+        )
+        self.idle_priority = idle_priority
+        self.retry_queue = RetryQueue(
+            RetryPolicy(
+                retry_attempts,
+                retry_backoff,
+                retry_max_backoff,
+                retryable_errnos,
+                resume_partial_copies,
+            ),
+        )
+        self.logger = app_logger.get_file_logger(
             self.log_file_path,
+            log_level,
         )
+        self.progress = Progress(self.logger)
+
+    def set_rate_limits(
+        self,
+        bytes_per_second: Optional[float] = None,
+        files_per_second: Optional[float] = None,
+    ) -> None:
+        """
+        Change the limits of the copying rate.
+
+        It can be called from another thread while files are copied,
+        the new limits are applied to the next copied files.
+        The workers of the process pool keep the limit of bytes
+        they are started with.
+        """
+        self.throttle.set_limits(bytes_per_second, files_per_second)
 
     def _get_file_name(self, file_parameters: dict) -> str:
         """Get file name for copied file."""
@@ -79,7 +392,11 @@ class FilesCopier(object):
 
     def _check_source_path(self, source_path: str) -> bool:
         """Check existence of the source directory."""
-        return os.path.isdir(source_path)
+        return self.validation_cache.check(
+            "source",
+            source_path,
+            os.path.isdir,
+        )
 
     def _check_copied_file(self, file_path: str) -> bool:
         """
@@ -98,6 +415,14 @@ class FilesCopier(object):
         return True
 
     def _check_destination_path(self, destination_path: str) -> bool:
+        """Check the directory to which the file is copied once per cache."""
+        return self.validation_cache.check(
+            "destination",
+            destination_path,
+            self._check_destination_directory,
+        )
+
+    def _check_destination_directory(self, destination_path: str) -> bool:
         """
         Check the directory to which the file is copied.
 
@@ -106,7 +431,7 @@ class FilesCopier(object):
         """
         if not os.path.isdir(destination_path):
             try:
-                os.mkdir(destination_path)
+                os.makedirs(destination_path, exist_ok=True)
                 return True
             except OSError:
                 return False
@@ -119,23 +444,41 @@ class FilesCopier(object):
             return False
         return True
 
+    def _get_task(self, file_parameters: dict) -> CopyTask:
+        """Get the task of copying the file from its parameters."""
+        return CopyTask(
+            self._get_file_name(file_parameters),
+            self._get_source_path(file_parameters),
+            self._get_destination_path(file_parameters),
+        )
+
     def check_file_parameters(self, file_parameters: dict) -> bool:
         """Check that the copied file parameters exist and correct."""
-        file_name = self._get_file_name(file_parameters)
-        source_path = self._get_source_path(file_parameters)
-        destination_path = self._get_destination_path(file_parameters)
+        return self._check_task(self._get_task(file_parameters))
+
+    def _check_task(self, task: CopyTask) -> bool:
+        """Check that the file of the task can be copied."""
         if all(
             (
-                file_name,
-                source_path,
-                destination_path,
-                self._check_copied_file(os.path.join(source_path, file_name)),
-                self._check_destination_path(destination_path),
+                task.name,
+                task.source_path,
+                task.destination_path,
+                self._check_copied_file(task.source_file),
+                self._check_destination_path(task.destination_path),
             )
         ):
             return True
         return False
 
+    def _log_config_error(self, error: Exception) -> None:
+        """Write the reason why the configuration can't be read to the log."""
+        config_file_path = os.path.abspath(self.config_file)
+        if isinstance(error, FileNotFoundError):
+            text = f"Configuration file doesn't exist - {config_file_path}"
+        else:
+            text = f"Configuration file is incorrect - {config_file_path}"
+        self.logger.error(text)
+
     def get_root_of_config(self) -> Union[ElementTree.Element, None]:
         """
         Get root of configuration.
@@ -145,128 +488,948 @@ class FilesCopier(object):
         """
         try:
             tree = ElementTree.parse(self.config_file)
-        except ElementTree.ParseError:
-            config_file_path = os.path.abspath(self.config_file)
-            text = f"Configuration file is incorrect - {config_file_path}"
-            self.logger.error(text)
-            return None
-        except FileNotFoundError:
-            config_file_path = os.path.abspath(self.config_file)
-            text = (f"Configuration file doesn't exist - {config_file_path}")
-            self.logger.error(text)
+        except (ElementTree.ParseError, FileNotFoundError) as error:
+            self._log_config_error(error)
             return None
         return tree.getroot()
 
-    def get_copied_files_from_conf(self) -> list:
+    def _iter_config_entries(self) -> Iterator[Tuple[str, dict]]:
         """
-        Get the parameters of the copied files from the configuration file.
+        Parse the configuration incrementally.
 
-        Parsing the configuration in which the copied files are defined.
-        Also check the ability to copy each of files.
+        Yields the name and the parameters of each "file" and "directory"
+        tag as soon as the tag is closed. Processed elements are cleared,
+        so memory doesn't grow with the size of the configuration.
+
+        Raises:
+            ElementTree.ParseError: if the configuration is incorrect.
+            FileNotFoundError: if the configuration doesn't exist.
         """
-        root = self.get_root_of_config()
-        if root is None:
-            return []
-        files = []
-        for file_tags in root.findall("file"):
-            file_parameters = {}
-            for tag in list(file_tags):
-                file_parameters[tag.tag] = tag.text
-            if self.check_file_parameters(file_parameters):
-                files.append(file_parameters)
-            else:
-                text = (
-                    "File with these parameters can't be copied - "
-                    f"{file_parameters}"
+        depth = 0
+        root = None
+        started_at = time.perf_counter()
+        events = ElementTree.iterparse(
+            self.config_file,
+            events=("start", "end"),
+        )
+        for event, element in events:
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if element.tag == "file":
+                file_parameters = {tag.tag: tag.text for tag in element}
+                root.clear()
+                self.metrics.record(
+                    metrics.PARSE,
+                    time.perf_counter() - started_at,
                 )
-                self.logger.error(text)
-        if not files:
-            text = f"Config doesn't have files for copy - {self.config_file}"
-            self.logger.error(text)
-        return files
+                yield "file", file_parameters
+                started_at = time.perf_counter()
+            elif element.tag == "directory":
+                directory_parameters = self._get_directory_parameters(element)
+                root.clear()
+                yield "directory", directory_parameters
+                started_at = time.perf_counter()
 
-    def _copy_file(self, path_to_file: str, destination_path: str) -> None:
-        """Copy one file."""
+    def _get_config_entries(self) -> Iterable[Tuple[str, dict]]:
+        """
+        Get the "file" and "directory" entries of the configuration.
+
+        In the streaming mode the entries are parsed lazily, otherwise
+        the whole configuration is parsed first, so nothing is copied
+        from the configuration that is incorrect at its end.
+
+        Raises:
+            ElementTree.ParseError: if the configuration is incorrect.
+            FileNotFoundError: if the configuration doesn't exist.
+        """
+        if self.stream:
+            return self._iter_config_entries()
+        return list(self._iter_config_entries())
+
+    def _iter_file_parameters(self) -> Iterator[CopyTask]:
+        """
+        Parse the configuration.
+
+        Yields the task of each "file" tag and of each file
+        of "directory" tags as soon as they are parsed or found.
+        """
         try:
-            sys.stdout.write("\033[2K")  # clear last stdout line
-            shutil.copy2(path_to_file, destination_path)
+            for tag, parameters in self._get_config_entries():
+                if tag == "file":
+                    yield self._get_task(parameters)
+                else:
+                    yield from self._iter_directory_files(parameters)
+        except (ElementTree.ParseError, FileNotFoundError) as error:
+            self._log_config_error(error)
+
+    def _get_directory_parameters(self, element: ElementTree.Element) -> dict:
+        """
+        Get the parameters of the "directory" tag.
+
+        The tags "include" and "exclude" may be repeated,
+        their values are collected to lists.
+        """
+        directory_parameters = {"include": [], "exclude": []}
+        for tag in element:
+            if tag.tag in ("include", "exclude"):
+                if tag.text:
+                    directory_parameters[tag.tag].append(tag.text.strip())
+            else:
+                directory_parameters[tag.tag] = tag.text
+        return directory_parameters
+
+    def _is_recursive_directory(self, directory_parameters: dict) -> bool:
+        """Check that the subdirectories of the directory are copied."""
+        recursive = directory_parameters.get("recursive") or "true"
+        return recursive.strip().lower() in ("true", "yes", "1")
+
+    def _iter_directory_files(
+        self,
+        directory_parameters: dict,
+    ) -> Iterator[CopyTask]:
+        """
+        Get the task of each file of the directory.
+
+        The directory tree is walked in parallel and the files are yielded
+        as soon as they are found. Each file is copied to the subdirectory
+        of the destination directory with the same relative path.
+        """
+        source_path = self._get_source_path(directory_parameters)
+        destination_path = self._get_destination_path(directory_parameters)
+        if not source_path or not destination_path or not os.path.isdir(
+            source_path,
+        ):
             text = (
-                f"File - {path_to_file} successfully "
-                f"copied in -> {destination_path}"
+                "Directory with these parameters can't be copied - "
+                f"{directory_parameters}"
+            )
+            self.logger.error(text)
+            return
+
+        def log_error(error: OSError) -> None:
+            text = f"Directory can't be read - {error.filename}"
+            self.logger.error(text)
+
+        files = walker.walk(
+            source_path,
+            recursive=self._is_recursive_directory(directory_parameters),
+            include=directory_parameters["include"],
+            exclude=directory_parameters["exclude"],
+            workers=self.walk_workers,
+            on_error=log_error,
+        )
+        for relative_directory, file_name in files:
+            yield CopyTask(
+                file_name,
+                os.path.join(source_path, relative_directory),
+                os.path.join(destination_path, relative_directory),
             )
+
+    def iter_copied_files_from_conf(self) -> Iterator[CopyTask]:
+        """
+        Stream the parameters of the copied files from the configuration.
+
+        Each entry is checked for the ability to copy it and yielded
+        right after it is parsed, so copying can start before the whole
+        configuration is read. If the plan cache is used and the plan
+        of the configuration is actual, the configuration isn't parsed.
+        """
+        if self.plan_cache is None:
+            yield from self._check_files(self._iter_file_parameters())
+            return
+        entries = self.plan_cache.load(self.config_file)
+        if entries is None:
+            yield from self._iter_and_plan_files()
+        else:
+            text = f"Copy plan is loaded from the cache - {self.config_file}"
             self.logger.info(text)
+            yield from self._iter_planned_files(entries)
+
+    def _check_files(self, files: Iterable[CopyTask]) -> Iterator[CopyTask]:
+        """Yield the files that can be copied and log the others."""
+        for task in files:
+            started_at = time.perf_counter()
+            is_correct = self._check_task(task)
+            self.metrics.record(
+                metrics.VALIDATE,
+                time.perf_counter() - started_at,
+            )
+            if is_correct:
+                yield task
+            else:
+                self._log_incorrect_task(task)
+
+    def _log_incorrect_task(self, task: CopyTask) -> None:
+        """Write to the log that the file can't be copied."""
+        text = (
+            "File with these parameters can't be copied - "
+            f"{task.get_parameters()}"
+        )
+        self.logger.error(text)
+
+    def _iter_and_plan_files(self) -> Iterator[CopyTask]:
+        """
+        Stream the copied files and save the plan of the configuration.
+
+        The plan is saved only if the whole configuration is parsed.
+        It contains all "file" entries, including the incorrect ones,
+        and the parameters of "directory" entries, which are walked
+        again on each run.
+        """
+        try:
+            config_key = plan_cache.get_config_key(self.config_file)
         except OSError:
-            sys.stdout.flush()
+            config_key = None
+        plan = []
+        try:
+            for tag, parameters in self._get_config_entries():
+                if tag == "directory":
+                    plan.append(("directory", parameters))
+                    yield from self._check_files(
+                        self._iter_directory_files(parameters),
+                    )
+                    continue
+                task = self._get_task(parameters)
+                plan.append(
+                    (
+                        "file",
+                        task.name,
+                        task.source_path,
+                        task.destination_path,
+                    ),
+                )
+                yield from self._check_files([task])
+        except (ElementTree.ParseError, FileNotFoundError) as error:
+            self._log_config_error(error)
+            return
+        if config_key is not None:
+            self.plan_cache.save(self.config_file, config_key, plan)
+
+    def _iter_planned_files(self, entries: list) -> Iterator[CopyTask]:
+        """
+        Stream the copied files from the plan of the configuration.
+
+        Only the parsing is skipped, the files of the plan are checked
+        again, so the files that are created or removed since the plan
+        was saved are copied or logged as on the first run.
+        """
+        for entry in entries:
+            if entry[0] == "directory":
+                yield from self._check_files(
+                    self._iter_directory_files(entry[1]),
+                )
+                continue
+            yield from self._check_files([CopyTask(*entry[1:])])
+
+    def get_copied_files_from_conf(self) -> List[CopyTask]:
+        """
+        Get the tasks of the copied files from the configuration file.
+
+        Parsing the configuration in which the copied files are defined.
+        Also check the ability to copy each of files.
+        """
+        files = list(self.iter_copied_files_from_conf())
+        if not files:
+            self._log_empty_config()
+        return files
+
+    def _log_empty_config(self) -> None:
+        """Write to the log that there is nothing to copy in the config."""
+        text = f"Config doesn't have files for copy - {self.config_file}"
+        self.logger.error(text)
+
+    def _report_copy(
+        self,
+        path_to_file: str,
+        destination_path: str,
+        result: Optional[transfer.TransferResult],
+    ) -> None:
+        """
+        Write the result of copying one file to the log.
+
+        Args:
+            path_to_file (str): path to the copied file.
+            destination_path (str): path to the destination directory.
+            result (TransferResult, optional): result of copying.
+                None if the file isn't copied.
+        """
+        self.progress.finish_file(path_to_file, destination_path)
+        if result is None:
+            self.statistics[transfer.FAILED] += 1
+            self.metrics.record_copy(path_to_file, transfer.FAILED)
             text = f"File doesn't copied - {path_to_file}"
             self.logger.error(text)
+            return
+        self.statistics[result.status] += 1
+        self.metrics.record_copy(
+            path_to_file,
+            result.status,
+            result.seconds,
+            result.size,
+            result.backend,
+            result.saved_size,
+            result.physical_size,
+        )
+        if self.deduplicator is not None:
+            self.deduplicator.set_copied(
+                path_to_file,
+                destination_path,
+                result.destination_file,
+            )
+        if self.journal is not None:
+            self.journal.record(path_to_file, destination_path)
+        if self.checksum_manifest is not None and result.checksum:
+            self.checksum_manifest.write(
+                result.checksum,
+                result.destination_file,
+            )
+        if result.status == transfer.SKIPPED:
+            text = (
+                f"File - {path_to_file} is up to date "
+                f"in -> {destination_path}"
+            )
+        else:
+            text = (
+                f"File - {path_to_file} successfully "
+                f"copied in -> {destination_path} by {result.backend}"
+            )
+        self.logger.info(text)
 
-    def _visualize_progress_bar(
+    def _complete_copy(
         self,
-        sequence_number: int,
-        total_count: int,
-        name_of_copied_file: str = "",
-        bar_len: int = 50,
+        path_to_file: str,
+        destination_path: str,
+        result: Optional[transfer.TransferResult],
     ) -> None:
         """
-        Display the progress of copying files in the console.
+        Report the copy or add it to the batch of writes.
+
+        The copy from the batch is reported when it is renamed
+        to the destination, so the journal never has the copies
+        that aren't written to the disk.
+        """
+        if result is None or result.temporary_file is None:
+            self._report_copy(path_to_file, destination_path, result)
+            return
+        is_full = self.write_batch.add(
+            result.temporary_file,
+            result.destination_file,
+            (path_to_file, destination_path, result),
+        )
+        if is_full:
+            self._commit_writes()
+
+    def _commit_writes(self) -> None:
+        """Rename the copies of the batch and report them."""
+        if not len(self.write_batch):
+            return
+        for item, error in self.write_batch.commit():
+            path_to_file, destination_path, result = item
+            if error is None:
+                result.temporary_file = None
+                self._report_copy(path_to_file, destination_path, result)
+            else:
+                self._report_copy(path_to_file, destination_path, None)
+
+    def _fail_copy(
+        self,
+        task: CopyTask,
+        error: OSError,
+        is_queued: bool = True,
+    ) -> Optional[float]:
+        """
+        Add the failed file to the retry queue or report it.
 
         Args:
-            sequence_number (int): sequence number of the copied files.
-            total_count (int): total number of the copied files.
-            name_of_copied_file (str, optional): name of the copied file.
-                Defaults to "".
-            bar_len (int, optional): length of progress bar.
-                Defaults to 50.
-        """
-        filled_len = int(round(bar_len * sequence_number / float(total_count)))
-
-        percents = round(100.0 * sequence_number / float(total_count), 1)
-        completed_bar = "=" * filled_len
-        uncompleted_bar = "-" * (bar_len - filled_len)
-        progress_bar = f"{completed_bar}{uncompleted_bar}"
-
-        progress_string = (
-            f"[{progress_bar}] {percents}% "
-            f"...{name_of_copied_file}\r"
+            task (CopyTask): the failed file.
+            error (OSError): the reason why the file isn't copied.
+            is_queued (bool, optional): the file waits in the retry queue,
+                otherwise the caller waits for the delay of the retry.
+                Defaults to True.
+
+        Returns:
+            Optional[float]: the delay of the retry in seconds.
+                None if the file isn't retried.
+        """
+        if is_queued:
+            delay = self.retry_queue.schedule(task, error)
+        else:
+            delay = self.retry_queue.count_retry(task, error)
+        if delay is None:
+            self._report_copy(task.source_file, task.destination_path, None)
+            return None
+        text = (
+            f"File - {task.source_file} isn't copied ({error}), "
+            f"retry {self.retry_queue.get_attempt(task)} "
+            f"in {delay:.1f} s"
         )
-        sys.stdout.write("\033[2K")  # clear last stdout line
-        sys.stdout.write(progress_string)
-        sys.stdout.flush()
+        self.logger.warning(text)
+        return delay
+
+    def _next_task(
+        self,
+        copied_files: Iterator[CopyTask],
+    ) -> Optional[CopyTask]:
+        """Take the failed file whose retry is ready or the next file."""
+        task = self.retry_queue.pop_ready()
+        if task is None:
+            task = next(copied_files, None)
+        return task
+
+    def _get_chunks_progress(
+        self,
+        path_to_file: str,
+        destination_path: str,
+    ) -> Optional[chunked.ProgressCallback]:
+        """
+        Get the function that reports copied chunks of the large file.
+
+        The workers of the process pool can't write to the log
+        and update the progress of the main process, so the chunks
+        aren't reported there.
+        """
+        if self._is_process_pool():
+            return None
+
+        def report_chunk(
+            copied_chunks: int,
+            total_chunks: int,
+            copied_bytes: int,
+        ) -> None:
+            text = (
+                f"File - {path_to_file}: copied chunk {copied_chunks} "
+                f"of {total_chunks} ({copied_bytes} bytes)"
+            )
+            self.logger.info(text)
+            self.progress.update_file(
+                path_to_file,
+                destination_path,
+                copied_bytes,
+            )
+
+        return report_chunk
+
+    def _get_byte_limit(self) -> Optional[backends.ByteLimit]:
+        """
+        Get the function that limits the bytes of the copy loops.
+
+        The workers of the process pool have their own limits,
+        which are set when they are started.
+        """
+        if self._is_process_pool():
+            return None
+        return self.throttle.get_byte_limit()
+
+    def _is_process_pool(self) -> bool:
+        """Check that the files are copied by the workers of processes."""
+        if self.executor != "process":
+            return False
+        return (
+            self.workers > 1
+            or self.idle_priority
+            or self.workers_per_device is not None
+        )
+
+    def _get_linked_file(
+        self,
+        path_to_file: str,
+        destination_path: str,
+    ) -> Optional[str]:
+        """Get the copy of the same file the new copy can be linked to."""
+        if self.deduplicator is None:
+            return None
+        return self.deduplicator.get_linked_file(
+            path_to_file,
+            destination_path,
+        )
+
+    def _copy_file(self, task: CopyTask) -> None:
+        """Copy one file."""
+        path_to_file = task.source_file
+        destination_path = task.destination_path
+        self.throttle.acquire_file(path_to_file)
+        self.progress.start_file(path_to_file, destination_path)
+        try:
+            result = transfer.copy_file(
+                path_to_file,
+                destination_path,
+                self.transfer_options,
+                self._get_chunks_progress(path_to_file, destination_path),
+                self._get_linked_file(path_to_file, destination_path),
+                self.retry_queue.is_resumed(task),
+                self._get_byte_limit(),
+                task.destination_file,
+            )
+        except OSError as error:
+            self._fail_copy(task, error)
+        else:
+            self._complete_copy(path_to_file, destination_path, result)
+
+    def _get_files_for_copy(
+        self,
+    ) -> Tuple[Iterable[CopyTask], Optional[int]]:
+        """
+        Get the copied files and their total number.
+
+        In the streaming mode the files are parsed lazily
+        and their total number is unknown.
+        """
+        if not self.stream:
+            copied_files = self.get_copied_files_from_conf()
+            return copied_files, len(copied_files)
+        copied_files = self.iter_copied_files_from_conf()
+        first_file = next(copied_files, None)
+        if first_file is None:
+            self._log_empty_config()
+            return [], None
+        return itertools.chain([first_file], copied_files), None
+
+    def _start_copying(self) -> None:
+        """Reset the state of the previous copying."""
+        self.logger.log(app_logger.SUMMARY, "Copying started")
+
+        self.validation_cache.clear()
+        self.retry_queue.clear()
+        self.statistics.clear()
+        self.metrics = JobMetrics()
+        self.metrics.start()
+
+    def _finish_copying(self) -> None:
+        """Write the summary of the copying to the log and reports."""
+        self.metrics.finish()
+        self.logger.log(app_logger.SUMMARY, "Copying is completed")
+        text = (
+            f"Copied files - {self.statistics[transfer.COPIED]}, "
+            f"skipped files - {self.statistics[transfer.SKIPPED]}, "
+            f"failed files - {self.statistics[transfer.FAILED]}"
+        )
+        self.logger.log(app_logger.SUMMARY, text)
+        if self.retry_queue.retries:
+            text = f"Retries of failed files - {self.retry_queue.retries}"
+            self.logger.log(app_logger.SUMMARY, text)
+        summary = self.metrics.get_summary()
+        text = (
+            f"Throughput - {summary['files_per_second']:.1f} files/s, "
+            f"{summary['bytes_per_second'] / 2 ** 20:.1f} MB/s"
+        )
+        self.logger.log(app_logger.SUMMARY, text)
+        if summary["bytes_saved"]:
+            text = (
+                "Saved by delta copying - "
+                f"{summary['bytes_saved'] / 2 ** 20:.1f} MB"
+            )
+            self.logger.log(app_logger.SUMMARY, text)
+        if summary["bytes_physical"] < summary["bytes"]:
+            text = (
+                f"Logical bytes - {summary['bytes'] / 2 ** 20:.1f} MB, "
+                "physical bytes - "
+                f"{summary['bytes_physical'] / 2 ** 20:.1f} MB"
+            )
+            self.logger.log(app_logger.SUMMARY, text)
+        if self.metrics_json_path is not None:
+            self.metrics.write_json(self.metrics_json_path)
+        if self.metrics_prometheus_path is not None:
+            self.metrics.write_prometheus(self.metrics_prometheus_path)
 
     def copy_files(self) -> None:
         """Copy files."""
-        self.logger.info("Copying started")
-
-        copied_files = self.get_copied_files_from_conf()
+        self._start_copying()
+        copied_files, total_count = self._get_files_for_copy()
         if not copied_files:
             text = "Copying is completed. Nothing is copied."
-            self.logger.info(text)
+            self.logger.log(app_logger.SUMMARY, text)
             raise SystemExit
-        for num, copied_file in enumerate(copied_files):
-            source_path = self._get_source_path(copied_file)
-            file_name = self._get_file_name(copied_file)
-            destination_path = self._get_destination_path(copied_file)
-            path_to_file = os.path.join(source_path, file_name)
-
-            self._visualize_progress_bar(
-                num,
-                len(copied_files),
-                name_of_copied_file=f"Copying - {file_name}"
+        self._copy_files(copied_files, total_count)
+        self._finish_copying()
+
+    def _copy_files(
+        self,
+        copied_files: Iterable[CopyTask],
+        total_count: Optional[int],
+    ) -> None:
+        """
+        Copy files with the journal, the manifest and deduplication.
+
+        If the total number of the files is known, the sizes of all files
+        are planned before copying, so the progress is weighted by them.
+        """
+        planned_files = None
+        if total_count is not None:
+            copied_files = list(copied_files)
+            planned_files = (
+                (task.source_file, task.destination_path)
+                for task in copied_files
             )
-            time.sleep(1)  # special for progress bar visualize
-            self._copy_file(path_to_file, destination_path)
+        self.progress.plan(planned_files, self.workers)
+        self.progress.start()
+        copied_files = self._open_journal(copied_files)
+        self._open_manifest()
+        try:
+            if self.deduplicate:
+                self._copy_files_deduplicated(copied_files)
+            else:
+                self._copy_files_in_mode(copied_files)
+            self._commit_writes()
+            self._finish_journal()
+        finally:
+            self._commit_writes()
+            self.progress.stop()
+            self._close_journal()
+            self._close_manifest()
+
+    def _copy_files_in_mode(self, copied_files: Iterable[CopyTask]) -> None:
+        """Copy files in the mode that is defined by the parameters."""
+        if self.workers_per_device is not None:
+            self._copy_files_by_devices(copied_files)
+        elif self.workers == 1 and not self.idle_priority:
+            self._copy_files_sequentially(copied_files)
+        else:
+            self._copy_files_concurrently(copied_files)
+
+    def _copy_files_deduplicated(
+        self,
+        copied_files: Iterable[CopyTask],
+    ) -> None:
+        """
+        Copy each distinct source file once, then link the other copies.
+
+        The copies of the same source file are linked to its first copy
+        if they are on the same file system, otherwise they are copied.
+        """
+        self.deduplicator = Deduplicator(self.deduplicate_content)
+        try:
+            for task in copied_files:
+                self.deduplicator.add(
+                    task,
+                    task.source_file,
+                    task.destination_path,
+                )
+            primaries, duplicates = self.deduplicator.split()
+            self._copy_files_in_mode(primaries)
+            self._commit_writes()
+            if duplicates:
+                self._copy_files_in_mode(duplicates)
+        finally:
+            self.deduplicator = None
 
-        self.logger.info("Copying is completed")
+    def _open_journal(
+        self,
+        copied_files: Iterable[CopyTask],
+    ) -> Iterable[CopyTask]:
+        """Open the journal if it is set and skip the copied files."""
+        if self.journal_file_path is None:
+            return copied_files
+        self.journal = CopyJournal(self.journal_file_path, self.config_file)
+        return self._skip_journaled_files(copied_files)
+
+    def _finish_journal(self) -> None:
+        """Forget the copied files if all files are copied."""
+        if self.journal is not None and not self.statistics[transfer.FAILED]:
+            self.journal.finish()
+
+    def _close_journal(self) -> None:
+        """Close the journal if it is open."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def _open_manifest(self) -> None:
+        """Open the manifest of the checksums if it is set."""
+        if self.checksum_manifest_path is not None:
+            self.checksum_manifest = ChecksumManifest(
+                self.checksum_manifest_path,
+            )
+
+    def _close_manifest(self) -> None:
+        """Close the manifest of the checksums if it is open."""
+        if self.checksum_manifest is not None:
+            self.checksum_manifest.close()
+            self.checksum_manifest = None
+
+    def _skip_journaled_files(
+        self,
+        copied_files: Iterable[CopyTask],
+    ) -> Iterator[CopyTask]:
+        """Skip the files that are copied according to the journal."""
+        for task in copied_files:
+            path_to_file = task.source_file
+            destination_path = task.destination_path
+            if self.journal.is_completed(path_to_file, destination_path):
+                self.statistics[transfer.SKIPPED] += 1
+                self.metrics.record_copy(path_to_file, transfer.SKIPPED)
+                self.progress.finish_file(path_to_file, destination_path)
+                text = (
+                    f"File - {path_to_file} is already copied "
+                    f"in -> {destination_path}"
+                )
+                self.logger.info(text)
+            else:
+                yield task
+
+    def _copy_files_sequentially(
+        self,
+        copied_files: Iterable[CopyTask],
+    ) -> None:
+        """
+        Copy files one by one.
+
+        The failed file is retried between the next files when its
+        delay is over, so the other files aren't waiting for it.
+        """
+        copied_files = iter(copied_files)
+        while True:
+            task = self._next_task(copied_files)
+            if task is not None:
+                self._copy_file(task)
+            elif self.retry_queue:
+                time.sleep(self.retry_queue.get_timeout())
+            else:
+                break
+
+    def _copy_files_concurrently(
+        self,
+        copied_files: Iterable[CopyTask],
+    ) -> None:
+        """
+        Copy files in the pool of workers.
+
+        No more than two files per worker are submitted to the pool
+        at the same time, so the files are taken from the configuration
+        only when the workers are ready to copy them.
+        The result of each copying is written to the log in the main
+        process in order of completion, so the log looks the same as
+        in the sequential copying.
+        The failed files are submitted again when their delays are over.
+        """
+        max_submitted = self.workers * 2
+        copied_files = iter(copied_files)
+        with self._create_executor() as executor:
+            submitted = {}
+            while True:
+                while len(submitted) < max_submitted:
+                    task = self._next_task(copied_files)
+                    if task is None:
+                        break
+                    submitted[self._submit_copy(executor, task)] = task
+                if not submitted and not self.retry_queue:
+                    break
+                self._wait_copied_files(submitted)
+
+    def _copy_files_by_devices(self, copied_files: Iterable[CopyTask]) -> None:
+        """
+        Copy files in the pool of workers grouped by their devices.
+
+        When a worker is free, the next file is taken from the next
+        group of devices that copies less files than workers_per_device.
+        The failed files are added to their groups again when their
+        delays are over.
+        """
+        scheduler = DeviceScheduler(self.workers_per_device)
+        for task in copied_files:
+            scheduler.add(task, task.source_file, task.destination_path)
+        with self._create_executor() as executor:
+            submitted = {}
+            groups = {}
+            while True:
+                task = self.retry_queue.pop_ready()
+                while task is not None:
+                    scheduler.add(
+                        task,
+                        task.source_file,
+                        task.destination_path,
+                    )
+                    task = self.retry_queue.pop_ready()
+                while len(submitted) < self.workers:
+                    scheduled = scheduler.next_task()
+                    if scheduled is None:
+                        break
+                    group, task = scheduled
+                    future = self._submit_copy(executor, task)
+                    submitted[future] = task
+                    groups[future] = group
+                if not submitted and not self.retry_queue:
+                    break
+                self._wait_copied_files(submitted)
+                for future in list(groups):
+                    if future not in submitted:
+                        scheduler.release(groups.pop(future))
+
+    def _create_executor(self) -> futures.Executor:
+        """
+        Create the pool of workers.
+
+        In the idle priority mode the priority of each worker is lowered
+        when it is started, so the main thread keeps its priority.
+        Each worker of the process pool gets the equal part
+        of the limit of bytes.
+        """
+        bytes_per_second = None
+        if self.executor == "process" and self.throttle.bytes.rate:
+            bytes_per_second = self.throttle.bytes.rate / self.workers
+        executor_class = self.executors[self.executor]
+        return executor_class(
+            max_workers=self.workers,
+            initializer=throttle.init_worker,
+            initargs=(self.idle_priority, bytes_per_second),
+        )
+
+    def _submit_copy(
+        self,
+        executor: futures.Executor,
+        task: CopyTask,
+    ) -> futures.Future:
+        """
+        Submit copying of one file to the pool of workers.
+
+        The file is submitted when the rate limits allow to copy it,
+        so the limits are shared by all workers.
+        """
+        path_to_file = task.source_file
+        destination_path = task.destination_path
+        self.throttle.acquire_file(path_to_file)
+        self.progress.start_file(path_to_file, destination_path)
+        return executor.submit(
+            transfer.copy_file,
+            path_to_file,
+            destination_path,
+            self.transfer_options,
+            self._get_chunks_progress(path_to_file, destination_path),
+            self._get_linked_file(path_to_file, destination_path),
+            self.retry_queue.is_resumed(task),
+            self._get_byte_limit(),
+            task.destination_file,
+        )
+
+    def _wait_copied_files(
+        self,
+        submitted: Dict[futures.Future, CopyTask],
+    ) -> None:
+        """
+        Wait for at least one of the submitted files to be copied.
+
+        Report the results of the completed copies and remove them
+        from the submitted ones. The waiting is stopped when the delay
+        of the next retry is over.
+        """
+        timeout = self.retry_queue.get_timeout()
+        if not submitted:
+            time.sleep(timeout or 0)
+            return
+        done, _ = futures.wait(
+            submitted,
+            timeout=timeout,
+            return_when=futures.FIRST_COMPLETED,
+        )
+        for future in done:
+            task = submitted.pop(future)
+            path_to_file = task.source_file
+            destination_path = task.destination_path
+            try:
+                result = future.result()
+            except OSError as error:
+                self._fail_copy(task, error)
+            else:
+                self._complete_copy(path_to_file, destination_path, result)
 
 
 if __name__ == "__main__":
-    config_path = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)),
-        "config.xml",
+    import argparse
+
+    from files_copier.server import CopierServer
+    from files_copier.watch_copier import WatchFilesCopier
+
+    current_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(
+        description="Copy files defined in xml config.",
+    )
+    parser.add_argument(
+        "--config",
+        default=os.path.join(current_path, "config.xml"),
+        help="path to the configuration file",
+    )
+    parser.add_argument(
+        "--log",
+        default=os.path.join(current_path, "files_copier.log"),
+        help="path to the log file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of files copied at the same time",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="number of retries of the file failed with a transient error",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep copying the changed files until it is interrupted",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="seconds without changes before the changed files are copied",
+    )
+    parser.add_argument(
+        "--modify-window",
+        type=float,
+        default=0,
+        help="seconds of difference of modification times treated as equal",
     )
-    log_path = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)),
-        "files_copier.log",
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="poll the directories instead of using inotify",
     )
-    copier = FilesCopier(config_path, log_path)
-    copier.copy_files()
+    parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="accept jobs on the Unix socket until it is interrupted",
+    )
+    arguments = parser.parse_args()
+    if arguments.serve:
+        server = CopierServer(
+            arguments.serve,
+            arguments.log,
+            workers=arguments.workers,
+            retry_attempts=arguments.retries,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    elif arguments.watch:
+        copier = WatchFilesCopier(
+            arguments.config,
+            arguments.log,
+            workers=arguments.workers,
+            incremental=True,
+            modify_window=arguments.modify_window,
+            retry_attempts=arguments.retries,
+        )
+        try:
+            copier.watch(
+                debounce=arguments.debounce,
+                use_inotify=not arguments.poll,
+            )
+        except KeyboardInterrupt:
+            pass
+    else:
+        copier = FilesCopier(
+            arguments.config,
+            arguments.log,
+            workers=arguments.workers,
+            retry_attempts=arguments.retries,
+        )
+        copier.copy_files()
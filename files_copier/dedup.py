@@ -0,0 +1,113 @@
+import collections
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from files_copier import transfer
+
+CopyPaths = Tuple[str, str]
+
+
+class Deduplicator(object):
+    """
+    Find copy tasks whose copied files are the same.
+
+    The files are the same if they are one inode or, if the content
+    is compared, if they have the same size and sha256 hash. The first
+    task of the group of the same files is copied, the others are linked
+    to its copy when it is possible.
+    """
+
+    def __init__(self, compare_content: bool = False) -> None:
+        """
+        Initialize the empty deduplicator.
+
+        Args:
+            compare_content (bool, optional): also group different files
+                with the same content. Defaults to False.
+        """
+        self.compare_content = compare_content
+        self._inodes: Dict[Tuple[int, int], List[Tuple[Any, CopyPaths]]] = (
+            collections.OrderedDict()
+        )
+        self._sizes: Dict[Tuple[int, int], int] = {}
+        self._groups: Dict[CopyPaths, int] = {}
+        self._primaries: Dict[int, CopyPaths] = {}
+        self._copies: Dict[int, str] = {}
+
+    def add(self, task: Any, path_to_file: str, destination_path: str) -> None:
+        """Add the copy task."""
+        try:
+            stat = os.stat(path_to_file)
+            inode = (stat.st_dev, stat.st_ino)
+            self._sizes[inode] = stat.st_size
+        except OSError:
+            inode = (-1, len(self._inodes))
+        paths = (path_to_file, destination_path)
+        self._inodes.setdefault(inode, []).append((task, paths))
+
+    def _group_by_content(self) -> List[List[Tuple[Any, CopyPaths]]]:
+        """Merge the inodes whose files have the same content."""
+        by_size = collections.OrderedDict()
+        for inode, tasks in self._inodes.items():
+            by_size.setdefault(self._sizes.get(inode), []).append(tasks)
+        groups = []
+        for size, inodes in by_size.items():
+            if size is None or len(inodes) == 1:
+                groups.extend(inodes)
+                continue
+            by_digest = collections.OrderedDict()
+            for tasks in inodes:
+                path_to_file = tasks[0][1][0]
+                try:
+                    digest = transfer.get_file_digest(path_to_file)
+                except OSError:
+                    digest = path_to_file
+                by_digest.setdefault(digest, []).extend(tasks)
+            groups.extend(by_digest.values())
+        return groups
+
+    def split(self) -> Tuple[List[Any], List[Any]]:
+        """
+        Split the added tasks to copied and linked ones.
+
+        Returns:
+            tuple: tasks whose files should be copied and
+                tasks whose files can be linked to the copies.
+        """
+        if self.compare_content:
+            groups = self._group_by_content()
+        else:
+            groups = list(self._inodes.values())
+        primaries = []
+        duplicates = []
+        for group_id, tasks in enumerate(groups):
+            self._primaries[group_id] = tasks[0][1]
+            primaries.append(tasks[0][0])
+            for task, paths in tasks:
+                self._groups[paths] = group_id
+            duplicates.extend(task for task, _ in tasks[1:])
+        self._inodes.clear()
+        return primaries, duplicates
+
+    def set_copied(
+        self,
+        path_to_file: str,
+        destination_path: str,
+        destination_file: str,
+    ) -> None:
+        """Remember the copy of the first file of the group."""
+        paths = (path_to_file, destination_path)
+        group_id = self._groups.get(paths)
+        if group_id is not None and self._primaries[group_id] == paths:
+            self._copies[group_id] = destination_file
+
+    def get_linked_file(
+        self,
+        path_to_file: str,
+        destination_path: str,
+    ) -> Optional[str]:
+        """Get the copy of the same file the new copy can be linked to."""
+        group_id = self._groups.get((path_to_file, destination_path))
+        if group_id is None:
+            return None
+        return self._copies.get(group_id)
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import shutil
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from files_copier import backends
+
+DELTA = "delta"
+
+IN_PLACE = "in_place"
+TEMPORARY = "temporary"
+MODES = (IN_PLACE, TEMPORARY)
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+STRONG_DIGEST_SIZE = 16
+
+Signature = Tuple[int, bytes]
+
+
+def get_weak_checksum(block: bytes) -> int:
+    """Get the fast checksum of the block."""
+    return zlib.adler32(block)
+
+
+def get_strong_checksum(block: bytes) -> bytes:
+    """Get the hash of the block that confirms the match of weak checksums."""
+    return hashlib.blake2b(block, digest_size=STRONG_DIGEST_SIZE).digest()
+
+
+def _iter_blocks(file_path: str, block_size: int) -> Iterator[bytes]:
+    """Read the file block by block."""
+    with open(file_path, "rb", buffering=0) as read_file:
+        for block in iter(lambda: read_file.read(block_size), b""):
+            yield block
+
+
+def get_signatures(file_path: str, block_size: int) -> List[Signature]:
+    """Get the weak and the strong checksums of each block of the file."""
+    return [
+        (get_weak_checksum(block), get_strong_checksum(block))
+        for block in _iter_blocks(file_path, block_size)
+    ]
+
+
+def _is_same_block(block: bytes, signature: Signature) -> bool:
+    """Check the block by the weak checksum, then by the strong one."""
+    weak_checksum, strong_checksum = signature
+    if get_weak_checksum(block) != weak_checksum:
+        return False
+    return get_strong_checksum(block) == strong_checksum
+
+
+def _write(
+    file_descriptor: int,
+    block: bytes,
+    offset: int,
+    limit: Optional[backends.ByteLimit] = None,
+) -> None:
+    """Write the whole block at the offset."""
+    view = memoryview(block)
+    while view:
+        written = os.pwrite(file_descriptor, view, offset)
+        view = view[written:]
+        offset += written
+    if limit is not None:
+        limit(len(block))
+
+
+def _copy_in_place(
+    path_to_file: str,
+    destination_file: str,
+    block_size: int,
+    limit: Optional[backends.ByteLimit],
+) -> int:
+    """Rewrite the changed blocks of the copy at their places."""
+    signatures = get_signatures(destination_file, block_size)
+    saved_size = 0
+    offset = 0
+    destination_fd = os.open(destination_file, os.O_WRONLY)
+    try:
+        for index, block in enumerate(_iter_blocks(path_to_file, block_size)):
+            if index < len(signatures) and _is_same_block(
+                block,
+                signatures[index],
+            ):
+                saved_size += len(block)
+            else:
+                _write(destination_fd, block, offset, limit)
+            offset += len(block)
+        os.ftruncate(destination_fd, offset)
+    finally:
+        os.close(destination_fd)
+    return saved_size
+
+
+def build(
+    path_to_file: str,
+    basis_file: str,
+    output_file: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    limit: Optional[backends.ByteLimit] = None,
+) -> int:
+    """
+    Build the new copy from the blocks of the old one and the changed data.
+
+    Each block of the file is looked up among all blocks of the old copy,
+    so the moved blocks are also reused.
+
+    Args:
+        path_to_file (str): path to the copied file.
+        basis_file (str): path to the old copy.
+        output_file (str): path to the new copy.
+        block_size (int, optional): size of the compared blocks in bytes.
+            Defaults to 1 MiB.
+        limit (Callable, optional): called after each written block.
+            Defaults to None (the copying isn't limited).
+
+    Returns:
+        int: number of bytes that are taken from the old copy.
+    """
+    blocks: Dict[int, List[Tuple[bytes, int]]] = {}
+    offset = 0
+    for weak_checksum, strong_checksum in get_signatures(
+        basis_file,
+        block_size,
+    ):
+        blocks.setdefault(weak_checksum, []).append((strong_checksum, offset))
+        offset += block_size
+    saved_size = 0
+    offset = 0
+    basis_fd = os.open(basis_file, os.O_RDONLY)
+    try:
+        output_fd = os.open(
+            output_file,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o666,
+        )
+        try:
+            for block in _iter_blocks(path_to_file, block_size):
+                matched_offset = _find_block(blocks, block)
+                if matched_offset is None:
+                    _write(output_fd, block, offset, limit)
+                else:
+                    backends.copy_range(
+                        basis_fd,
+                        output_fd,
+                        matched_offset,
+                        len(block),
+                        offset,
+                        limit,
+                    )
+                    saved_size += len(block)
+                offset += len(block)
+        finally:
+            os.close(output_fd)
+    finally:
+        os.close(basis_fd)
+    shutil.copystat(path_to_file, output_file)
+    return saved_size
+
+
+def _copy_through_temporary(
+    path_to_file: str,
+    destination_file: str,
+    block_size: int,
+    limit: Optional[backends.ByteLimit],
+) -> int:
+    """Build the new copy in the temporary file and replace the old one."""
+    temporary_file = f"{destination_file}.{os.getpid()}.delta"
+    try:
+        saved_size = build(
+            path_to_file,
+            destination_file,
+            temporary_file,
+            block_size,
+            limit,
+        )
+        os.replace(temporary_file, destination_file)
+    except BaseException:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        raise
+    return saved_size
+
+
+def _find_block(
+    blocks: Dict[int, List[Tuple[bytes, int]]],
+    block: bytes,
+) -> Optional[int]:
+    """Get the offset of the same block of the old copy or None."""
+    candidates = blocks.get(get_weak_checksum(block))
+    if not candidates:
+        return None
+    strong_checksum = get_strong_checksum(block)
+    for candidate_checksum, offset in candidates:
+        if candidate_checksum == strong_checksum:
+            return offset
+    return None
+
+
+def copy(
+    path_to_file: str,
+    destination_file: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    mode: str = IN_PLACE,
+    limit: Optional[backends.ByteLimit] = None,
+) -> int:
+    """
+    Update the existing copy of the file by its changed blocks.
+
+    The blocks are compared by their checksums: the weak one is computed
+    for each block and the strong one only when the weak ones are equal.
+    Blocks are aligned to the block size, the blocks shifted by a part
+    of the block aren't found.
+
+    Args:
+        path_to_file (str): path to the copied file.
+        destination_file (str): path to the existing copy.
+        block_size (int, optional): size of the compared blocks in bytes.
+            Defaults to 1 MiB.
+        mode (str, optional): IN_PLACE rewrites only the changed blocks
+            of the copy. TEMPORARY writes the new copy to the temporary
+            file, so the copy is replaced at once, and reuses blocks
+            moved to other places. Defaults to IN_PLACE.
+        limit (Callable, optional): called after each written block.
+            Defaults to None (the copying isn't limited).
+
+    Returns:
+        int: number of bytes that aren't written because they are
+            the same in the copy.
+
+    Raises:
+        OSError: if the file can't be copied.
+    """
+    if mode == IN_PLACE:
+        saved_size = _copy_in_place(
+            path_to_file,
+            destination_file,
+            block_size,
+            limit,
+        )
+        shutil.copystat(path_to_file, destination_file)
+        return saved_size
+    return _copy_through_temporary(
+        path_to_file,
+        destination_file,
+        block_size,
+        limit,
+    )
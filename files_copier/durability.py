@@ -0,0 +1,251 @@
+import ctypes
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+NONE = "none"
+FILE = "file"
+BATCH = "batch"
+MODES = (NONE, FILE, BATCH)
+
+DEFAULT_BATCH_FILES = 1000
+DEFAULT_BATCH_INTERVAL = 1.0
+
+_libc_lock = threading.Lock()
+_libc: Optional[Any] = None
+
+
+def get_temporary_file(destination_file: str) -> str:
+    """
+    Get the hidden temporary name of the copy in the same directory.
+
+    The name is unique for each process and thread, so the copy
+    can be renamed to the destination without copying its data.
+    """
+    destination_path, file_name = os.path.split(destination_file)
+    return os.path.join(
+        destination_path,
+        f".{file_name}.{os.getpid()}.{threading.get_ident()}.part",
+    )
+
+
+def remove_file(file_path: str) -> None:
+    """Remove the file if it exists."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def sync_file(file_path: str) -> None:
+    """Write the content of the file to the disk."""
+    file_descriptor = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+def sync_directory(directory_path: str) -> None:
+    """
+    Write the entries of the directory to the disk.
+
+    After it, the renamed files are found by their new names
+    after the crash. Some systems can't sync directories, then
+    nothing is done.
+    """
+    try:
+        file_descriptor = os.open(directory_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(file_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(file_descriptor)
+
+
+def _get_libc() -> Optional[Any]:
+    """Load the C library once, None if it can't be loaded."""
+    global _libc
+    with _libc_lock:
+        if _libc is None:
+            try:
+                _libc = ctypes.CDLL(None, use_errno=True)
+            except OSError:
+                _libc = False
+        return _libc or None
+
+
+def sync_file_system(path: str) -> bool:
+    """
+    Write all data of the file system of the path to the disk.
+
+    One syncfs call (Linux only) replaces fsync of each written file.
+
+    Returns:
+        bool: False if syncfs isn't supported.
+    """
+    libc = _get_libc()
+    if libc is None or not hasattr(libc, "syncfs"):
+        return False
+    file_descriptor = os.open(path, os.O_RDONLY)
+    try:
+        if libc.syncfs(file_descriptor) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+    finally:
+        os.close(file_descriptor)
+    return True
+
+
+def commit_file(
+    temporary_file: str,
+    destination_file: str,
+    durability: str = NONE,
+) -> None:
+    """
+    Rename the complete copy to the destination.
+
+    With FILE durability the copy and the rename are written to the disk
+    before it returns, otherwise they are written by the system later.
+    """
+    if durability == FILE:
+        sync_file(temporary_file)
+    os.replace(temporary_file, destination_file)
+    if durability == FILE:
+        sync_directory(os.path.dirname(os.path.abspath(destination_file)))
+
+
+class WriteBatch(object):
+    """
+    Copies that are renamed to their destinations at commit points.
+
+    At the commit point the data of all copies is written to the disk
+    by one syncfs per destination file system, then the copies are
+    renamed and the renames are written to the disk the same way.
+    So a copy never has its final name before its data is on the disk.
+    """
+
+    def __init__(
+        self,
+        max_files: int = DEFAULT_BATCH_FILES,
+        max_interval: float = DEFAULT_BATCH_INTERVAL,
+    ) -> None:
+        """
+        Initialize the empty batch.
+
+        Args:
+            max_files (int, optional): the batch should be committed
+                when it has this number of copies. Defaults to 1000.
+            max_interval (float, optional): the batch should be committed
+                when its first copy is added this number of seconds ago.
+                Defaults to 1.
+        """
+        self.max_files = max_files
+        self.max_interval = max_interval
+        self._pending: List[Tuple[str, str, Any]] = []
+        self._started_at = time.monotonic()
+
+    def __len__(self) -> int:
+        """Get the number of copies that aren't committed."""
+        return len(self._pending)
+
+    def add(
+        self,
+        temporary_file: str,
+        destination_file: str,
+        item: Any,
+    ) -> bool:
+        """
+        Add the complete copy to the batch.
+
+        Args:
+            temporary_file (str): path to the complete copy.
+            destination_file (str): path the copy is renamed to.
+            item (Any): value returned by commit for this copy.
+
+        Returns:
+            bool: True if the batch should be committed.
+        """
+        if not self._pending:
+            self._started_at = time.monotonic()
+        self._pending.append((temporary_file, destination_file, item))
+        return self.is_full()
+
+    def is_full(self) -> bool:
+        """Check that the batch should be committed."""
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.max_files:
+            return True
+        return time.monotonic() - self._started_at >= self.max_interval
+
+    def commit(self) -> List[Tuple[Any, Optional[OSError]]]:
+        """
+        Write the copies to the disk and rename them to the destinations.
+
+        If syncfs isn't supported, each copy and each directory
+        are synced one by one.
+
+        Returns:
+            List of items of the copies with the error of each copy
+            or None if it is committed.
+        """
+        pending, self._pending = self._pending, []
+        devices: Dict[str, Optional[int]] = {}
+        for temporary_file, _, _ in pending:
+            directory_path = os.path.dirname(os.path.abspath(temporary_file))
+            if directory_path not in devices:
+                devices[directory_path] = _get_device(directory_path)
+        synced_devices = _sync_file_systems(devices)
+        results: List[Tuple[Any, Optional[OSError]]] = []
+        committed_directories = set()
+        for temporary_file, destination_file, item in pending:
+            directory_path = os.path.dirname(os.path.abspath(temporary_file))
+            try:
+                if devices[directory_path] not in synced_devices:
+                    sync_file(temporary_file)
+                os.replace(temporary_file, destination_file)
+            except OSError as error:
+                remove_file(temporary_file)
+                results.append((item, error))
+                continue
+            committed_directories.add(directory_path)
+            results.append((item, None))
+        synced_devices = _sync_file_systems(devices)
+        for directory_path in committed_directories:
+            if devices[directory_path] not in synced_devices:
+                sync_directory(directory_path)
+        return results
+
+
+def _get_device(path: str) -> Optional[int]:
+    """Get the device of the path, None if it doesn't exist."""
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+def _sync_file_systems(devices: Dict[str, Optional[int]]) -> Set[int]:
+    """
+    Sync the file system of each device once.
+
+    Returns:
+        Set of the devices that are synced.
+    """
+    directories = {}
+    for directory_path, device in devices.items():
+        if device is not None:
+            directories.setdefault(device, directory_path)
+    synced_devices = set()
+    for device, directory_path in directories.items():
+        try:
+            if sync_file_system(directory_path):
+                synced_devices.add(device)
+        except OSError:
+            continue
+    return synced_devices
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import time
+
+COMMIT_INTERVAL = 1.0
+
+
+class CopyJournal(object):
+    """
+    Persistent journal of the copied files.
+
+    The journal is stored in the SQLite database. Each copied file is
+    recorded with the configuration it is defined in, so if the copying
+    is interrupted, the next run skips the files that are already copied.
+    Records are committed at most once per COMMIT_INTERVAL seconds,
+    so after a crash only the files copied during the last interval
+    are copied again.
+    """
+
+    def __init__(self, journal_file_path: str, config_file_path: str) -> None:
+        """
+        Open the journal and create its table if it doesn't exist.
+
+        Args:
+            journal_file_path (str): path to the database of the journal.
+            config_file_path (str): path to the configuration file
+                whose copied files are recorded.
+        """
+        self.config = os.path.abspath(config_file_path)
+        self._connection = sqlite3.connect(journal_file_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS completed ("
+            "config TEXT NOT NULL, "
+            "entry TEXT NOT NULL, "
+            "PRIMARY KEY (config, entry))",
+        )
+        self._connection.commit()
+        self._committed_at = time.monotonic()
+
+    def _get_entry(self, path_to_file: str, destination_path: str) -> str:
+        """Get the key of the copied file in the journal."""
+        return "\0".join(
+            (os.path.abspath(path_to_file), os.path.abspath(destination_path)),
+        )
+
+    def is_completed(self, path_to_file: str, destination_path: str) -> bool:
+        """Check that the file is already copied to the destination."""
+        cursor = self._connection.execute(
+            "SELECT 1 FROM completed WHERE config = ? AND entry = ?",
+            (self.config, self._get_entry(path_to_file, destination_path)),
+        )
+        return cursor.fetchone() is not None
+
+    def record(self, path_to_file: str, destination_path: str) -> None:
+        """Record that the file is copied to the destination."""
+        self._connection.execute(
+            "INSERT OR IGNORE INTO completed (config, entry) VALUES (?, ?)",
+            (self.config, self._get_entry(path_to_file, destination_path)),
+        )
+        if time.monotonic() - self._committed_at >= COMMIT_INTERVAL:
+            self._commit()
+
+    def _commit(self) -> None:
+        """Save the recorded files to the disk."""
+        self._connection.commit()
+        self._committed_at = time.monotonic()
+
+    def finish(self) -> None:
+        """
+        Forget the copied files of the configuration.
+
+        Called when the copying is completed, so the next run
+        of the same configuration copies all files again.
+        """
+        self._connection.execute(
+            "DELETE FROM completed WHERE config = ?",
+            (self.config,),
+        )
+        self._commit()
+
+    def close(self) -> None:
+        """Save the recorded files and close the journal."""
+        self._commit()
+        self._connection.close()
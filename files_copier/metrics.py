@@ -0,0 +1,237 @@
+import array
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+PARSE = "parse"
+VALIDATE = "validate"
+COPY = "copy"
+
+PHASES = (PARSE, VALIDATE, COPY)
+QUANTILES = (0.5, 0.95, 0.99)
+SLOWEST_FILES_COUNT = 10
+
+
+def get_quantile(sorted_values: array.array, quantile: float) -> float:
+    """Get the quantile of the sorted values by the nearest rank."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _write_atomically(file_path: str, text: str) -> None:
+    """Write the file so its readers never see it half written."""
+    temporary_file_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temporary_file_path, "w", encoding="utf-8") as report_file:
+        report_file.write(text)
+    os.replace(temporary_file_path, file_path)
+
+
+class JobMetrics(object):
+    """
+    Timings of each phase of each file of the copying job.
+
+    Latencies are kept in compact arrays of floats, and only
+    the slowest copied files are remembered with their paths.
+    """
+
+    def __init__(self, slowest_files_count: int = SLOWEST_FILES_COUNT) -> None:
+        """
+        Initialize empty metrics.
+
+        Args:
+            slowest_files_count (int, optional): number of the slowest
+                copied files in the summary. Defaults to 10.
+        """
+        self.slowest_files_count = slowest_files_count
+        self._latencies: Dict[str, array.array] = {
+            phase: array.array("d") for phase in PHASES
+        }
+        self._slowest: List[Tuple[float, str, int, Optional[str]]] = []
+        self._statuses: Dict[str, int] = {}
+        self._backends: Dict[str, int] = {}
+        self._bytes = 0
+        self._bytes_saved = 0
+        self._bytes_physical = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start measuring the job."""
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+    def finish(self) -> None:
+        """Finish measuring the job."""
+        self._finished_at = time.perf_counter()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record the duration of the phase of one file."""
+        with self._lock:
+            self._latencies[phase].append(seconds)
+
+    def record_copy(
+        self,
+        path_to_file: str,
+        status: str,
+        seconds: float = 0.0,
+        size: int = 0,
+        backend: Optional[str] = None,
+        saved_size: int = 0,
+        physical_size: int = 0,
+    ) -> None:
+        """
+        Record the result of copying one file.
+
+        Args:
+            path_to_file (str): path to the copied file.
+            status (str): status of copying.
+            seconds (float, optional): duration of copying.
+                Defaults to 0.0.
+            size (int, optional): number of copied bytes. Defaults to 0.
+            backend (str, optional): name of the way of copying.
+                Defaults to None.
+            saved_size (int, optional): number of bytes that aren't
+                written because they are the same in the old copy.
+                Defaults to 0.
+            physical_size (int, optional): number of bytes allocated
+                for the copy, less than the size of the sparse copy.
+                Defaults to 0.
+        """
+        with self._lock:
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+            if backend is not None:
+                self._backends[backend] = self._backends.get(backend, 0) + 1
+            self._bytes += size
+            self._bytes_saved += saved_size
+            self._bytes_physical += physical_size
+            self._latencies[COPY].append(seconds)
+            file_record = (seconds, path_to_file, size, backend)
+            if len(self._slowest) < self.slowest_files_count:
+                heapq.heappush(self._slowest, file_record)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, file_record)
+
+    def get_summary(self) -> dict:
+        """
+        Get the summary of the job.
+
+        Returns:
+            dict: totals, throughput, latency quantiles of each phase
+                and the slowest copied files.
+        """
+        with self._lock:
+            finished_at = self._finished_at or time.perf_counter()
+            duration = 0.0
+            if self._started_at is not None:
+                duration = max(finished_at - self._started_at, 0.0)
+            files = sum(self._statuses.values())
+            files_per_second = files / duration if duration else 0.0
+            bytes_per_second = self._bytes / duration if duration else 0.0
+            latencies = {}
+            for phase, values in self._latencies.items():
+                sorted_values = array.array("d", sorted(values))
+                latencies[phase] = {
+                    "count": len(sorted_values),
+                    "sum": sum(sorted_values),
+                    "max": sorted_values[-1] if sorted_values else 0.0,
+                }
+                for quantile in QUANTILES:
+                    latencies[phase][f"p{int(quantile * 100)}"] = (
+                        get_quantile(sorted_values, quantile)
+                    )
+            slowest = [
+                {
+                    "file": path_to_file,
+                    "seconds": seconds,
+                    "bytes": size,
+                    "backend": backend,
+                }
+                for seconds, path_to_file, size, backend in sorted(
+                    self._slowest,
+                    reverse=True,
+                )
+            ]
+            return {
+                "duration_seconds": duration,
+                "files": dict(self._statuses),
+                "backends": dict(self._backends),
+                "bytes": self._bytes,
+                "bytes_saved": self._bytes_saved,
+                "bytes_physical": self._bytes_physical,
+                "files_per_second": files_per_second,
+                "bytes_per_second": bytes_per_second,
+                "latency_seconds": latencies,
+                "slowest_files": slowest,
+            }
+
+    def write_json(self, report_file_path: str) -> None:
+        """Write the summary to the file as JSON."""
+        text = json.dumps(self.get_summary(), indent=4)
+        _write_atomically(report_file_path, f"{text}\n")
+
+    def write_prometheus(self, report_file_path: str) -> None:
+        """
+        Write the summary in the Prometheus text format.
+
+        The file can be exported by the textfile collector
+        of the node exporter.
+        """
+        summary = self.get_summary()
+        lines = [
+            "# HELP files_copier_files_total Number of files by status.",
+            "# TYPE files_copier_files_total gauge",
+        ]
+        for status, count in sorted(summary["files"].items()):
+            lines.append(
+                f'files_copier_files_total{{status="{status}"}} {count}',
+            )
+        lines.extend(
+            (
+                "# HELP files_copier_bytes_total Number of copied bytes.",
+                "# TYPE files_copier_bytes_total gauge",
+                f"files_copier_bytes_total {summary['bytes']}",
+                "# HELP files_copier_bytes_saved_total Number of bytes "
+                "that aren't written by delta copying.",
+                "# TYPE files_copier_bytes_saved_total gauge",
+                f"files_copier_bytes_saved_total {summary['bytes_saved']}",
+                "# HELP files_copier_bytes_physical_total Number of bytes "
+                "allocated for the copies.",
+                "# TYPE files_copier_bytes_physical_total gauge",
+                "files_copier_bytes_physical_total "
+                f"{summary['bytes_physical']}",
+                "# HELP files_copier_duration_seconds Duration of the job.",
+                "# TYPE files_copier_duration_seconds gauge",
+                f"files_copier_duration_seconds {summary['duration_seconds']}",
+                "# HELP files_copier_files_per_second Throughput in files.",
+                "# TYPE files_copier_files_per_second gauge",
+                f"files_copier_files_per_second {summary['files_per_second']}",
+                "# HELP files_copier_bytes_per_second Throughput in bytes.",
+                "# TYPE files_copier_bytes_per_second gauge",
+                f"files_copier_bytes_per_second {summary['bytes_per_second']}",
+                "# HELP files_copier_latency_seconds Latency of one file.",
+                "# TYPE files_copier_latency_seconds summary",
+            ),
+        )
+        for phase, latency in summary["latency_seconds"].items():
+            for quantile in QUANTILES:
+                value = latency[f"p{int(quantile * 100)}"]
+                lines.append(
+                    "files_copier_latency_seconds"
+                    f'{{phase="{phase}",quantile="{quantile}"}} {value}',
+                )
+            lines.append(
+                f'files_copier_latency_seconds_sum{{phase="{phase}"}} '
+                f"{latency['sum']}",
+            )
+            lines.append(
+                f'files_copier_latency_seconds_count{{phase="{phase}"}} '
+                f"{latency['count']}",
+            )
+        _write_atomically(report_file_path, "\n".join(lines) + "\n")
@@ -0,0 +1,118 @@
+import hashlib
+import marshal
+import os
+import sys
+from typing import Any, List, Optional, Tuple
+
+PLAN_FORMAT_VERSION = 2
+READ_BLOCK_SIZE = 1024 * 1024
+
+ConfigKey = Tuple[str, int, int, str]
+
+
+def get_config_key(config_file_path: str) -> ConfigKey:
+    """
+    Get the key of the configuration file.
+
+    The key is the absolute path, the size, the modification time
+    and the sha256 hash of the content of the configuration.
+
+    Raises:
+        OSError: if the configuration can't be read.
+    """
+    config_hash = hashlib.sha256()
+    with open(config_file_path, "rb") as config_file:
+        stat = os.fstat(config_file.fileno())
+        for block in iter(lambda: config_file.read(READ_BLOCK_SIZE), b""):
+            config_hash.update(block)
+    return (
+        os.path.abspath(config_file_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        config_hash.hexdigest(),
+    )
+
+
+class PlanCache(object):
+    """
+    Compiled copy plans of configurations.
+
+    The plan is the list of the parsed entries of the configuration
+    stored in the compact binary form (marshal). It is reused while
+    the configuration isn't changed, so the configuration isn't parsed
+    again, but its files are checked on each run.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_directory (str, optional): directory of the plans.
+                Defaults to None (the plan is stored next to
+                the configuration file).
+        """
+        self.cache_directory = cache_directory
+
+    def get_plan_path(self, config_file_path: str) -> str:
+        """Get the path to the plan of the configuration."""
+        config_file_path = os.path.abspath(config_file_path)
+        if self.cache_directory is None:
+            directory, name = os.path.split(config_file_path)
+            return os.path.join(directory, f".{name}.plan")
+        path_hash = hashlib.sha256(config_file_path.encode()).hexdigest()
+        name = os.path.basename(config_file_path)
+        return os.path.join(self.cache_directory, f"{name}.{path_hash}.plan")
+
+    def _get_version(self) -> tuple:
+        """Get the version of the plan format and of the marshal format."""
+        return PLAN_FORMAT_VERSION, sys.version_info[:2]
+
+    def load(self, config_file_path: str) -> Optional[List[Any]]:
+        """
+        Load the plan of the configuration.
+
+        Returns:
+            list, optional: entries of the plan, None if there is
+                no plan or the configuration is changed.
+        """
+        try:
+            config_key = get_config_key(config_file_path)
+            with open(self.get_plan_path(config_file_path), "rb") as plan:
+                version, key, entries = marshal.load(plan)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != self._get_version() or key != config_key:
+            return None
+        return entries
+
+    def save(
+        self,
+        config_file_path: str,
+        config_key: ConfigKey,
+        entries: List[Any],
+    ) -> None:
+        """
+        Save the plan of the configuration.
+
+        The plan isn't saved if the configuration is changed since
+        its key is taken.
+
+        Args:
+            config_file_path (str): path to the configuration.
+            config_key (tuple): key of the configuration before parsing.
+            entries (list): entries of the plan, they must contain
+                only values supported by marshal.
+        """
+        try:
+            if get_config_key(config_file_path) != config_key:
+                return
+            plan_path = self.get_plan_path(config_file_path)
+            if self.cache_directory is not None:
+                os.makedirs(self.cache_directory, exist_ok=True)
+            temporary_path = f"{plan_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as plan:
+                marshal.dump((self._get_version(), config_key, entries), plan)
+            os.replace(temporary_path, plan_path)
+        except OSError:
+            return
@@ -0,0 +1,221 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent import futures
+from typing import Dict, Iterable, Optional, TextIO, Tuple, Union
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_LOG_INTERVAL = 10.0
+THROUGHPUT_WINDOW = 5.0
+PLAN_WORKERS = 16
+BAR_LENGTH = 30
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# The copy is identified by the copied file and the destination directory,
+# so the file copied to several directories is counted for each of them.
+CopyKey = Tuple[str, str]
+
+
+def format_size(size: float) -> str:
+    """Format the number of bytes with the binary unit."""
+    for unit in SIZE_UNITS[:-1]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} {SIZE_UNITS[-1]}"
+
+
+def format_duration(seconds: float) -> str:
+    """Format the number of seconds as hours, minutes and seconds."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def _get_size(path_to_file: str) -> int:
+    """Get the size of the file or 0 if it can't be read."""
+    try:
+        return os.stat(path_to_file).st_size
+    except OSError:
+        return 0
+
+
+class Progress(object):
+    """
+    Progress of the copying weighted by the sizes of the files.
+
+    The copying only updates the counters, the progress is displayed
+    by its own timer thread. In the terminal the progress line is redrawn,
+    otherwise it is written to the log from time to time.
+    """
+
+    def __init__(
+        self,
+        logger: Union[logging.Logger, logging.LoggerAdapter],
+        stream: Optional[TextIO] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the progress of the empty copying.
+
+        Args:
+            logger (logging.Logger): logger the progress is written to
+                if the stream isn't a terminal.
+            stream (TextIO, optional): stream of the progress line.
+                Defaults to sys.stdout.
+            interval (float, optional): number of seconds between updates.
+                Defaults to 0.5 in the terminal and 10 otherwise.
+        """
+        self.logger = logger
+        self.stream = stream or sys.stdout
+        self.is_terminal = self.stream.isatty()
+        if interval is None:
+            interval = (
+                DEFAULT_INTERVAL if self.is_terminal else DEFAULT_LOG_INTERVAL
+            )
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.plan(None)
+
+    def plan(
+        self,
+        copies: Optional[Iterable[CopyKey]],
+        workers: int = 1,
+    ) -> None:
+        """
+        Reset the progress and get the total size of the copied files.
+
+        The files are checked in the pool of threads, so the latency
+        of the file system is paid once for many files. The file copied
+        to several directories is checked once and counted for each copy.
+
+        Args:
+            copies (Iterable[Tuple[str, str]], optional): paths
+                to the copied files and their destination directories.
+                None if they are unknown yet (streaming mode), then only
+                the copied files and bytes are displayed.
+            workers (int, optional): number of files copied at the same
+                time. Defaults to 1.
+        """
+        sizes: Dict[CopyKey, int] = {}
+        total_bytes = None
+        if copies is not None:
+            copies = list(copies)
+            paths = list({path_to_file for path_to_file, _ in copies})
+            with futures.ThreadPoolExecutor(PLAN_WORKERS) as executor:
+                file_sizes = dict(zip(paths, executor.map(_get_size, paths)))
+            sizes = {copy: file_sizes[copy[0]] for copy in copies}
+            total_bytes = sum(file_sizes[copy[0]] for copy in copies)
+        with self._lock:
+            self.workers = workers
+            self.sizes = sizes
+            self.total_files = None if copies is None else len(copies)
+            self.total_bytes = total_bytes
+            self.finished_files = 0
+            self.finished_bytes = 0
+            self.active_files: Dict[CopyKey, int] = {}
+            self._samples: collections.deque = collections.deque()
+            self._started_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start displaying the progress."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._display, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop displaying the progress and display its last state."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self._write(self.get_line())
+        if self.is_terminal:
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def start_file(self, path_to_file: str, destination_path: str) -> None:
+        """Count the copy that is started."""
+        with self._lock:
+            self.active_files[path_to_file, destination_path] = 0
+
+    def update_file(
+        self,
+        path_to_file: str,
+        destination_path: str,
+        copied_bytes: int,
+    ) -> None:
+        """Count the bytes of the copy that are copied already."""
+        copy = (path_to_file, destination_path)
+        with self._lock:
+            if copy in self.active_files:
+                self.active_files[copy] = copied_bytes
+
+    def finish_file(self, path_to_file: str, destination_path: str) -> None:
+        """Count the copy that is completed, skipped or failed."""
+        copy = (path_to_file, destination_path)
+        with self._lock:
+            self.active_files.pop(copy, None)
+            self.finished_files += 1
+            self.finished_bytes += self.sizes.get(copy, 0)
+
+    def get_line(self) -> str:
+        """Get the text of the progress."""
+        now = time.monotonic()
+        with self._lock:
+            copied_bytes = self.finished_bytes + sum(
+                self.active_files.values(),
+            )
+            active_count = min(len(self.active_files), self.workers)
+            self._samples.append((now, copied_bytes))
+            while now - self._samples[0][0] > THROUGHPUT_WINDOW:
+                self._samples.popleft()
+            first_time, first_bytes = self._samples[0]
+            if now > first_time:
+                throughput = (copied_bytes - first_bytes) / (now - first_time)
+            else:
+                throughput = 0.0
+            finished_files = self.finished_files
+            total_files = self.total_files
+            total_bytes = self.total_bytes
+        text = (
+            f"{format_size(copied_bytes)} at {format_size(throughput)}/s, "
+            f"workers {active_count}/{self.workers}"
+        )
+        if total_files is None:
+            return f"[{finished_files} files] {text}"
+        if total_bytes:
+            share = min(copied_bytes / total_bytes, 1.0)
+        else:
+            share = finished_files / total_files if total_files else 1.0
+        filled_length = int(round(BAR_LENGTH * share))
+        progress_bar = "=" * filled_length + "-" * (
+            BAR_LENGTH - filled_length
+        )
+        eta = "-:--:--"
+        if throughput and total_bytes is not None:
+            eta = format_duration((total_bytes - copied_bytes) / throughput)
+        return (
+            f"[{progress_bar}] {share * 100:.1f}% "
+            f"{finished_files}/{total_files} files, "
+            f"{text}, ETA {eta}"
+        )
+
+    def _display(self) -> None:
+        """Display the progress until it is stopped."""
+        while not self._stopped.wait(self.interval):
+            self._write(self.get_line())
+
+    def _write(self, line: str) -> None:
+        """Redraw the progress line or write it to the log."""
+        if self.is_terminal:
+            self.stream.write(f"\033[2K{line}\r")
+            self.stream.flush()
+        else:
+            self.logger.info(f"Progress - {line}")
@@ -0,0 +1,242 @@
+import errno
+import heapq
+import itertools
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from files_copier import backends
+
+RESUMED = "resumed"
+
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+VERIFY_BLOCK_SIZE = 1024 * 1024
+
+DEFAULT_RETRYABLE_ERRNOS = frozenset(
+    getattr(errno, name)
+    for name in (
+        "EAGAIN",
+        "EBUSY",
+        "ECONNABORTED",
+        "ECONNRESET",
+        "EHOSTUNREACH",
+        "EINTR",
+        "EIO",
+        "ENETDOWN",
+        "ENETUNREACH",
+        "ENOLCK",
+        "ESTALE",
+        "ETIMEDOUT",
+    )
+    if hasattr(errno, name)
+)
+
+
+class RetryPolicy(object):
+    """Which failed copies are retried and when."""
+
+    def __init__(
+        self,
+        attempts: int = 0,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        retryable_errnos: Optional[Iterable[int]] = None,
+        resume: bool = True,
+    ) -> None:
+        """
+        Initialize the policy.
+
+        Args:
+            attempts (int, optional): maximum number of retries of one file.
+                Defaults to 0 (failed files aren't retried).
+            backoff (float, optional): delay before the first retry
+                in seconds, it is doubled for each next retry.
+                Defaults to 1.
+            max_backoff (float, optional): maximum delay before the retry
+                in seconds. Defaults to 60.
+            retryable_errnos (Iterable[int], optional): error numbers
+                of transient errors. Defaults to None (I/O, network
+                and stale handle errors).
+            resume (bool, optional): the retry keeps the verified part
+                of the partially written copy. Defaults to True.
+
+        Raises:
+            ValueError: if the number of retries or the delays
+                are negative.
+        """
+        if attempts < 0:
+            raise ValueError(
+                f"Number of retries can't be negative - {attempts}",
+            )
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("Delays of retries can't be negative")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        if retryable_errnos is None:
+            retryable_errnos = DEFAULT_RETRYABLE_ERRNOS
+        self.retryable_errnos = frozenset(retryable_errnos)
+        self.resume = resume
+
+    def is_retryable(self, error: OSError, attempt: int) -> bool:
+        """Check that the file is retried after the error of the attempt."""
+        return (
+            attempt < self.attempts
+            and error.errno in self.retryable_errnos
+        )
+
+    def get_delay(self, attempt: int) -> float:
+        """Get the delay in seconds before the retry of the attempt."""
+        return min(self.backoff * 2 ** attempt, self.max_backoff)
+
+
+class RetryQueue(object):
+    """
+    Failed files that wait for their retries.
+
+    The files are ordered by the time of their retries, so the copying
+    of the other files isn't stopped while the delay isn't over.
+    It is used by one thread.
+    """
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        """Initialize the empty queue."""
+        self.policy = policy
+        self.retries = 0
+        self._attempts: Dict[Any, int] = {}
+        self._delayed: List[Tuple[float, int, Any]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        """Get the number of the files that wait for their retries."""
+        return len(self._delayed)
+
+    def clear(self) -> None:
+        """Forget the failed files and their attempts."""
+        self.retries = 0
+        self._attempts.clear()
+        self._delayed.clear()
+
+    def get_attempt(self, task: Any) -> int:
+        """Get the number of retries of the file that are already made."""
+        return self._attempts.get(task, 0)
+
+    def is_resumed(self, task: Any) -> bool:
+        """Check that the copy of the file is resumed by its next attempt."""
+        return self.policy.resume and self.get_attempt(task) > 0
+
+    def count_retry(self, task: Any, error: OSError) -> Optional[float]:
+        """
+        Count the retry of the failed file if it can be retried.
+
+        Returns:
+            Optional[float]: the delay of the retry in seconds.
+                None if the file isn't retried.
+        """
+        attempt = self.get_attempt(task)
+        if not self.policy.is_retryable(error, attempt):
+            self._attempts.pop(task, None)
+            return None
+        self._attempts[task] = attempt + 1
+        self.retries += 1
+        return self.policy.get_delay(attempt)
+
+    def schedule(self, task: Any, error: OSError) -> Optional[float]:
+        """
+        Add the failed file to the queue if it can be retried.
+
+        Returns:
+            Optional[float]: the delay of the retry in seconds.
+                None if the file isn't retried.
+        """
+        delay = self.count_retry(task, error)
+        if delay is None:
+            return None
+        heapq.heappush(
+            self._delayed,
+            (time.monotonic() + delay, next(self._order), task),
+        )
+        return delay
+
+    def pop_ready(self) -> Optional[Any]:
+        """Take the file whose delay is over, None if there is no one."""
+        if self._delayed and self._delayed[0][0] <= time.monotonic():
+            return heapq.heappop(self._delayed)[2]
+        return None
+
+    def get_timeout(self) -> Optional[float]:
+        """Get the seconds until the next retry, None if nothing waits."""
+        if not self._delayed:
+            return None
+        return max(self._delayed[0][0] - time.monotonic(), 0.0)
+
+
+def get_resume_offset(
+    source_file: str,
+    partial_file: str,
+    block_size: int = VERIFY_BLOCK_SIZE,
+) -> int:
+    """
+    Get the size of the beginning of the partial copy that can be kept.
+
+    The partial copy is compared with the copied file block by block
+    up to the first different block, the incomplete last block
+    isn't kept. The copy that isn't smaller than the file
+    (e.g. the preallocated copy of chunks) isn't resumed.
+    """
+    try:
+        source_size = os.path.getsize(source_file)
+        partial_size = os.path.getsize(partial_file)
+    except OSError:
+        return 0
+    if partial_size >= source_size:
+        return 0
+    end = partial_size - partial_size % block_size
+    offset = 0
+    with open(source_file, "rb") as source, open(partial_file, "rb") as copy:
+        while offset < end:
+            if source.read(block_size) != copy.read(block_size):
+                break
+            offset += block_size
+    return offset
+
+
+def resume_copy(
+    source_file: str,
+    partial_file: str,
+    offset: int,
+    limit: Optional[backends.ByteLimit] = None,
+) -> str:
+    """
+    Copy the rest of the file after the kept beginning of the copy.
+
+    Metadata is copied like shutil.copy2 does. The limit is called
+    after each copied block.
+
+    Raises:
+        OSError: if the file can't be copied.
+
+    Returns:
+        str: name of the way of copying.
+    """
+    source_fd = os.open(source_file, os.O_RDONLY)
+    try:
+        file_size = os.fstat(source_fd).st_size
+        destination_fd = os.open(partial_file, os.O_WRONLY)
+        try:
+            os.ftruncate(destination_fd, offset)
+            backends.copy_range(
+                source_fd,
+                destination_fd,
+                offset,
+                file_size - offset,
+                limit=limit,
+            )
+        finally:
+            os.close(destination_fd)
+    finally:
+        os.close(source_fd)
+    shutil.copystat(source_file, partial_file)
+    return RESUMED
@@ -0,0 +1,111 @@
+import collections
+import os
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+DeviceGroup = Tuple[int, int]
+
+UNKNOWN_DEVICE = -1
+
+
+class DeviceScheduler(object):
+    """
+    Order copy tasks by devices of their source and destination.
+
+    Tasks are grouped by the pair of devices (st_dev) of the copied file
+    and of the destination directory. Each group has its own limit
+    of tasks copied at the same time, so the slow device doesn't take
+    all workers while other devices are idle. Inside the group tasks
+    are ordered by directory and inode to read the files in the order
+    they are most likely placed on the disk.
+    """
+
+    def __init__(self, workers_per_device: int) -> None:
+        """
+        Initialize the empty scheduler.
+
+        Args:
+            workers_per_device (int): maximum number of tasks of one
+                group of devices that are copied at the same time.
+
+        Raises:
+            ValueError: if workers_per_device is less than 1.
+        """
+        if workers_per_device < 1:
+            raise ValueError(
+                f"Workers per device must be positive - {workers_per_device}",
+            )
+        self.workers_per_device = workers_per_device
+        self._added: Dict[DeviceGroup, List[Tuple[str, int, int, Any]]] = (
+            collections.defaultdict(list)
+        )
+        self._ready: Dict[DeviceGroup, Deque[Any]] = {}
+        self._running: Dict[DeviceGroup, int] = collections.Counter()
+        self._order: Deque[DeviceGroup] = collections.deque()
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Get the number of tasks that aren't taken yet."""
+        return self._count
+
+    def _get_device(self, path: str) -> Tuple[int, int]:
+        """Get the device and the inode of the path."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return UNKNOWN_DEVICE, 0
+        return stat.st_dev, stat.st_ino
+
+    def add(self, task: Any, path_to_file: str, destination_path: str) -> None:
+        """
+        Add the task to the group of its devices.
+
+        Args:
+            task (Any): copy task that is returned by next_task.
+            path_to_file (str): path to the copied file.
+            destination_path (str): path to the destination directory.
+        """
+        source_device, inode = self._get_device(path_to_file)
+        destination_device, _ = self._get_device(destination_path)
+        group = (source_device, destination_device)
+        if group not in self._added and group not in self._ready:
+            self._order.append(group)
+        self._added[group].append(
+            (os.path.dirname(path_to_file), inode, self._count, task),
+        )
+        self._count += 1
+
+    def _get_ready_tasks(self, group: DeviceGroup) -> Deque[Any]:
+        """Get tasks of the group ordered by directory and inode."""
+        added = self._added.pop(group, None)
+        ready = self._ready.setdefault(group, collections.deque())
+        if added:
+            added.sort(key=lambda item: item[:3])
+            ready.extend(item[3] for item in added)
+        return ready
+
+    def next_task(self) -> Optional[Tuple[DeviceGroup, Any]]:
+        """
+        Take the next task from the groups in turn.
+
+        The groups that copy the maximum number of tasks are skipped.
+
+        Returns:
+            tuple, optional: group of devices and the task, None if
+                there are no tasks or all groups are busy.
+        """
+        for _ in range(len(self._order)):
+            group = self._order[0]
+            self._order.rotate(-1)
+            if self._running[group] >= self.workers_per_device:
+                continue
+            ready = self._get_ready_tasks(group)
+            if not ready:
+                continue
+            self._running[group] += 1
+            self._count -= 1
+            return group, ready.popleft()
+        return None
+
+    def release(self, group: DeviceGroup) -> None:
+        """Mark that the task of the group is copied."""
+        self._running[group] -= 1
@@ -0,0 +1,740 @@
+import collections
+import errno
+import itertools
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+from concurrent import futures
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from files_copier import chunked, throttle, transfer
+from files_copier.copier import FilesCopier
+from files_copier.task import CopyTask
+from files_copier.throttle import Throttle
+from files_copier.validation_cache import ValidationCache
+
+DEFAULT_WORKERS = 4
+DEFAULT_VALIDATION_CACHE_LIFETIME = 60.0
+WAIT_INTERVAL = 0.1
+INLINE_CONFIG = "<inline>"
+UNSUPPORTED_OPTIONS = (
+    "journal_file_path",
+    "workers_per_device",
+    "deduplicate",
+    "deduplicate_content",
+    "allow_hardlinks",
+)
+
+ResultCallback = Callable[
+    [str, str, Optional[transfer.TransferResult]],
+    None,
+]
+
+SUBMIT = "submit"
+STATUS = "status"
+
+ACCEPTED = "accepted"
+FILE = "file"
+FINISHED = "finished"
+ERROR = "error"
+
+
+class JobFilesCopier(FilesCopier):
+    """
+    Copier of one job of the server.
+
+    The files are taken from the configuration file or from the entries
+    sent with the job, and the result of each file is passed
+    to the callback as soon as it is reported.
+    """
+
+    def __init__(
+        self,
+        config_file_path: str,
+        log_file_path: str,
+        entries: Optional[List[dict]] = None,
+        on_result: Optional[ResultCallback] = None,
+        **options,
+    ) -> None:
+        """
+        Initialize the copier of the job.
+
+        Args:
+            config_file_path (str): path to the configuration file.
+                It isn't read if the entries are given.
+            log_file_path (str): path to the log file.
+            entries (List[dict], optional): parameters of the copied files
+                ("name", "source_path" and "destination_path").
+                Defaults to None (the configuration file is read).
+            on_result (Callable, optional): called with the path
+                to the copied file, the destination directory and
+                the result of copying. Defaults to None.
+            options: other arguments of FilesCopier.
+        """
+        super().__init__(config_file_path, log_file_path, **options)
+        self.entries = entries
+        self.on_result = on_result
+        if entries is not None:
+            self.plan_cache = None
+
+    def _iter_file_parameters(self) -> Iterator[CopyTask]:
+        """Get the entries of the job or parse the configuration."""
+        if self.entries is None:
+            yield from super()._iter_file_parameters()
+        else:
+            for entry in self.entries:
+                yield self._get_task(entry)
+
+    def _report_copy(
+        self,
+        path_to_file: str,
+        destination_path: str,
+        result: Optional[transfer.TransferResult],
+    ) -> None:
+        """Write the result to the log and pass it to the callback."""
+        super()._report_copy(path_to_file, destination_path, result)
+        if self.on_result is not None:
+            self.on_result(path_to_file, destination_path, result)
+
+    def close(self) -> None:
+        """Commit the copies of the job and close its manifest."""
+        try:
+            self._commit_writes()
+        finally:
+            self._close_manifest()
+
+
+class CopyJob(object):
+    """Copying job submitted to the server."""
+
+    def __init__(
+        self,
+        job_id: int,
+        copier: JobFilesCopier,
+        events: queue.Queue,
+    ) -> None:
+        """
+        Initialize the job that isn't started yet.
+
+        Args:
+            job_id (int): number of the job.
+            copier (JobFilesCopier): copier of the job files.
+            events (queue.Queue): queue of the events sent to the client.
+        """
+        self.job_id = job_id
+        self.copier = copier
+        self.files = copier.iter_copied_files_from_conf()
+        self.events = events
+        self.in_flight = 0
+        self.is_parsed = False
+        self.is_stopped = False
+
+    def is_finished(self) -> bool:
+        """Check that all files of the job are copied or failed."""
+        return (
+            not self.is_stopped
+            and self.is_parsed
+            and not self.in_flight
+            and not self.copier.retry_queue
+        )
+
+    def get_status(self) -> dict:
+        """Get the state of the job."""
+        return {
+            "job": self.job_id,
+            "config": self.copier.config_file,
+            "in_flight": self.in_flight,
+            "statistics": dict(self.copier.statistics),
+        }
+
+
+class CopierServer(object):
+    """
+    Copy files of the jobs sent to the Unix socket.
+
+    The pool of workers, the cache of the checked directories,
+    the rate limits and the log handlers are shared by all jobs,
+    so they are created once. Files of the running jobs are
+    submitted to the pool in turn, so the large job doesn't block
+    the small ones.
+
+    Each request and each response is one JSON object per line.
+    The job is submitted by {"command": "submit", "config": path}
+    or {"command": "submit", "entries": [...]}, then the events
+    "accepted", "file" (one per copied file) and "finished" are sent
+    back. {"command": "status"} gets the running jobs.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        log_file_path: str,
+        workers: int = DEFAULT_WORKERS,
+        executor: str = "thread",
+        validation_cache_lifetime: Optional[float] = (
+            DEFAULT_VALIDATION_CACHE_LIFETIME
+        ),
+        bytes_per_second: Optional[float] = None,
+        files_per_second: Optional[float] = None,
+        **copier_options,
+    ) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            socket_path (str): path to the Unix socket.
+            log_file_path (str): path to the log file of all jobs.
+            workers (int, optional): number of files copied at the same
+                time by all jobs. Defaults to 4.
+            executor (str, optional): kind of the worker pool,
+                "thread" or "process". Defaults to "thread".
+            validation_cache_lifetime (float, optional): number of seconds
+                during which the result of a directory check is reused
+                by the jobs. Defaults to 60.
+            bytes_per_second (float, optional): maximum number of bytes
+                copied per second by all jobs. Defaults to None.
+            files_per_second (float, optional): maximum number of files
+                copied per second by all jobs. Defaults to None.
+            copier_options: other arguments of FilesCopier
+                used by each job. The journal, copying by devices
+                and deduplication aren't supported by the jobs.
+
+        Raises:
+            ValueError: if the options of the copier are incorrect
+                or aren't supported by the jobs.
+        """
+        unsupported = [
+            name for name in UNSUPPORTED_OPTIONS if copier_options.get(name)
+        ]
+        if unsupported:
+            raise ValueError(
+                "Options aren't supported by the server - "
+                f"{', '.join(unsupported)}",
+            )
+        self.socket_path = socket_path
+        self.log_file_path = log_file_path
+        self.copier_options = dict(
+            copier_options,
+            workers=workers,
+            executor=executor,
+        )
+        # fail on incorrect options before the server is started
+        FilesCopier(INLINE_CONFIG, log_file_path, **self.copier_options)
+        self.workers = workers
+        self.executor_class = FilesCopier.executors[executor]
+        self.is_process_pool = executor == "process"
+        self.validation_cache = ValidationCache(validation_cache_lifetime)
+        self.throttle = Throttle(bytes_per_second, files_per_second)
+        self._jobs: Deque[CopyJob] = collections.deque()
+        self._running_jobs: Dict[int, CopyJob] = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._new_job = threading.Event()
+        self._stopped = threading.Event()
+        self._executor: Optional[futures.Executor] = None
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """
+        Start the pool of workers and listen to the socket.
+
+        Raises:
+            FileExistsError: if the path of the socket is taken
+                by something else than the socket.
+        """
+        _remove_socket(self.socket_path)
+        self._stopped.clear()
+        bytes_per_second = None
+        if self.is_process_pool and self.throttle.bytes.rate:
+            bytes_per_second = self.throttle.bytes.rate / self.workers
+        self._executor = self.executor_class(
+            max_workers=self.workers,
+            initializer=throttle.init_worker,
+            initargs=(False, bytes_per_second),
+        )
+        self._server = socketserver.ThreadingUnixStreamServer(
+            self.socket_path,
+            _get_request_handler(self),
+        )
+        self._server.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self._dispatch, daemon=True),
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def serve_forever(self) -> None:
+        """Start the server and wait until it is stopped."""
+        self.start()
+        try:
+            self._stopped.wait()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop listening, wait for the copied files and stop the workers."""
+        self._stopped.set()
+        self._new_job.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        _remove_socket(self.socket_path)
+
+    def submit(
+        self,
+        config_file_path: Optional[str] = None,
+        entries: Optional[List[dict]] = None,
+    ) -> CopyJob:
+        """
+        Add the job to the running jobs.
+
+        Args:
+            config_file_path (str, optional): path to the configuration
+                file of the job.
+            entries (List[dict], optional): parameters of the copied files
+                if the job doesn't have the configuration file.
+
+        Raises:
+            ValueError: if the path to the configuration file isn't a string
+                or the entries aren't a list of objects with string values.
+
+        Returns:
+            CopyJob: the job, its events are put to its queue.
+        """
+        _check_job(config_file_path, entries)
+        job_id = next(self._job_ids)
+        events: queue.Queue = queue.Queue()
+
+        def put_result(
+            path_to_file: str,
+            destination_path: str,
+            result: Optional[transfer.TransferResult],
+        ) -> None:
+            events.put(_get_file_event(job_id, path_to_file, result))
+
+        copier = JobFilesCopier(
+            config_file_path or INLINE_CONFIG,
+            self.log_file_path,
+            entries=entries,
+            on_result=put_result,
+            **self.copier_options,
+        )
+        copier.validation_cache = self.validation_cache
+        copier.throttle = self.throttle
+        copier.metrics.start()
+        copier._open_manifest()
+        job = CopyJob(job_id, copier, events)
+        events.put({"event": ACCEPTED, "job": job_id})
+        with self._lock:
+            self._jobs.append(job)
+            self._running_jobs[job_id] = job
+        self._new_job.set()
+        return job
+
+    def get_status(self) -> dict:
+        """Get the state of the running jobs."""
+        with self._lock:
+            jobs = [job.get_status() for job in self._running_jobs.values()]
+        return {"event": STATUS, "jobs": jobs}
+
+    def _dispatch(self) -> None:
+        """
+        Submit files of the jobs to the pool in turn and report them.
+
+        No more than two files per worker are submitted at the same
+        time, so the files of the new job are copied soon after it
+        is submitted. The failed files of the job are submitted again
+        when their retries are ready.
+        """
+        submitted: Dict[futures.Future, tuple] = {}
+        max_submitted = self.workers * 2
+        while not self._stopped.is_set() or submitted:
+            waiting_jobs = 0
+            while len(submitted) < max_submitted:
+                if self._stopped.is_set():
+                    break
+                job = self._next_job()
+                if job is None:
+                    break
+                try:
+                    is_submitted = self._submit_next_file(job, submitted)
+                except Exception as error:
+                    # the broken job mustn't stop the other jobs
+                    self._stop_job(job, error)
+                    continue
+                if is_submitted:
+                    waiting_jobs = 0
+                else:
+                    waiting_jobs += 1
+                    if waiting_jobs >= len(self._jobs):
+                        break
+            if not submitted:
+                self._new_job.wait(WAIT_INTERVAL)
+                self._new_job.clear()
+                continue
+            done, _ = futures.wait(
+                submitted,
+                timeout=WAIT_INTERVAL,
+                return_when=futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                job, copied_file = submitted.pop(future)
+                job.in_flight -= 1
+                if job.is_stopped:
+                    continue
+                try:
+                    self._complete_file(job, copied_file, future)
+                except Exception as error:
+                    # e.g. the broken pool, the job is stopped, not the server
+                    self._stop_job(job, error)
+                    continue
+                if job.is_finished():
+                    self._finish_job(job)
+        with self._lock:
+            stopped_jobs = list(self._running_jobs.values())
+            self._running_jobs.clear()
+            self._jobs.clear()
+        for job in stopped_jobs:
+            job.copier.close()
+            job.events.put(
+                {
+                    "event": ERROR,
+                    "job": job.job_id,
+                    "message": "Copier server is stopped",
+                },
+            )
+
+    def _complete_file(
+        self,
+        job: CopyJob,
+        copied_file: CopyTask,
+        future: futures.Future,
+    ) -> None:
+        """
+        Report the copied file or retry it if it is failed.
+
+        Raises:
+            Exception: if the file isn't copied not because of OSError
+                or it can't be reported.
+        """
+        try:
+            result = future.result()
+        except OSError as error:
+            if job.copier._fail_copy(copied_file, error) is not None:
+                self._resume_job(job)
+            return
+        job.copier._complete_copy(
+            copied_file.source_file,
+            copied_file.destination_path,
+            result,
+        )
+
+    def _next_job(self) -> Optional[CopyJob]:
+        """Take the next job in turn."""
+        with self._lock:
+            if not self._jobs:
+                return None
+            job = self._jobs.popleft()
+            self._jobs.append(job)
+            return job
+
+    def _stop_job(self, job: CopyJob, error: Exception) -> None:
+        """Stop the job that can't be copied and send the error."""
+        if job.is_stopped:
+            return
+        job.is_stopped = True
+        with self._lock:
+            if job in self._jobs:
+                self._jobs.remove(job)
+            self._running_jobs.pop(job.job_id, None)
+        job.copier.close()
+        job.copier.logger.error(f"Job {job.job_id} is stopped - {error!r}")
+        job.events.put(
+            {
+                "event": ERROR,
+                "job": job.job_id,
+                "message": f"Job is stopped - {error!r}",
+            },
+        )
+
+    def _resume_job(self, job: CopyJob) -> None:
+        """Take the job in turn again to retry its failed file."""
+        with self._lock:
+            if job.job_id in self._running_jobs and job not in self._jobs:
+                self._jobs.append(job)
+
+    def _submit_next_file(
+        self,
+        job: CopyJob,
+        submitted: Dict[futures.Future, tuple],
+    ) -> bool:
+        """
+        Submit the next file of the job or finish its parsing.
+
+        Returns:
+            bool: False if the job only waits for the retries
+                of its failed files.
+        """
+        copier = job.copier
+        copied_file = copier.retry_queue.pop_ready()
+        if copied_file is None and not job.is_parsed:
+            copied_file = next(job.files, None)
+            job.is_parsed = copied_file is None
+        if copied_file is None:
+            if copier.retry_queue:
+                return False
+            with self._lock:
+                self._jobs.remove(job)
+            if job.is_finished():
+                self._finish_job(job)
+            return True
+        path_to_file = copied_file.source_file
+        copier.throttle.acquire_file(path_to_file)
+        future = self._executor.submit(
+            transfer.copy_file,
+            path_to_file,
+            copied_file.destination_path,
+            copier.transfer_options,
+            self._get_chunks_progress(job, copied_file),
+            copier._get_linked_file(
+                path_to_file,
+                copied_file.destination_path,
+            ),
+            copier.retry_queue.is_resumed(copied_file),
+            self._get_byte_limit(),
+            copied_file.destination_file,
+        )
+        job.in_flight += 1
+        submitted[future] = (job, copied_file)
+        return True
+
+    def _get_chunks_progress(
+        self,
+        job: CopyJob,
+        copied_file: CopyTask,
+    ) -> Optional[chunked.ProgressCallback]:
+        """Get the reporting of the chunks, the processes can't report."""
+        if self.is_process_pool:
+            return None
+        return job.copier._get_chunks_progress(
+            copied_file.source_file,
+            copied_file.destination_path,
+        )
+
+    def _get_byte_limit(self) -> Optional[Callable[[int], None]]:
+        """Get the limit of bytes, the process workers have their own."""
+        if self.is_process_pool:
+            return None
+        return self.throttle.get_byte_limit()
+
+    def _finish_job(self, job: CopyJob) -> None:
+        """Commit the copies of the job and send its summary."""
+        job.copier.close()
+        if not sum(job.copier.statistics.values()):
+            job.copier._log_empty_config()
+        job.copier._finish_copying()
+        with self._lock:
+            self._running_jobs.pop(job.job_id, None)
+        job.events.put(
+            {
+                "event": FINISHED,
+                "job": job.job_id,
+                "statistics": dict(job.copier.statistics),
+            },
+        )
+
+
+def _remove_socket(socket_path: str) -> None:
+    """
+    Remove the socket left by the previous server.
+
+    Raises:
+        FileExistsError: if the path exists and isn't a socket.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(
+            errno.EEXIST,
+            "Path of the socket isn't a socket",
+            socket_path,
+        )
+    os.remove(socket_path)
+
+
+def _check_job(
+    config_file_path: Optional[str],
+    entries: Optional[List[dict]],
+) -> None:
+    """
+    Check the configuration file and the entries sent by the client.
+
+    Raises:
+        ValueError: if they have wrong types.
+    """
+    if config_file_path is not None and not isinstance(config_file_path, str):
+        raise ValueError("Path to the config must be a string")
+    if entries is None:
+        return
+    if not isinstance(entries, list) or not all(
+        isinstance(entry, dict)
+        and all(isinstance(value, str) for value in entry.values())
+        for entry in entries
+    ):
+        raise ValueError(
+            "Entries must be a list of objects with string values",
+        )
+
+
+def _get_file_event(
+    job_id: int,
+    path_to_file: str,
+    result: Optional[transfer.TransferResult],
+) -> dict:
+    """Get the event of the copied file."""
+    if result is None:
+        return {
+            "event": FILE,
+            "job": job_id,
+            "source_file": path_to_file,
+            "status": transfer.FAILED,
+        }
+    return {
+        "event": FILE,
+        "job": job_id,
+        "source_file": path_to_file,
+        "destination_file": result.destination_file,
+        "status": result.status,
+        "backend": result.backend,
+        "bytes": result.size,
+    }
+
+
+def _get_request_handler(server: CopierServer) -> type:
+    """Get the handler of the connections to the server."""
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        """Read the requests and write the events of the jobs."""
+
+        def handle(self) -> None:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    command = request["command"]
+                except (ValueError, KeyError, TypeError):
+                    self.send({"event": ERROR, "message": "Bad request"})
+                    continue
+                if command == STATUS:
+                    self.send(server.get_status())
+                elif command == SUBMIT:
+                    try:
+                        job = server.submit(
+                            request.get("config"),
+                            request.get("entries"),
+                        )
+                    except ValueError as error:
+                        self.send({"event": ERROR, "message": str(error)})
+                        continue
+                    self.send_job_events(job)
+                else:
+                    text = f"Unknown command - {command}"
+                    self.send({"event": ERROR, "message": text})
+
+        def send_job_events(self, job: CopyJob) -> None:
+            while True:
+                event = job.events.get()
+                self.send(event)
+                if event["event"] in (FINISHED, ERROR):
+                    return
+
+        def send(self, event: dict) -> None:
+            self.wfile.write(json.dumps(event).encode() + b"\n")
+            self.wfile.flush()
+
+    return RequestHandler
+
+
+class CopierClient(object):
+    """Client of the copier server."""
+
+    def __init__(self, socket_path: str) -> None:
+        """
+        Connect to the server.
+
+        Raises:
+            OSError: if the server doesn't listen to the socket.
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socket_path)
+        self._file = self._socket.makefile("rwb")
+
+    def submit(
+        self,
+        config_file_path: Optional[str] = None,
+        entries: Optional[List[dict]] = None,
+    ) -> Iterator[dict]:
+        """
+        Submit the job and yield its events until it is finished.
+
+        Args:
+            config_file_path (str, optional): path to the configuration
+                file on the server.
+            entries (List[dict], optional): parameters of the copied files
+                if there is no configuration file.
+
+        Yields:
+            dict: events "accepted", "file" and "finished".
+        """
+        request = {"command": SUBMIT}
+        if config_file_path is not None:
+            request["config"] = config_file_path
+        if entries is not None:
+            request["entries"] = entries
+        self._send(request)
+        while True:
+            event = self._receive()
+            yield event
+            if event["event"] in (FINISHED, ERROR):
+                return
+
+    def status(self) -> dict:
+        """Get the running jobs of the server."""
+        self._send({"command": STATUS})
+        return self._receive()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._file.close()
+        self._socket.close()
+
+    def _send(self, request: dict) -> None:
+        """Send one request."""
+        self._file.write(json.dumps(request).encode() + b"\n")
+        self._file.flush()
+
+    def _receive(self) -> dict:
+        """
+        Receive one event.
+
+        Raises:
+            ConnectionError: if the server closed the connection.
+        """
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Copier server closed the connection")
+        return json.loads(line)
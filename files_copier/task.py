@@ -0,0 +1,81 @@
+import os
+import sys
+
+
+class CopyTask(object):
+    """
+    One file of the configuration that is copied.
+
+    The task has no attribute dictionary, and the directories are interned,
+    so the tasks of the files of one directory share its path. The full
+    paths to the copied file and to its copy are joined once when
+    the task is created.
+    """
+
+    __slots__ = (
+        "name",
+        "source_path",
+        "destination_path",
+        "source_file",
+        "destination_file",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        source_path: str,
+        destination_path: str,
+    ) -> None:
+        """
+        Initialize the task.
+
+        Args:
+            name (str): name of the copied file.
+            source_path (str): path to the directory of the copied file.
+            destination_path (str): path to the directory of the copy.
+        """
+        self.name = name
+        self.source_path = sys.intern(source_path)
+        self.destination_path = sys.intern(destination_path)
+        self.source_file = os.path.join(source_path, name)
+        self.destination_file = os.path.join(
+            destination_path,
+            os.path.basename(self.source_file),
+        )
+
+    def get_parameters(self) -> dict:
+        """Get the parameters of the file as they are in the configuration."""
+        return {
+            "name": self.name,
+            "source_path": self.source_path,
+            "destination_path": self.destination_path,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the file and the directories of the tasks."""
+        if not isinstance(other, CopyTask):
+            return NotImplemented
+        return (
+            self.name == other.name
+            and self.source_path == other.source_path
+            and self.destination_path == other.destination_path
+        )
+
+    def __hash__(self) -> int:
+        """Get the hash of the file and the directories."""
+        return hash((self.name, self.source_path, self.destination_path))
+
+    def __repr__(self) -> str:
+        """Get the representation of the task for the logs and tests."""
+        return (
+            f"CopyTask({self.name!r}, {self.source_path!r}, "
+            f"{self.destination_path!r})"
+        )
+
+    def __getstate__(self) -> tuple:
+        """Get the state of the task for pickling."""
+        return self.name, self.source_path, self.destination_path
+
+    def __setstate__(self, state: tuple) -> None:
+        """Restore the task from its pickled state."""
+        self.__init__(*state)
@@ -0,0 +1,230 @@
+import ctypes
+import os
+import platform
+import threading
+import time
+from typing import Callable, Optional
+
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_SET_SYSCALLS = {
+    "x86_64": 251,
+    "i686": 289,
+    "aarch64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+}
+IDLE_NICENESS = 19
+
+# the limit of bytes of the worker process, it is set by init_worker
+_worker_bytes: Optional["TokenBucket"] = None
+
+
+class TokenBucket(object):
+    """
+    Limit the rate of the operations.
+
+    Tokens are added with the given rate up to the capacity of the bucket.
+    If there aren't enough tokens, the caller waits until they are added.
+    The large request may take more tokens than the capacity, then
+    the next requests wait until the debt is paid off.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        capacity: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the full bucket.
+
+        Args:
+            rate (float, optional): number of tokens added per second.
+                Defaults to None (the rate isn't limited).
+            capacity (float, optional): maximum number of tokens.
+                Defaults to None (the rate for one second).
+        """
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+        self.rate: Optional[float] = None
+        self.capacity: Optional[float] = None
+        self.set_rate(rate, capacity)
+        self._tokens = self.capacity or 0.0
+
+    def set_rate(
+        self,
+        rate: Optional[float],
+        capacity: Optional[float] = None,
+    ) -> None:
+        """
+        Change the rate, also during the copying.
+
+        Raises:
+            ValueError: if the rate or the capacity isn't positive.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Rate must be positive - {rate}")
+        if capacity is not None and capacity <= 0:
+            raise ValueError(f"Capacity must be positive - {capacity}")
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity or rate
+            if self.capacity is not None:
+                self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self) -> None:
+        """Add tokens for the time since the last refill."""
+        now = time.monotonic()
+        if self.rate is not None:
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate,
+            )
+        self._updated_at = now
+
+    def acquire(self, amount: float = 1) -> None:
+        """Take tokens, waiting until they are available."""
+        with self._lock:
+            if self.rate is None:
+                return
+            self._refill()
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class Throttle(object):
+    """
+    Limit bytes and files copied per second by all workers.
+
+    The files are limited when they are started to copy, the bytes
+    are limited after each block copied by the copy loops, so the large
+    file is copied with the limited rate, not at once after the wait.
+    """
+
+    def __init__(
+        self,
+        bytes_per_second: Optional[float] = None,
+        files_per_second: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the limits.
+
+        Args:
+            bytes_per_second (float, optional): maximum number of copied
+                bytes per second. Defaults to None (not limited).
+            files_per_second (float, optional): maximum number of copied
+                files per second. Defaults to None (not limited).
+        """
+        self.bytes = TokenBucket(bytes_per_second)
+        self.files = TokenBucket(files_per_second)
+
+    @property
+    def is_limited(self) -> bool:
+        """Check that one of the limits is set."""
+        return self.bytes.rate is not None or self.files.rate is not None
+
+    def set_limits(
+        self,
+        bytes_per_second: Optional[float] = None,
+        files_per_second: Optional[float] = None,
+    ) -> None:
+        """Change the limits, also during the copying."""
+        self.bytes.set_rate(bytes_per_second)
+        self.files.set_rate(files_per_second)
+
+    def acquire_file(self, path_to_file: str) -> None:
+        """Wait until the file can be started without exceeding the limit."""
+        self.files.acquire()
+
+    def get_byte_limit(self) -> Optional[Callable[[int], None]]:
+        """
+        Get the function that limits the bytes of the copy loops.
+
+        None if the bytes aren't limited.
+        """
+        if self.bytes.rate is None:
+            return None
+        return self.bytes.acquire
+
+
+def init_worker(
+    idle_priority: bool = False,
+    bytes_per_second: Optional[float] = None,
+) -> None:
+    """
+    Initialize the worker of the pool.
+
+    The workers of the process pool can't share the limit of bytes,
+    so each of them gets its own part of the limit.
+
+    Args:
+        idle_priority (bool, optional): lower the priority of the worker.
+            Defaults to False.
+        bytes_per_second (float, optional): limit of bytes of the worker
+            process. Defaults to None (not limited).
+    """
+    global _worker_bytes
+    if idle_priority:
+        set_idle_priority()
+    if bytes_per_second is not None:
+        _worker_bytes = TokenBucket(bytes_per_second)
+
+
+def get_worker_limit() -> Optional[Callable[[int], None]]:
+    """Get the limit of bytes of the worker process, None if it isn't set."""
+    if _worker_bytes is None:
+        return None
+    return _worker_bytes.acquire
+
+
+def set_idle_priority() -> None:
+    """
+    Lower the CPU and I/O priority of the calling thread.
+
+    The niceness is set to the maximum and the I/O scheduling class
+    is set to idle (Linux only), so the copying uses the disks only
+    when other processes don't use them.
+    """
+    try:
+        os.nice(IDLE_NICENESS - os.nice(0))
+    except (AttributeError, OSError):
+        pass
+    syscall_number = IOPRIO_SET_SYSCALLS.get(platform.machine())
+    if platform.system() != "Linux" or syscall_number is None:
+        return
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.syscall(
+            syscall_number,
+            IOPRIO_WHO_PROCESS,
+            0,
+            IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT,
+        )
+    except (AttributeError, OSError):
+        pass
+
+
+def drop_page_cache(file_path: str) -> None:
+    """
+    Advise the kernel to drop the cached pages of the file.
+
+    The copied data doesn't evict the pages other processes use.
+    Dirty pages of the copy are dropped after they are written back.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        file_descriptor = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(file_descriptor)
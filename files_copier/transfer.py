@@ -0,0 +1,502 @@
+import hashlib
+import os
+import shutil
+import time
+from typing import Optional, Sequence
+
+from files_copier import backends as copy_backends
+from files_copier import durability as write_durability
+from files_copier import checksums, chunked, delta, retry, throttle
+
+COPIED = "copied"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class TransferOptions(object):
+    """
+    Options of copying one file.
+
+    The options contain only plain values, so they can be passed
+    to the workers of the process pool.
+    """
+
+    def __init__(
+        self,
+        incremental: bool = False,
+        compare_content: bool = False,
+        modify_window: float = 0,
+        backends: Sequence[str] = copy_backends.DEFAULT_BACKENDS,
+        large_file_threshold: Optional[int] = None,
+        chunk_size: int = chunked.DEFAULT_CHUNK_SIZE,
+        chunk_workers: int = chunked.DEFAULT_CHUNK_WORKERS,
+        allow_hardlinks: bool = False,
+        checksum: Optional[str] = None,
+        verify_checksum: bool = False,
+        drop_cache: bool = False,
+        delta_mode: Optional[str] = None,
+        delta_block_size: int = delta.DEFAULT_BLOCK_SIZE,
+        atomic_writes: bool = False,
+        durability: str = write_durability.NONE,
+        sparse: bool = False,
+    ) -> None:
+        """
+        Initialize options of copying.
+
+        Args:
+            incremental (bool, optional): skip the file if the destination
+                already has the file with the same size and modification
+                time. Defaults to False.
+            compare_content (bool, optional): in the incremental mode also
+                compare hashes of the files content. Defaults to False.
+            modify_window (float, optional): maximum difference in seconds
+                of modification times that are treated as equal,
+                e.g. 1 or 2 for the copies on file systems that round
+                the time. Defaults to 0 (times must be equal).
+            backends (Sequence[str], optional): backends of copying
+                in order of preference. Defaults to all backends
+                from the fastest to the slowest.
+            large_file_threshold (int, optional): files of this size
+                in bytes and larger are copied by chunks in parallel,
+                unless "reflink" is one of the backends and clones them.
+                Defaults to None (all files are copied as a whole).
+            chunk_size (int, optional): size of one chunk of the large file
+                in bytes. Defaults to 64 MiB.
+            chunk_workers (int, optional): number of chunks of the large file
+                copied at the same time. Defaults to 4.
+            allow_hardlinks (bool, optional): the copy of the file
+                that is already copied may be the hardlink to the first
+                copy if it can't be cloned by reflink. Defaults to False.
+            checksum (str, optional): name of the hash algorithm
+                ("sha256", "blake2b" or "crc32"). If it is set, the content
+                is hashed while it is copied through the buffer instead
+                of the backends and the chunks, so it can't be set
+                for sparse copying. Defaults to None.
+            verify_checksum (bool, optional): read the copy again
+                from the disk, not from the page cache, and compare
+                its hash with the hash of the copied data.
+                Defaults to False.
+            drop_cache (bool, optional): drop the copied file and its copy
+                from the page cache after copying. Defaults to False.
+            delta_mode (str, optional): if the copy already exists
+                and the file isn't smaller than the delta block,
+                only the changed blocks are written ("in_place")
+                or the new copy reuses blocks of the old one
+                ("temporary"). Defaults to None (files are rewritten).
+            delta_block_size (int, optional): size of the compared blocks
+                in bytes. Defaults to 1 MiB.
+            atomic_writes (bool, optional): write the copy to the temporary
+                file and rename it to the destination when it is complete.
+                The delta copying builds the new copy instead of updating
+                the old one in place. Defaults to False.
+            durability (str, optional): "none" leaves writing to the disk
+                to the system, "file" syncs each copy before and after
+                the rename, "batch" leaves the copy under the temporary
+                name, so it is synced and renamed by WriteBatch.
+                Defaults to "none".
+            sparse (bool, optional): copy only the ranges of sparse files
+                that have data and keep the holes in the copies. Sparse
+                files aren't split into chunks. The holes would be
+                written as zeros by the checksum copying, so sparse
+                copying can't be used with the checksum.
+                Defaults to False.
+
+        Raises:
+            ValueError: if one of backends, the checksum algorithm,
+                the delta mode or the durability is unknown, chunk size,
+                chunk workers or delta block size isn't positive,
+                the modify window is negative, the durability is set
+                without atomic writes or sparse copying is set with
+                the checksum.
+        """
+        unknown_backends = set(backends) - set(copy_backends.COPY_FUNCTIONS)
+        if unknown_backends:
+            raise ValueError(f"Unknown copy backends - {unknown_backends}")
+        self.incremental = incremental
+        self.compare_content = compare_content
+        if modify_window < 0:
+            raise ValueError(
+                f"Modify window can't be negative - {modify_window}",
+            )
+        self.modify_window = modify_window
+        if chunk_size < 1 or chunk_workers < 1:
+            raise ValueError("Chunk size and chunk workers must be positive")
+        self.backends = tuple(backends)
+        self.large_file_threshold = large_file_threshold
+        self.chunk_size = chunk_size
+        self.chunk_workers = chunk_workers
+        self.allow_hardlinks = allow_hardlinks
+        if checksum is not None:
+            checksums.check_algorithm(checksum)
+        self.checksum = checksum
+        self.size = 0
+        self.seconds = 0.0
+        self.verify_checksum = verify_checksum
+        self.drop_cache = drop_cache
+        if delta_mode is not None and delta_mode not in delta.MODES:
+            raise ValueError(f"Unknown delta mode - {delta_mode}")
+        if delta_block_size < 1:
+            raise ValueError("Delta block size must be positive")
+        self.delta_mode = delta_mode
+        self.delta_block_size = delta_block_size
+        if durability not in write_durability.MODES:
+            raise ValueError(f"Unknown durability - {durability}")
+        if durability != write_durability.NONE and not atomic_writes:
+            raise ValueError("Durability requires atomic writes")
+        self.atomic_writes = atomic_writes
+        self.durability = durability
+        if sparse and checksum is not None:
+            raise ValueError("Sparse copying doesn't support checksums")
+        self.sparse = sparse
+
+
+class TransferResult(object):
+    """Result of copying one file."""
+
+    def __init__(
+        self,
+        status: str,
+        source_file: str,
+        destination_file: str,
+        backend: Optional[str] = None,
+        error: Optional[OSError] = None,
+        checksum: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the result.
+
+        The number of copied bytes, the number of bytes allocated
+        for the copy and the duration of copying are set by copy_file.
+        The number of bytes that aren't written because they are
+        the same in the old copy is set by delta copying, the number
+        of bytes kept from the partial copy is set by resuming.
+        The temporary file is set if the copy should be renamed
+        to the destination file by the batch of writes.
+
+        Args:
+            status (str): COPIED, SKIPPED or FAILED.
+            source_file (str): path to the copied file.
+            destination_file (str): path to the file in the destination.
+            backend (str, optional): name of the backend that copied
+                the file. None if the file isn't copied.
+            error (OSError, optional): the reason why the file
+                isn't copied. None if it isn't failed.
+            checksum (str, optional): hash of the copied content.
+                None if it isn't computed.
+        """
+        self.status = status
+        self.source_file = source_file
+        self.destination_file = destination_file
+        self.backend = backend
+        self.error = error
+        self.checksum = checksum
+        self.size = 0
+        self.seconds = 0.0
+        self.physical_size = 0
+        self.saved_size = 0
+        self.resumed_size = 0
+        self.temporary_file: Optional[str] = None
+
+
+def get_destination_file(path_to_file: str, destination_path: str) -> str:
+    """Get the path to the copy of the file in the destination directory."""
+    return os.path.join(destination_path, os.path.basename(path_to_file))
+
+
+def get_file_digest(file_path: str) -> bytes:
+    """Get sha256 hash of the file content."""
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as hashed_file:
+        for block in iter(lambda: hashed_file.read(READ_BLOCK_SIZE), b""):
+            file_hash.update(block)
+    return file_hash.digest()
+
+
+def is_up_to_date(
+    path_to_file: str,
+    destination_file: str,
+    compare_content: bool = False,
+    modify_window: float = 0,
+) -> bool:
+    """
+    Check that the destination file is the same as the copied file.
+
+    Files are the same if their sizes are equal, their modification
+    times differ by no more than modify_window seconds and,
+    if compare_content is True, their contents hashes are equal.
+    """
+    try:
+        source_stat = os.stat(path_to_file)
+        destination_stat = os.stat(destination_file)
+    except OSError:
+        return False
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    mtime_difference = abs(
+        source_stat.st_mtime_ns - destination_stat.st_mtime_ns,
+    )
+    if mtime_difference > modify_window * 1e9:
+        return False
+    if compare_content:
+        return get_file_digest(path_to_file) == get_file_digest(
+            destination_file,
+        )
+    return True
+
+
+def is_large_file(path_to_file: str, options: TransferOptions) -> bool:
+    """Check that the file should be copied by chunks."""
+    if options.large_file_threshold is None:
+        return False
+    return os.path.getsize(path_to_file) >= options.large_file_threshold
+
+
+def is_delta_file(
+    path_to_file: str,
+    destination_file: str,
+    options: TransferOptions,
+) -> bool:
+    """Check that the file should update the existing copy by blocks."""
+    if options.delta_mode is None or not os.path.isfile(destination_file):
+        return False
+    return os.path.getsize(path_to_file) >= options.delta_block_size
+
+
+def copy_file(
+    path_to_file: str,
+    destination_path: str,
+    options: TransferOptions,
+    progress: Optional[chunked.ProgressCallback] = None,
+    linked_file: Optional[str] = None,
+    resume: bool = False,
+    limit: Optional[copy_backends.ByteLimit] = None,
+    destination_file: Optional[str] = None,
+) -> TransferResult:
+    """
+    Copy one file to the destination directory and measure the copying.
+
+    Args:
+        path_to_file (str): path to the copied file.
+        destination_path (str): path to the destination directory.
+        options (TransferOptions): options of copying.
+        progress (Callable, optional): called after each chunk of the large
+            file is copied. Defaults to None.
+        linked_file (str, optional): already made copy of the same file.
+            The new copy is linked to it if it is possible. Defaults to None.
+        resume (bool, optional): keep the verified beginning
+            of the partial copy left by the failed attempt and copy
+            only the rest of the file. Defaults to False.
+        limit (Callable, optional): called after each copied block,
+            waits while the copying is faster than the limit of bytes.
+            Defaults to None (the limit of the worker process is used
+            if it is set by throttle.init_worker).
+        destination_file (str, optional): path to the copy of the file
+            if it is already joined, e.g. by CopyTask. Defaults to None
+            (the path is joined from the directory and the file name).
+
+    Raises:
+        OSError: if the file can't be copied.
+    """
+    if limit is None:
+        limit = throttle.get_worker_limit()
+    if destination_file is None:
+        destination_file = get_destination_file(path_to_file, destination_path)
+    started_at = time.perf_counter()
+    result = _copy_file(
+        path_to_file,
+        destination_file,
+        options,
+        progress,
+        linked_file,
+        resume,
+        limit,
+    )
+    result.seconds = time.perf_counter() - started_at
+    if result.status == COPIED:
+        written_file = result.temporary_file or result.destination_file
+        file_stat = os.stat(written_file)
+        result.size = file_stat.st_size
+        result.physical_size = copy_backends.get_physical_size(file_stat)
+        if options.drop_cache:
+            throttle.drop_page_cache(path_to_file)
+            throttle.drop_page_cache(written_file)
+    return result
+
+
+def _copy_file(
+    path_to_file: str,
+    destination_file: str,
+    options: TransferOptions,
+    progress: Optional[chunked.ProgressCallback],
+    linked_file: Optional[str],
+    resume: bool,
+    limit: Optional[copy_backends.ByteLimit],
+) -> TransferResult:
+    """
+    Copy one file to its copy in the destination directory.
+
+    The partial copy is resumed only if it is written in place,
+    the temporary file of the atomic writes is removed on failure.
+    """
+    if options.incremental and is_up_to_date(
+        path_to_file,
+        destination_file,
+        options.compare_content,
+        options.modify_window,
+    ):
+        return TransferResult(SKIPPED, path_to_file, destination_file)
+    if not options.atomic_writes:
+        return _write_copy(
+            path_to_file,
+            destination_file,
+            destination_file,
+            options,
+            progress,
+            linked_file,
+            resume,
+            limit,
+        )
+    if os.path.exists(destination_file) and os.path.samefile(
+        path_to_file,
+        destination_file,
+    ):
+        raise shutil.SameFileError(
+            f"{path_to_file} and {destination_file} are the same file",
+        )
+    temporary_file = write_durability.get_temporary_file(destination_file)
+    try:
+        result = _write_copy(
+            path_to_file,
+            destination_file,
+            temporary_file,
+            options,
+            progress,
+            linked_file,
+            limit=limit,
+        )
+        if options.durability == write_durability.BATCH:
+            result.temporary_file = temporary_file
+        else:
+            write_durability.commit_file(
+                temporary_file,
+                destination_file,
+                options.durability,
+            )
+    except BaseException:
+        write_durability.remove_file(temporary_file)
+        raise
+    return result
+
+
+def _write_copy(
+    path_to_file: str,
+    destination_file: str,
+    written_file: str,
+    options: TransferOptions,
+    progress: Optional[chunked.ProgressCallback],
+    linked_file: Optional[str],
+    resume: bool = False,
+    limit: Optional[copy_backends.ByteLimit] = None,
+) -> TransferResult:
+    """
+    Write the copy of the file.
+
+    The copy is written to the destination file or, in the atomic
+    writes mode, to the temporary file.
+    """
+    if linked_file is not None:
+        backend = copy_backends.link_file(
+            linked_file,
+            written_file,
+            options.allow_hardlinks,
+        )
+        if backend is not None:
+            return TransferResult(
+                COPIED,
+                path_to_file,
+                destination_file,
+                backend,
+            )
+    if options.checksum is not None:
+        checksum = checksums.copy(
+            path_to_file,
+            written_file,
+            options.checksum,
+            options.verify_checksum,
+            limit,
+        )
+        return TransferResult(
+            COPIED,
+            path_to_file,
+            destination_file,
+            copy_backends.BUFFERED,
+            checksum=checksum,
+        )
+    if is_delta_file(path_to_file, destination_file, options):
+        result = TransferResult(
+            COPIED,
+            path_to_file,
+            destination_file,
+            delta.DELTA,
+        )
+        if written_file == destination_file:
+            result.saved_size = delta.copy(
+                path_to_file,
+                destination_file,
+                options.delta_block_size,
+                options.delta_mode,
+                limit,
+            )
+        else:
+            result.saved_size = delta.build(
+                path_to_file,
+                destination_file,
+                written_file,
+                options.delta_block_size,
+                limit,
+            )
+        return result
+    is_sparse = options.sparse and copy_backends.is_sparse_file(path_to_file)
+    if resume and not is_sparse:
+        offset = retry.get_resume_offset(path_to_file, written_file)
+        if offset:
+            result = TransferResult(
+                COPIED,
+                path_to_file,
+                destination_file,
+                retry.resume_copy(
+                    path_to_file,
+                    written_file,
+                    offset,
+                    limit,
+                ),
+            )
+            result.resumed_size = offset
+            return result
+    if is_sparse:
+        backend = copy_backends.copy(
+            path_to_file,
+            written_file,
+            copy_backends.get_sparse_backends(options.backends),
+            limit,
+        )
+    elif is_large_file(path_to_file, options):
+        backend = chunked.copy(
+            path_to_file,
+            written_file,
+            chunk_size=options.chunk_size,
+            workers=options.chunk_workers,
+            progress=progress,
+            limit=limit,
+            reflink=copy_backends.REFLINK in options.backends,
+        )
+    else:
+        backend = copy_backends.copy(
+            path_to_file,
+            written_file,
+            options.backends,
+            limit,
+        )
+    return TransferResult(COPIED, path_to_file, destination_file, backend)
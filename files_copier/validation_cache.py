@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ValidationCache(object):
+    """
+    Remember results of directories checks.
+
+    Many files in the configuration usually share a few directories,
+    so each distinct directory is checked only once and the result
+    is reused for the other files until it expires.
+    """
+
+    def __init__(self, lifetime: Optional[float] = None) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            lifetime (float, optional): number of seconds after which
+                the result of a check expires. Defaults to None
+                (the result is kept until the cache is cleared).
+        """
+        self.lifetime = lifetime
+        self._results: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+
+    def check(
+        self,
+        kind: str,
+        directory_path: str,
+        check_directory: Callable[[str], bool],
+    ) -> bool:
+        """
+        Get the result of the directory check.
+
+        Args:
+            kind (str): kind of the check, e.g. "source" or "destination".
+            directory_path (str): path to the checked directory.
+            check_directory (Callable): function that checks the directory
+                if there is no actual result in the cache.
+
+        Returns:
+            bool: result of the check.
+        """
+        key = (kind, os.path.abspath(directory_path))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None:
+            result, checked_at = cached
+            if self.lifetime is None or now - checked_at < self.lifetime:
+                return result
+        result = check_directory(directory_path)
+        with self._lock:
+            self._results[key] = (result, now)
+        return result
+
+    def clear(self) -> None:
+        """Forget results of all checks."""
+        with self._lock:
+            self._results.clear()
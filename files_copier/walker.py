@@ -0,0 +1,172 @@
+import fnmatch
+import os
+import queue
+import threading
+from concurrent import futures
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+DEFAULT_WALK_WORKERS = 4
+RESULTS_QUEUE_SIZE = 10000
+PUT_TIMEOUT = 0.1
+
+_WALK_DONE = object()
+
+
+def _matches_any(relative_path: str, patterns: Sequence[str]) -> bool:
+    """Check that the name or the relative path matches one of patterns."""
+    name = os.path.basename(relative_path)
+    return any(
+        fnmatch.fnmatch(name, pattern)
+        or fnmatch.fnmatch(relative_path, pattern)
+        for pattern in patterns
+    )
+
+
+def is_matched(
+    relative_path: str,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> bool:
+    """
+    Check that the file is matched by the glob patterns.
+
+    The pattern is matched against the name of the file
+    and against its path relative to the walked directory.
+
+    Args:
+        relative_path (str): path relative to the walked directory.
+        include (Sequence[str], optional): the file is matched only
+            if it matches one of these patterns. Defaults to all files.
+        exclude (Sequence[str], optional): the file isn't matched
+            if it matches one of these patterns. Defaults to no files.
+    """
+    if _matches_any(relative_path, exclude):
+        return False
+    return not include or _matches_any(relative_path, include)
+
+
+class _Walk(object):
+    """Scan directories of one tree in the pool of threads."""
+
+    def __init__(
+        self,
+        source_path: str,
+        recursive: bool,
+        include: Sequence[str],
+        exclude: Sequence[str],
+        executor: futures.Executor,
+    ) -> None:
+        """Initialize the state of the walk."""
+        self.source_path = source_path
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.executor = executor
+        self.results: queue.Queue = queue.Queue(RESULTS_QUEUE_SIZE)
+        self.stopped = threading.Event()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _put(self, item: object) -> None:
+        """Put the result, unless the walk is stopped."""
+        while not self.stopped.is_set():
+            try:
+                self.results.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def submit(self, relative_directory: str) -> None:
+        """Scan the directory in the pool."""
+        with self._lock:
+            self._pending += 1
+        self.executor.submit(self._scan, relative_directory)
+
+    def _scan(self, relative_directory: str) -> None:
+        """Put the matched files of the directory and submit subdirectories."""
+        try:
+            directory = os.path.join(self.source_path, relative_directory)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self.stopped.is_set():
+                        return
+                    relative_path = os.path.join(
+                        relative_directory,
+                        entry.name,
+                    )
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive and not _matches_any(
+                            relative_path,
+                            self.exclude,
+                        ):
+                            self.submit(relative_path)
+                    elif entry.is_file() and is_matched(
+                        relative_path,
+                        self.include,
+                        self.exclude,
+                    ):
+                        self._put((relative_directory, entry.name))
+        except OSError as error:
+            self._put(error)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                is_done = not self._pending
+            if is_done:
+                self._put(_WALK_DONE)
+
+
+def walk(
+    source_path: str,
+    recursive: bool = True,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    workers: int = DEFAULT_WALK_WORKERS,
+    on_error: Optional[Callable[[OSError], None]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Find files of the directory tree by scanning directories in parallel.
+
+    Files are yielded as soon as they are found, so their copying
+    can start before the whole tree is scanned. Directories matched
+    by exclude patterns aren't scanned.
+
+    Args:
+        source_path (str): path to the walked directory.
+        recursive (bool, optional): also walk subdirectories.
+            Defaults to True.
+        include (Sequence[str], optional): glob patterns of included files.
+            Defaults to all files.
+        exclude (Sequence[str], optional): glob patterns of excluded files
+            and directories. Defaults to no files.
+        workers (int, optional): number of directories scanned
+            at the same time. Defaults to DEFAULT_WALK_WORKERS.
+        on_error (Callable, optional): called with the error if one
+            of directories can't be scanned, then the walk continues.
+            Defaults to None (the error is raised).
+
+    Raises:
+        OSError: if one of directories can't be scanned
+            and on_error isn't set.
+
+    Yields:
+        tuple: directory relative to the source path ("" for the source
+            path itself) and the name of the file.
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    tree_walk = _Walk(source_path, recursive, include, exclude, executor)
+    try:
+        tree_walk.submit("")
+        while True:
+            result = tree_walk.results.get()
+            if result is _WALK_DONE:
+                break
+            if isinstance(result, OSError):
+                if on_error is None:
+                    raise result
+                on_error(result)
+                continue
+            yield result
+    finally:
+        tree_walk.stopped.set()
+        executor.shutdown(wait=True)
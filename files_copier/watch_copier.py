@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from files_copier import watcher as directory_watcher
+from files_copier.copier import FilesCopier
+from files_copier.task import CopyTask
+
+DEFAULT_DEBOUNCE = 0.5
+MAX_DEBOUNCE_FACTOR = 10
+WAIT_INTERVAL = 0.5
+
+CopyPlan = Dict[Tuple[str, str], CopyTask]
+WatchedRoots = List[Tuple[str, bool]]
+
+
+class WatchFilesCopier(FilesCopier):
+    """
+    Copy files defined in xml config and keep their copies up to date.
+
+    The configuration is loaded once and the source directories
+    of its entries are watched. When the source files are changed,
+    only their entries are copied again. When the configuration
+    is changed, it is loaded again and its new entries are copied.
+    """
+
+    def watch(
+        self,
+        stop: Optional[threading.Event] = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = directory_watcher.DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        """
+        Copy all files, then copy the changed files until it is stopped.
+
+        Args:
+            stop (threading.Event, optional): watching is stopped when
+                the event is set. Defaults to None (watch forever).
+            debounce (float, optional): the files are copied when they
+                aren't changed for this number of seconds, so a burst
+                of writes is copied once. Defaults to 0.5.
+            poll_interval (float, optional): number of seconds between
+                scans of the directories if inotify isn't supported.
+                Defaults to 1.
+            use_inotify (bool, optional): use inotify if it is supported,
+                otherwise the directories are always polled.
+                Defaults to True.
+        """
+        if stop is None:
+            stop = threading.Event()
+        watcher = directory_watcher.create_watcher(use_inotify, poll_interval)
+        try:
+            plan, roots = self._load_plan(watcher)
+            self._sync(list(plan.values()))
+            while not stop.is_set():
+                changed = self._wait_changes(watcher, stop, debounce)
+                if not changed:
+                    continue
+                previous_plan = plan
+                if self._is_plan_changed(changed, plan, roots):
+                    plan, roots = self._load_plan(watcher)
+                self._sync(
+                    self._get_changed_files(changed, plan, previous_plan),
+                )
+        finally:
+            watcher.close()
+
+    def _load_plan(
+        self,
+        watcher: directory_watcher.Watcher,
+    ) -> Tuple[CopyPlan, WatchedRoots]:
+        """
+        Load the copied files from the configuration and watch them.
+
+        Returns:
+            The copied files by their paths and destination directories
+            and the source directories of "directory" entries
+            with their recursive flags.
+        """
+        watcher.clear()
+        config_file = os.path.abspath(self.config_file)
+        watcher.add(os.path.dirname(config_file))
+        roots = []
+        try:
+            for tag, parameters in self._iter_config_entries():
+                source_path = self._get_source_path(parameters)
+                if tag == "directory" and source_path:
+                    recursive = self._is_recursive_directory(parameters)
+                    roots.append((os.path.abspath(source_path), recursive))
+        except (ElementTree.ParseError, FileNotFoundError):
+            pass  # the error is logged when the files are loaded
+        for source_path, recursive in roots:
+            if os.path.isdir(source_path):
+                watcher.add(source_path, recursive)
+        plan: CopyPlan = {}
+        for copied_file in self.iter_copied_files_from_conf():
+            path_to_file = os.path.abspath(copied_file.source_file)
+            plan[path_to_file, copied_file.destination_path] = copied_file
+            watcher.add(os.path.dirname(path_to_file))
+        if not plan:
+            self._log_empty_config()
+        return plan, roots
+
+    def _wait_changes(
+        self,
+        watcher: directory_watcher.Watcher,
+        stop: threading.Event,
+        debounce: float,
+    ) -> Set[str]:
+        """
+        Wait for the changes and collect them until they are stopped.
+
+        The changes are collected no longer than ten debounce intervals,
+        so the constantly changed files are copied too.
+        """
+        changed = watcher.read(WAIT_INTERVAL)
+        deadline = time.monotonic() + debounce * MAX_DEBOUNCE_FACTOR
+        while changed and not stop.is_set() and time.monotonic() < deadline:
+            new_changes = watcher.read(debounce)
+            if not new_changes:
+                break
+            changed |= new_changes
+        return changed
+
+    def _is_plan_changed(
+        self,
+        changed: Set[str],
+        plan: CopyPlan,
+        roots: WatchedRoots,
+    ) -> bool:
+        """
+        Check that the configuration should be loaded again.
+
+        It is loaded if the configuration is changed or new files
+        are added to the watched "directory" entries.
+        """
+        if directory_watcher.RESCAN in changed:
+            return True
+        if os.path.abspath(self.config_file) in changed:
+            return True
+        planned_files = {path_to_file for path_to_file, _ in plan}
+        for path_to_file in changed - planned_files:
+            for source_path, recursive in roots:
+                if recursive:
+                    if path_to_file.startswith(source_path + os.sep):
+                        return True
+                elif os.path.dirname(path_to_file) == source_path:
+                    return True
+        return False
+
+    def _get_changed_files(
+        self,
+        changed: Set[str],
+        plan: CopyPlan,
+        previous_plan: CopyPlan,
+    ) -> List[CopyTask]:
+        """Get the changed files and the files added to the plan."""
+        if directory_watcher.RESCAN in changed:
+            return list(plan.values())
+        return [
+            copied_file
+            for key, copied_file in plan.items()
+            if key[0] in changed or key not in previous_plan
+        ]
+
+    def _sync(self, copied_files: List[CopyTask]) -> None:
+        """Copy the files as one copying."""
+        if not copied_files:
+            return
+        self._start_copying()
+        self._copy_files(copied_files, len(copied_files))
+        self._finish_copying()
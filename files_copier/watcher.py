@@ -0,0 +1,258 @@
+import ctypes
+import os
+import select
+import struct
+import time
+from typing import Dict, Set, Union
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+RESCAN = ""  # all watched files may be changed
+
+
+class PollingWatcher(object):
+    """
+    Find changed files by polling the watched directories.
+
+    The modification time and the size of each file are kept
+    in the index, the changed files are found by comparing
+    the index with the new scan of the directories.
+    """
+
+    def __init__(self, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        """
+        Initialize the empty index.
+
+        Args:
+            interval (float, optional): number of seconds between scans
+                of the directories. Defaults to 1.
+        """
+        self.interval = interval
+        self.directories: Dict[str, bool] = {}
+        self.index: Dict[str, tuple] = {}
+        self._next_scan = time.monotonic() + interval
+
+    def add(self, directory_path: str, recursive: bool = False) -> None:
+        """Watch the directory and index its files."""
+        directory_path = os.path.abspath(directory_path)
+        recursive = recursive or self.directories.get(directory_path, False)
+        self.directories[directory_path] = recursive
+        index: Dict[str, tuple] = {}
+        self._scan(directory_path, recursive, index)
+        for file_path, file_stat in index.items():
+            self.index.setdefault(file_path, file_stat)
+
+    def clear(self) -> None:
+        """
+        Stop watching all directories.
+
+        The index is kept, so the files changed while the directories
+        are watched again are found by the next scan.
+        """
+        self.directories.clear()
+
+    def read(self, timeout: float) -> Set[str]:
+        """
+        Wait for the next scan and get paths to the changed files.
+
+        If the next scan isn't started during the timeout,
+        nothing is changed.
+        """
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(delay, 0))
+        self._next_scan = time.monotonic() + self.interval
+        index: Dict[str, tuple] = {}
+        for directory_path, recursive in self.directories.items():
+            self._scan(directory_path, recursive, index)
+        changed = {
+            file_path
+            for file_path, file_stat in index.items()
+            if self.index.get(file_path) != file_stat
+        }
+        self.index = index
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        self.clear()
+        self.index.clear()
+
+    def _scan(
+        self,
+        directory_path: str,
+        recursive: bool,
+        index: Dict[str, tuple],
+    ) -> None:
+        """Add modification times and sizes of files to the index."""
+        try:
+            entries = list(os.scandir(directory_path))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        self._scan(entry.path, recursive, index)
+                elif entry.is_file():
+                    file_stat = entry.stat()
+                    index[entry.path] = (
+                        file_stat.st_mtime_ns,
+                        file_stat.st_size,
+                    )
+            except OSError:
+                continue
+
+
+class InotifyWatcher(object):
+    """
+    Find changed files by the inotify events of Linux.
+
+    Each directory of the recursively watched tree has its own watch,
+    the watches of new subdirectories are added when they are created.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the inotify instance.
+
+        Raises:
+            OSError: if inotify isn't supported.
+        """
+        try:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            init = self._libc.inotify_init1
+        except (AttributeError, OSError) as error:
+            raise OSError("inotify isn't supported") from error
+        self._fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.directories: Dict[int, str] = {}
+        self.recursive: Dict[int, bool] = {}
+
+    def add(self, directory_path: str, recursive: bool = False) -> None:
+        """Watch the directory and, if recursive is True, its subtree."""
+        directory_path = os.path.abspath(directory_path)
+        self._add_watch(directory_path, recursive)
+        if not recursive:
+            return
+        for path, directories, _ in os.walk(directory_path):
+            for directory_name in directories:
+                self._add_watch(os.path.join(path, directory_name), True)
+
+    def clear(self) -> None:
+        """Stop watching all directories."""
+        for watch_descriptor in self.directories:
+            self._libc.inotify_rm_watch(self._fd, watch_descriptor)
+        self.directories.clear()
+        self.recursive.clear()
+
+    def read(self, timeout: float) -> Set[str]:
+        """Wait for the events and get paths to the changed files."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        changed: Set[str] = set()
+        if not ready:
+            return changed
+        while True:
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            self._parse_events(data, changed)
+        return changed
+
+    def close(self) -> None:
+        """Stop watching and close the inotify instance."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self.directories.clear()
+        self.recursive.clear()
+
+    def _add_watch(self, directory_path: str, recursive: bool) -> None:
+        """Add the watch of one directory."""
+        watch_descriptor = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(directory_path),
+            WATCH_MASK,
+        )
+        if watch_descriptor < 0:
+            return
+        self.directories[watch_descriptor] = directory_path
+        self.recursive[watch_descriptor] = recursive or self.recursive.get(
+            watch_descriptor,
+            False,
+        )
+
+    def _parse_events(self, data: bytes, changed: Set[str]) -> None:
+        """Add paths of the files changed by the events."""
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, length = EVENT_HEADER.unpack_from(
+                data,
+                offset,
+            )
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+                continue
+            directory_path = self.directories.get(watch_descriptor)
+            if directory_path is None:
+                continue
+            if mask & IN_IGNORED:
+                self.directories.pop(watch_descriptor)
+                self.recursive.pop(watch_descriptor)
+                continue
+            path = os.path.join(directory_path, name)
+            if not mask & IN_ISDIR:
+                changed.add(path)
+            elif self.recursive[watch_descriptor]:
+                self.add(path, True)
+                changed.update(_iter_tree_files(path))
+
+
+def _iter_tree_files(directory_path: str) -> Set[str]:
+    """Get paths to all files of the directory tree."""
+    return {
+        os.path.join(path, file_name)
+        for path, _, file_names in os.walk(directory_path)
+        for file_name in file_names
+    }
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def create_watcher(
+    use_inotify: bool = True,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> Watcher:
+    """
+    Create the watcher of directories.
+
+    The inotify watcher is used if it is supported,
+    otherwise the directories are polled.
+    """
+    if use_inotify:
+        try:
+            return InotifyWatcher()
+        except OSError:
+            pass
+    return PollingWatcher(poll_interval)
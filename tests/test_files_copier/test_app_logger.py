@@ -0,0 +1,111 @@
+"""Module with tests for testing the module 'app_logger'."""
+
+import logging
+import queue
+import time
+
+from files_copier import app_logger
+
+
+def test_handlers_are_not_accumulated(tmp_path):
+    log_file_path = str(tmp_path / "test.log")
+    for _ in range(3):
+        logger = app_logger.get_logger("test_accumulated", log_file_path)
+    assert len(logger.handlers) == 1
+
+
+def test_handlers_are_shared(tmp_path):
+    log_file_path = str(tmp_path / "test.log")
+    first = app_logger.get_logger("test_shared_first", log_file_path)
+    second = app_logger.get_logger("test_shared_second", log_file_path)
+    assert first.handlers == second.handlers
+
+
+def test_messages_are_written(tmp_path):
+    log_file_path = tmp_path / "test.log"
+    logger = app_logger.get_logger("test_written", str(log_file_path))
+    logger.info("first message")
+    logger.info("second message")
+    app_logger.flush()
+    lines = log_file_path.read_text().splitlines()
+    assert [line.split(" - ")[1] for line in lines] == [
+        "INFO: first message",
+        "INFO: second message",
+    ]
+
+
+def test_summary_level(tmp_path):
+    log_file_path = tmp_path / "test.log"
+    logger = app_logger.get_logger(
+        "test_summary",
+        str(log_file_path),
+        app_logger.SUMMARY,
+    )
+    logger.info("file message")
+    logger.log(app_logger.SUMMARY, "summary message")
+    logger.error("error message")
+    app_logger.flush()
+    lines = log_file_path.read_text().splitlines()
+    assert [line.split(" - ")[1] for line in lines] == [
+        "SUMMARY: summary message",
+        "ERROR: error message",
+    ]
+
+
+def test_batch_file_handler(tmp_path):
+    log_file_path = tmp_path / "test.log"
+    handler = app_logger.BatchFileHandler(
+        str(log_file_path),
+        capacity=2,
+        interval=60,
+    )
+    record = logging.LogRecord("test", logging.INFO, "", 0, "text", (), None)
+    handler.emit(record)
+    assert log_file_path.read_text() == ""
+    handler.emit(record)
+    assert log_file_path.read_text() == "text\ntext\n"
+    handler.close()
+
+
+def test_idle_listener_flushes_batch(tmp_path):
+    log_file_path = tmp_path / "test.log"
+    handler = app_logger.BatchFileHandler(str(log_file_path), interval=60)
+    messages = queue.SimpleQueue()
+    listener = app_logger.BatchQueueListener(messages, handler, interval=0.05)
+    listener.start()
+    try:
+        record = logging.LogRecord(
+            "test",
+            logging.INFO,
+            "",
+            0,
+            "text",
+            (),
+            None,
+        )
+        messages.put(record)
+        deadline = time.monotonic() + 5
+        while not log_file_path.read_text() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert log_file_path.read_text() == "text\n"
+    finally:
+        listener.stop()
+        handler.close()
+
+
+def test_file_loggers_have_own_levels(tmp_path):
+    log_file_path = tmp_path / "test.log"
+    summary_logger = app_logger.get_file_logger(
+        str(log_file_path),
+        app_logger.SUMMARY,
+    )
+    info_logger = app_logger.get_file_logger(str(log_file_path))
+    info_logger.setLevel(logging.INFO)
+    summary_logger.info("hidden message")
+    info_logger.info("file message")
+    app_logger.flush()
+    lines = log_file_path.read_text().splitlines()
+    assert [line.split(" - ")[1] for line in lines] == [
+        "INFO: file message",
+    ]
+    assert not summary_logger.isEnabledFor(logging.INFO)
@@ -0,0 +1,156 @@
+"""Module with tests for testing the module 'backends'."""
+
+import errno
+import os
+import shutil
+
+import pytest
+
+from files_copier import backends
+
+
+def create_source_file(tmp_path, size: int = 3 * 1024 * 1024 + 7) -> str:
+    """Create the copied file with the random content."""
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(os.urandom(size))
+    return str(source_file)
+
+
+def read_file(file_path: str) -> bytes:
+    """Read the file content."""
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [backends.COPY_FILE_RANGE, backends.SENDFILE, backends.BUFFERED],
+)
+def test_copy_data(tmp_path, backend):
+    source_file = create_source_file(tmp_path)
+    destination_file = str(tmp_path / "destination.bin")
+    used_backend = backends.copy_data(source_file, destination_file, [backend])
+    assert used_backend == backend
+    assert read_file(source_file) == read_file(destination_file)
+
+
+def test_fallback_to_next_backend(tmp_path, monkeypatch):
+    def unsupported(source_fd, destination_fd, limit=None):
+        os.write(destination_fd, b"garbage")
+        raise OSError(backends.errno.EXDEV, "Cross-device link")
+
+    monkeypatch.setitem(backends.COPY_FUNCTIONS, backends.REFLINK, unsupported)
+    source_file = create_source_file(tmp_path, size=10)
+    destination_file = str(tmp_path / "destination.bin")
+    used_backend = backends.copy_data(
+        source_file,
+        destination_file,
+        [backends.REFLINK, backends.BUFFERED],
+    )
+    assert used_backend == backends.BUFFERED
+    assert read_file(source_file) == read_file(destination_file)
+
+
+def test_copy_preserves_metadata(tmp_path):
+    source_file = create_source_file(tmp_path, size=10)
+    os.utime(source_file, ns=(1_000_000_000, 2_000_000_000))
+    destination_file = str(tmp_path / "destination.bin")
+    backends.copy(source_file, destination_file)
+    assert os.stat(destination_file).st_mtime_ns == 2_000_000_000
+
+
+def test_copy_to_itself(tmp_path):
+    source_file = create_source_file(tmp_path, size=10)
+    with pytest.raises(shutil.SameFileError):
+        backends.copy(source_file, source_file)
+
+
+def create_sparse_file(tmp_path) -> str:
+    """Create the file with data between holes."""
+    source_file = str(tmp_path / "sparse.bin")
+    with open(source_file, "wb") as sparse_file:
+        sparse_file.seek(4 * 1024 * 1024)
+        sparse_file.write(b"data" * 1024)
+        sparse_file.truncate(16 * 1024 * 1024)
+    return source_file
+
+
+def test_sparse_copy_keeps_holes(tmp_path):
+    source_file = create_sparse_file(tmp_path)
+    if not backends.is_sparse_file(source_file):
+        pytest.skip("File system doesn't support sparse files")
+    destination_file = str(tmp_path / "destination.bin")
+    used_backend = backends.copy_data(
+        source_file,
+        destination_file,
+        [backends.SPARSE],
+    )
+    assert used_backend == backends.SPARSE
+    assert read_file(source_file) == read_file(destination_file)
+    destination_stat = os.stat(destination_file)
+    assert destination_stat.st_size == 16 * 1024 * 1024
+    assert backends.get_physical_size(destination_stat) < 1024 * 1024
+
+
+def test_sparse_backends_order():
+    assert backends.get_sparse_backends(backends.DEFAULT_BACKENDS) == (
+        backends.REFLINK,
+        backends.SPARSE,
+        backends.COPY_FILE_RANGE,
+        backends.SENDFILE,
+        backends.BUFFERED,
+    )
+    assert backends.get_sparse_backends([backends.BUFFERED]) == (
+        backends.SPARSE,
+        backends.BUFFERED,
+    )
+
+
+def test_copy_range_by_buffer(tmp_path):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"0123456789")
+    destination_file = tmp_path / "destination.bin"
+    destination_file.write_bytes(b"----------")
+    with open(source_file, "rb") as source, open(
+        destination_file,
+        "r+b",
+    ) as destination:
+        backends._copy_range_by_buffer(
+            source.fileno(),
+            destination.fileno(),
+            3,
+            3,
+            4,
+        )
+    assert destination_file.read_bytes() == b"---3456---"
+
+
+@pytest.mark.parametrize("error_number", [errno.EXDEV, errno.EOPNOTSUPP])
+def test_copy_range_falls_back_to_buffer(tmp_path, monkeypatch, error_number):
+    def fail(*args):
+        raise OSError(error_number, os.strerror(error_number))
+
+    monkeypatch.setattr(os, "copy_file_range", fail, raising=False)
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"0123456789")
+    destination_file = tmp_path / "destination.bin"
+    destination_file.write_bytes(b"----------")
+    with open(source_file, "rb") as source, open(
+        destination_file,
+        "r+b",
+    ) as destination:
+        backends.copy_range(source.fileno(), destination.fileno(), 2, 3, 6)
+    assert destination_file.read_bytes() == b"------234-"
+
+
+def test_copy_range_of_truncated_file(tmp_path):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"0123")
+    destination_file = tmp_path / "destination.bin"
+    with open(source_file, "rb") as source, open(
+        destination_file,
+        "wb",
+    ) as destination:
+        with pytest.raises(OSError) as error:
+            backends.copy_range(source.fileno(), destination.fileno(), 0, 10)
+    assert error.value.errno == errno.EIO
@@ -0,0 +1,103 @@
+"""Module with tests for testing the module 'checksums'."""
+
+import hashlib
+import os
+import zlib
+
+import pytest
+
+from files_copier import checksums, transfer
+
+
+@pytest.mark.parametrize(
+    "algorithm",
+    [checksums.SHA256, checksums.BLAKE2B, checksums.CRC32],
+)
+def test_copy_with_checksum(tmp_path, algorithm):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"content" * 100000)
+    destination_file = str(tmp_path / "destination.bin")
+    checksum = checksums.copy(
+        str(source_file),
+        destination_file,
+        algorithm,
+        verify=True,
+    )
+    assert checksum == checksums.get_file_checksum(destination_file, algorithm)
+    with open(destination_file, "rb") as copied_file:
+        assert copied_file.read() == source_file.read_bytes()
+
+
+def test_verified_copy_is_dropped_from_page_cache(tmp_path, monkeypatch):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"x" * (3 * checksums.BUFFER_SIZE + 1))
+    destination_file = str(tmp_path / "destination.bin")
+    calls = []
+    get_file_checksum = checksums.get_file_checksum
+    monkeypatch.setattr(
+        os,
+        "fsync",
+        lambda file_descriptor: calls.append("fsync"),
+    )
+    monkeypatch.setattr(
+        os,
+        "posix_fadvise",
+        lambda *args: calls.append(("fadvise",) + args[1:]),
+        raising=False,
+    )
+
+    def read_copy(file_path, algorithm):
+        calls.append("read")
+        return get_file_checksum(file_path, algorithm)
+
+    monkeypatch.setattr(checksums, "get_file_checksum", read_copy)
+    checksums.copy(
+        str(source_file),
+        destination_file,
+        checksums.SHA256,
+        verify=True,
+    )
+    assert calls == [
+        "fsync",
+        ("fadvise", 0, 0, os.POSIX_FADV_DONTNEED),
+        "read",
+    ]
+
+
+def test_checksums_are_standard(tmp_path):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(b"content")
+    assert checksums.get_file_checksum(
+        str(source_file),
+        checksums.SHA256,
+    ) == hashlib.sha256(b"content").hexdigest()
+    assert checksums.get_file_checksum(
+        str(source_file),
+        checksums.CRC32,
+    ) == f"{zlib.crc32(b'content'):08x}"
+
+
+def test_manifest(tmp_path):
+    (tmp_path / "destination").mkdir()
+    source_file = tmp_path / "source.txt"
+    source_file.write_text("content")
+    manifest_path = tmp_path / "manifest.sha256"
+    options = transfer.TransferOptions(checksum=checksums.SHA256)
+    result = transfer.copy_file(
+        str(source_file),
+        str(tmp_path / "destination"),
+        options,
+    )
+    manifest = checksums.ChecksumManifest(str(manifest_path))
+    manifest.write(result.checksum, result.destination_file)
+    manifest.close()
+    expected = (
+        f"{hashlib.sha256(b'content').hexdigest()}  "
+        f"{result.destination_file}\n"
+    )
+    assert manifest_path.read_text() == expected
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(checksum="md4")
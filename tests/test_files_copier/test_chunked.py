@@ -0,0 +1,82 @@
+"""Module with tests for testing the module 'chunked'."""
+
+import errno
+import os
+
+import pytest
+
+from files_copier import backends, chunked, transfer
+
+
+def read_file(file_path: str) -> bytes:
+    """Read the file content."""
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def test_copy_by_chunks(tmp_path):
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(os.urandom(10 * 1024 + 5))
+    destination_file = str(tmp_path / "destination.bin")
+    reports = []
+    backend = chunked.copy(
+        str(source_file),
+        destination_file,
+        chunk_size=1024,
+        workers=3,
+        progress=lambda *report: reports.append(report),
+    )
+    assert backend == chunked.CHUNKED
+    assert read_file(str(source_file)) == read_file(destination_file)
+    assert len(reports) == 11
+    assert reports[-1] == (11, 11, 10 * 1024 + 5)
+
+
+def test_large_file_is_copied_by_chunks(tmp_path):
+    (tmp_path / "destination").mkdir()
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(os.urandom(4096))
+    options = transfer.TransferOptions(
+        backends=(backends.COPY_FILE_RANGE, backends.BUFFERED),
+        large_file_threshold=4096,
+        chunk_size=1000,
+    )
+    result = transfer.copy_file(
+        str(source_file),
+        str(tmp_path / "destination"),
+        options,
+    )
+    assert result.backend == chunked.CHUNKED
+    assert read_file(result.destination_file) == source_file.read_bytes()
+
+
+@pytest.mark.parametrize("is_supported", [True, False])
+def test_large_file_is_cloned_by_reflink(tmp_path, monkeypatch, is_supported):
+    (tmp_path / "destination").mkdir()
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(os.urandom(4096))
+    reports = []
+
+    def clone(source_fd, destination_fd, limit=None):
+        if not is_supported:
+            raise OSError(errno.EOPNOTSUPP, "Reflink isn't supported")
+        os.write(destination_fd, os.read(source_fd, 4096))
+
+    monkeypatch.setattr(backends, "_copy_by_reflink", clone)
+    options = transfer.TransferOptions(
+        large_file_threshold=4096,
+        chunk_size=1000,
+    )
+    result = transfer.copy_file(
+        str(source_file),
+        str(tmp_path / "destination"),
+        options,
+        progress=lambda *report: reports.append(report),
+    )
+    if is_supported:
+        assert result.backend == backends.REFLINK
+        assert not reports
+    else:
+        assert result.backend == chunked.CHUNKED
+        assert reports[-1] == (5, 5, 4096)
+    assert read_file(result.destination_file) == source_file.read_bytes()
@@ -1,21 +1,15 @@
 """Module with tests for testing the method 'test_copied_files_from_conf'."""
 
+from files_copier.task import CopyTask
+
 
 def test_correct_config(prepare_correct_config):
     copier, paths = prepare_correct_config
     files = copier.get_copied_files_from_conf()
     source_path, destination_path, _, _ = paths
     expected = [
-        {
-            "name": "file_one.txt",
-            "source_path": source_path,
-            "destination_path": destination_path,
-        },
-        {
-            "name": "file_two.txt",
-            "source_path": source_path,
-            "destination_path": destination_path,
-        },
+        CopyTask("file_one.txt", source_path, destination_path),
+        CopyTask("file_two.txt", source_path, destination_path),
     ]
     assert files == expected
 
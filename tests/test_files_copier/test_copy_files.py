@@ -1,17 +1,140 @@
 """Module with tests for testing the method 'test_copy_files'."""
 
+import json
 import os
 
+import pytest
+
+from files_copier.copier import FilesCopier
+from files_copier.journal import CopyJournal
+
 
 def test_correct_config(remove_files_in_destination, prepare_correct_config):
     copier, paths = prepare_correct_config
     _, destination_path, _, _ = paths
     copier.copy_files()
-    files_in_destination = os.listdir(destination_path)
+    files_in_destination = sorted(os.listdir(destination_path))
+    expected = ["file_one.txt", "file_two.txt"]
+    assert files_in_destination == expected
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"workers": 4, "executor": "thread"},
+        {"workers": 4, "executor": "process"},
+        {"workers": 1, "stream": True},
+        {"workers": 4, "stream": True},
+        {"workers": 2, "workers_per_device": 1},
+        {"workers": 2, "deduplicate_content": True},
+        {"workers": 1, "files_per_second": 1000, "idle_priority": True},
+        {"workers": 2, "executor": "process", "bytes_per_second": 10 ** 9},
+        {"workers": 2, "bytes_per_second": 10 ** 9},
+    ],
+)
+def test_correct_config_with_parameters(
+    remove_files_in_destination,
+    prepare_correct_config,
+    parameters,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    copier = FilesCopier(config_file_path, log_file_path, **parameters)
+    copier.copy_files()
+    files_in_destination = sorted(os.listdir(destination_path))
     expected = ["file_one.txt", "file_two.txt"]
     assert files_in_destination == expected
 
 
+def test_copying_is_resumed_from_journal(
+    tmp_path,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    source_path, destination_path, config_file_path, log_file_path = paths
+    journal_file_path = str(tmp_path / "journal.db")
+    journal = CopyJournal(journal_file_path, config_file_path)
+    journal.record(os.path.join(source_path, "file_one.txt"), destination_path)
+    journal.close()
+    copier = FilesCopier(
+        config_file_path,
+        log_file_path,
+        journal_file_path=journal_file_path,
+    )
+    copier.copy_files()
+    assert os.listdir(destination_path) == ["file_two.txt"]
+    assert copier.statistics == {"copied": 1, "skipped": 1}
+
+
+def test_directory_entry(tmp_path):
+    source_path = tmp_path / "source"
+    (source_path / "sub").mkdir(parents=True)
+    (source_path / "one.txt").write_text("one")
+    (source_path / "two.log").write_text("two")
+    (source_path / "sub" / "three.txt").write_text("three")
+    destination_path = tmp_path / "destination"
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text(
+        f"""<?xml version="1.0"?>
+        <files>
+            <directory>
+                <source_path>{source_path}</source_path>
+                <destination_path>{destination_path}</destination_path>
+                <include>*.txt</include>
+            </directory>
+        </files>""",
+    )
+    copier = FilesCopier(
+        str(config_file_path),
+        str(tmp_path / "copier.log"),
+        workers=2,
+        stream=True,
+    )
+    copier.copy_files()
+    assert (destination_path / "one.txt").read_text() == "one"
+    assert (destination_path / "sub" / "three.txt").read_text() == "three"
+    assert not (destination_path / "two.log").exists()
+
+
+def test_metrics_reports(
+    tmp_path,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, _, config_file_path, log_file_path = paths
+    copier = FilesCopier(
+        config_file_path,
+        log_file_path,
+        workers=2,
+        metrics_json_path=str(tmp_path / "report.json"),
+        metrics_prometheus_path=str(tmp_path / "report.prom"),
+    )
+    copier.copy_files()
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["files"] == {"copied": 2}
+    assert report["latency_seconds"]["parse"]["count"] == 2
+    assert report["latency_seconds"]["validate"]["count"] == 2
+    assert (tmp_path / "report.prom").exists()
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"workers": 0},
+        {"executor": "fiber"},
+        {"workers_per_device": 0},
+        {"workers": 1, "workers_per_device": 2},
+    ],
+)
+def test_incorrect_workers_parameters(prepare_correct_config, parameters):
+    _, paths = prepare_correct_config
+    _, _, config_file_path, log_file_path = paths
+    with pytest.raises(ValueError):
+        FilesCopier(config_file_path, log_file_path, **parameters)
+
+
 def test_config_with_incorrect_parameters(
     remove_files_in_destination,
     prepare_config_with_incorrect_parameters,
@@ -51,3 +174,45 @@ def test_empty_config(remove_files_in_destination, prepare_empty_config):
         copier.copy_files()
     except SystemExit:
         assert True
+
+
+def test_empty_config_in_streaming_mode(
+    remove_files_in_destination,
+    prepare_empty_config,
+):
+    _, paths = prepare_empty_config
+    _, _, config_file_path, log_file_path = paths
+    copier = FilesCopier(config_file_path, log_file_path, stream=True)
+    with pytest.raises(SystemExit):
+        copier.copy_files()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_truncated_config(tmp_path, stream):
+    source_path = tmp_path / "source"
+    source_path.mkdir()
+    (source_path / "one.txt").write_text("one")
+    destination_path = tmp_path / "destination"
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text(
+        f"""<?xml version="1.0"?>
+        <files>
+            <file>
+                <name>one.txt</name>
+                <source_path>{source_path}</source_path>
+                <destination_path>{destination_path}</destination_path>
+            </file>
+            <file>
+                <name>two.txt""",
+    )
+    copier = FilesCopier(
+        str(config_file_path),
+        str(tmp_path / "copier.log"),
+        stream=stream,
+    )
+    if stream:
+        copier.copy_files()
+    else:
+        with pytest.raises(SystemExit):
+            copier.copy_files()
+    assert (destination_path / "one.txt").exists() == stream
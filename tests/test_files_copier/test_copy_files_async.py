@@ -0,0 +1,198 @@
+"""Module with tests for testing the method 'copy_files_async'."""
+
+import asyncio
+import errno
+import os
+import threading
+
+import pytest
+
+from files_copier import checksums, durability, transfer
+from files_copier.async_copier import AsyncFilesCopier
+from files_copier.journal import CopyJournal
+
+
+def copy_files(
+    config_file_path: str,
+    log_file_path: str,
+    **options,
+) -> list:
+    """Collect results of the asynchronous copying."""
+
+    async def collect_results() -> list:
+        copier = AsyncFilesCopier(
+            config_file_path,
+            log_file_path,
+            workers=2,
+            **options,
+        )
+        return [result async for result in copier.copy_files_async()]
+
+    return asyncio.run(collect_results())
+
+
+def test_correct_config(remove_files_in_destination, prepare_correct_config):
+    _, paths = prepare_correct_config
+    source_path, destination_path, config_file_path, log_file_path = paths
+    results = copy_files(config_file_path, log_file_path)
+    copied_files = sorted(result.source_file for result in results)
+    expected = [
+        os.path.join(source_path, "file_one.txt"),
+        os.path.join(source_path, "file_two.txt"),
+    ]
+    assert copied_files == expected
+    assert {result.status for result in results} == {transfer.COPIED}
+    assert sorted(os.listdir(destination_path)) == [
+        "file_one.txt",
+        "file_two.txt",
+    ]
+
+
+def test_empty_config(prepare_empty_config):
+    _, paths = prepare_empty_config
+    _, _, config_file_path, log_file_path = paths
+    assert copy_files(config_file_path, log_file_path) == []
+
+
+def test_stopped_iteration(
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, _, config_file_path, log_file_path = paths
+
+    async def take_first_result() -> transfer.TransferResult:
+        copier = AsyncFilesCopier(config_file_path, log_file_path)
+        results = copier.copy_files_async()
+        first_result = await results.__anext__()
+        await results.aclose()
+        return first_result
+
+    result = asyncio.run(take_first_result())
+    assert result.status == transfer.COPIED
+
+
+def test_failed_files_are_retried(
+    monkeypatch,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    copy_file = transfer.copy_file
+    failed_files = []
+
+    def fail_once(path_to_file, *args):
+        if path_to_file not in failed_files:
+            failed_files.append(path_to_file)
+            raise OSError(errno.EIO, "I/O error", path_to_file)
+        return copy_file(path_to_file, *args)
+
+    monkeypatch.setattr(transfer, "copy_file", fail_once)
+    results = copy_files(
+        config_file_path,
+        log_file_path,
+        retry_attempts=1,
+        retry_backoff=0,
+    )
+    assert [result.status for result in results] == [transfer.COPIED] * 2
+    assert sorted(os.listdir(destination_path)) == [
+        "file_one.txt",
+        "file_two.txt",
+    ]
+
+
+def test_batch_is_committed_outside_event_loop(
+    monkeypatch,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    commit_writes = AsyncFilesCopier._commit_writes
+    commit_threads = set()
+
+    def commit_in_thread(self):
+        commit_threads.add(threading.get_ident())
+        commit_writes(self)
+
+    monkeypatch.setattr(AsyncFilesCopier, "_commit_writes", commit_in_thread)
+    results = copy_files(
+        config_file_path,
+        log_file_path,
+        atomic_writes=True,
+        durability_mode=durability.BATCH,
+        durability_batch_files=1,
+    )
+    assert [result.status for result in results] == [transfer.COPIED] * 2
+    assert sorted(os.listdir(destination_path)) == [
+        "file_one.txt",
+        "file_two.txt",
+    ]
+    assert commit_threads
+    assert threading.get_ident() not in commit_threads
+
+
+def test_copying_is_resumed_from_journal(
+    tmp_path,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    source_path, destination_path, config_file_path, log_file_path = paths
+    journal_file_path = str(tmp_path / "journal.db")
+    journal = CopyJournal(journal_file_path, config_file_path)
+    journal.record(os.path.join(source_path, "file_one.txt"), destination_path)
+    journal.close()
+    results = copy_files(
+        config_file_path,
+        log_file_path,
+        journal_file_path=journal_file_path,
+    )
+    assert [result.source_file for result in results] == [
+        os.path.join(source_path, "file_two.txt"),
+    ]
+    assert os.listdir(destination_path) == ["file_two.txt"]
+    journal = CopyJournal(journal_file_path, config_file_path)
+    assert not journal.is_completed(
+        os.path.join(source_path, "file_one.txt"),
+        destination_path,
+    )
+    journal.close()
+
+
+def test_checksums_are_written_to_manifest(
+    tmp_path,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    manifest_path = tmp_path / "manifest.sha256"
+    results = copy_files(
+        config_file_path,
+        log_file_path,
+        checksum=checksums.SHA256,
+        checksum_manifest_path=str(manifest_path),
+    )
+    expected = sorted(
+        f"{result.checksum}  {result.destination_file}" for result in results
+    )
+    assert sorted(manifest_path.read_text().splitlines()) == expected
+    assert len(expected) == 2
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"deduplicate": True},
+        {"deduplicate_content": True},
+        {"allow_hardlinks": True},
+        {"workers_per_device": 1},
+    ],
+)
+def test_unsupported_options(prepare_correct_config, options):
+    _, paths = prepare_correct_config
+    _, _, config_file_path, log_file_path = paths
+    with pytest.raises(ValueError):
+        AsyncFilesCopier(config_file_path, log_file_path, **options)
@@ -0,0 +1,64 @@
+"""Module with tests for testing the module 'dedup'."""
+
+import os
+
+from files_copier import backends, transfer
+from files_copier.dedup import Deduplicator
+
+
+def create_file(tmp_path, name: str, text: str) -> str:
+    """Create the file in the temporary directory."""
+    file_path = tmp_path / name
+    file_path.write_text(text)
+    return str(file_path)
+
+
+def test_same_inode_is_copied_once(tmp_path):
+    path_to_file = create_file(tmp_path, "file.txt", "text")
+    deduplicator = Deduplicator()
+    deduplicator.add("first", path_to_file, "/first")
+    deduplicator.add("second", path_to_file, "/second")
+    assert deduplicator.split() == (["first"], ["second"])
+    assert deduplicator.get_linked_file(path_to_file, "/second") is None
+    deduplicator.set_copied(path_to_file, "/first", "/first/file.txt")
+    assert deduplicator.get_linked_file(path_to_file, "/second") == (
+        "/first/file.txt"
+    )
+
+
+def test_same_content_is_copied_once(tmp_path):
+    file_one = create_file(tmp_path, "one.txt", "text")
+    file_two = create_file(tmp_path, "two.txt", "text")
+    file_three = create_file(tmp_path, "three.txt", "TEXT")
+    deduplicator = Deduplicator(compare_content=True)
+    deduplicator.add("one", file_one, "/destination")
+    deduplicator.add("two", file_two, "/destination")
+    deduplicator.add("three", file_three, "/destination")
+    assert deduplicator.split() == (["one", "three"], ["two"])
+
+
+def test_different_files_are_copied(tmp_path):
+    file_one = create_file(tmp_path, "one.txt", "text")
+    file_two = create_file(tmp_path, "two.txt", "text")
+    deduplicator = Deduplicator()
+    deduplicator.add("one", file_one, "/destination")
+    deduplicator.add("two", file_two, "/destination")
+    assert deduplicator.split() == (["one", "two"], [])
+
+
+def test_copy_is_linked_to_first_copy(tmp_path):
+    (tmp_path / "destination").mkdir()
+    path_to_file = create_file(tmp_path, "file.txt", "text")
+    first_copy = create_file(tmp_path, "copy.txt", "text")
+    options = transfer.TransferOptions(allow_hardlinks=True)
+    result = transfer.copy_file(
+        path_to_file,
+        str(tmp_path / "destination"),
+        options,
+        linked_file=first_copy,
+    )
+    assert result.backend in (backends.REFLINK, backends.HARDLINK)
+    with open(result.destination_file) as copied_file:
+        assert copied_file.read() == "text"
+    if result.backend == backends.HARDLINK:
+        assert os.path.samefile(result.destination_file, first_copy)
@@ -0,0 +1,101 @@
+"""Module with tests for testing the module 'delta'."""
+
+import os
+
+import pytest
+
+from files_copier import delta, transfer
+
+BLOCK_SIZE = 1024
+
+
+def write_files(tmp_path, source: bytes, destination: bytes) -> tuple:
+    """Write the copied file and its old copy."""
+    source_file = tmp_path / "source.bin"
+    source_file.write_bytes(source)
+    destination_file = tmp_path / "destination.bin"
+    destination_file.write_bytes(destination)
+    return str(source_file), str(destination_file)
+
+
+@pytest.mark.parametrize("mode", delta.MODES)
+def test_only_changed_blocks_are_written(tmp_path, mode):
+    old_content = os.urandom(BLOCK_SIZE * 10)
+    new_content = bytearray(old_content)
+    new_content[BLOCK_SIZE * 3 + 5] ^= 0xFF
+    source_file, destination_file = write_files(
+        tmp_path,
+        bytes(new_content),
+        old_content,
+    )
+    saved_size = delta.copy(source_file, destination_file, BLOCK_SIZE, mode)
+    assert saved_size == BLOCK_SIZE * 9
+    with open(destination_file, "rb") as copy:
+        assert copy.read() == new_content
+    assert sorted(os.listdir(tmp_path)) == ["destination.bin", "source.bin"]
+
+
+@pytest.mark.parametrize("mode", delta.MODES)
+def test_copy_is_truncated_and_extended(tmp_path, mode):
+    old_content = os.urandom(BLOCK_SIZE * 4)
+    source_file, destination_file = write_files(
+        tmp_path,
+        old_content[:BLOCK_SIZE * 2 + 10],
+        old_content,
+    )
+    assert delta.copy(source_file, destination_file, BLOCK_SIZE, mode) == (
+        BLOCK_SIZE * 2
+    )
+    with open(destination_file, "rb") as copy:
+        assert copy.read() == old_content[:BLOCK_SIZE * 2 + 10]
+    source_file, destination_file = write_files(
+        tmp_path,
+        old_content,
+        old_content[:BLOCK_SIZE],
+    )
+    assert delta.copy(source_file, destination_file, BLOCK_SIZE, mode) == (
+        BLOCK_SIZE
+    )
+    with open(destination_file, "rb") as copy:
+        assert copy.read() == old_content
+
+
+def test_moved_blocks_are_reused_through_temporary(tmp_path):
+    first, second = os.urandom(BLOCK_SIZE), os.urandom(BLOCK_SIZE)
+    source_file, destination_file = write_files(
+        tmp_path,
+        second + first,
+        first + second,
+    )
+    saved_size = delta.copy(
+        source_file,
+        destination_file,
+        BLOCK_SIZE,
+        delta.TEMPORARY,
+    )
+    assert saved_size == BLOCK_SIZE * 2
+    with open(destination_file, "rb") as copy:
+        assert copy.read() == second + first
+
+
+def test_delta_copying_by_transfer(tmp_path):
+    old_content = os.urandom(BLOCK_SIZE * 4)
+    source_file, _ = write_files(tmp_path, old_content, b"")
+    destination_path = tmp_path / "destination"
+    destination_path.mkdir()
+    (destination_path / "source.bin").write_bytes(
+        old_content[:BLOCK_SIZE * 3],
+    )
+    options = transfer.TransferOptions(
+        delta_mode=delta.IN_PLACE,
+        delta_block_size=BLOCK_SIZE,
+    )
+    result = transfer.copy_file(source_file, str(destination_path), options)
+    assert result.backend == delta.DELTA
+    assert result.saved_size == BLOCK_SIZE * 3
+    assert result.size == BLOCK_SIZE * 4
+
+
+def test_incorrect_delta_mode():
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(delta_mode="unknown")
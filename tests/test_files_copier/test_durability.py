@@ -0,0 +1,98 @@
+"""Module with tests for testing the atomic writes and their durability."""
+
+import os
+
+import pytest
+
+from files_copier import durability, transfer
+from files_copier.copier import FilesCopier
+from files_copier.durability import WriteBatch
+
+
+def test_batch_renames_copies_on_commit(tmp_path):
+    batch = WriteBatch(max_files=2, max_interval=60)
+    temporary_file = tmp_path / ".file.txt.part"
+    temporary_file.write_text("content")
+    destination_file = tmp_path / "file.txt"
+    assert batch.add(str(temporary_file), str(destination_file), 1) is False
+    assert not destination_file.exists()
+    missing_file = str(tmp_path / ".missing.part")
+    assert batch.add(missing_file, str(tmp_path / "missing.txt"), 2) is True
+    results = batch.commit()
+    assert results[0] == (1, None)
+    assert results[1][0] == 2
+    assert isinstance(results[1][1], OSError)
+    assert destination_file.read_text() == "content"
+    assert not temporary_file.exists()
+    assert len(batch) == 0
+
+
+def test_batch_is_full_after_interval(tmp_path):
+    batch = WriteBatch(max_files=100, max_interval=0)
+    assert not batch.is_full()
+    assert batch.add("temporary", "destination", None) is True
+
+
+@pytest.mark.parametrize("durability_mode", [durability.NONE, durability.FILE])
+def test_atomic_copy(tmp_path, durability_mode):
+    source_file = tmp_path / "file.txt"
+    source_file.write_text("new")
+    destination_path = tmp_path / "destination"
+    destination_path.mkdir()
+    (destination_path / "file.txt").write_text("old")
+    options = transfer.TransferOptions(
+        atomic_writes=True,
+        durability=durability_mode,
+    )
+    result = transfer.copy_file(
+        str(source_file),
+        str(destination_path),
+        options,
+    )
+    assert result.temporary_file is None
+    assert (destination_path / "file.txt").read_text() == "new"
+    assert os.listdir(destination_path) == ["file.txt"]
+
+
+def test_failed_atomic_copy_keeps_old_copy(tmp_path):
+    destination_path = tmp_path / "destination"
+    destination_path.mkdir()
+    (destination_path / "file.txt").write_text("old")
+    options = transfer.TransferOptions(atomic_writes=True)
+    with pytest.raises(OSError):
+        transfer.copy_file(
+            str(tmp_path / "file.txt"),
+            str(destination_path),
+            options,
+        )
+    assert os.listdir(destination_path) == ["file.txt"]
+    assert (destination_path / "file.txt").read_text() == "old"
+
+
+def test_durability_requires_atomic_writes():
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(durability=durability.BATCH)
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(atomic_writes=True, durability="unknown")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_copier_commits_batch(
+    remove_files_in_destination,
+    prepare_correct_config,
+    workers,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    copier = FilesCopier(
+        config_file_path,
+        log_file_path,
+        workers=workers,
+        atomic_writes=True,
+        durability_mode=durability.BATCH,
+        durability_batch_files=1,
+    )
+    copier.copy_files()
+    files_in_destination = sorted(os.listdir(destination_path))
+    assert files_in_destination == ["file_one.txt", "file_two.txt"]
+    assert copier.statistics[transfer.COPIED] == 2
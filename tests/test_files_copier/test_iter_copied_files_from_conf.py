@@ -0,0 +1,43 @@
+"""Module with tests for testing the method 'iter_copied_files_from_conf'."""
+
+import types
+
+from files_copier.task import CopyTask
+
+
+def test_correct_config(prepare_correct_config):
+    copier, paths = prepare_correct_config
+    files = copier.iter_copied_files_from_conf()
+    source_path, destination_path, _, _ = paths
+    expected = [
+        CopyTask("file_one.txt", source_path, destination_path),
+        CopyTask("file_two.txt", source_path, destination_path),
+    ]
+    assert isinstance(files, types.GeneratorType)
+    assert list(files) == expected
+
+
+def test_config_with_incorrect_parameters(
+    prepare_config_with_incorrect_parameters,
+):
+    copier, _ = prepare_config_with_incorrect_parameters
+    files = copier.iter_copied_files_from_conf()
+    assert list(files) == []
+
+
+def test_config_with_nonexistent_file(prepare_config_with_nonexistent_file):
+    copier, _ = prepare_config_with_nonexistent_file
+    files = copier.iter_copied_files_from_conf()
+    assert list(files) == []
+
+
+def test_incorrect_config(prepare_incorrect_config):
+    copier, _ = prepare_incorrect_config
+    files = copier.iter_copied_files_from_conf()
+    assert list(files) == []
+
+
+def test_empty_config(prepare_empty_config):
+    copier, _ = prepare_empty_config
+    files = copier.iter_copied_files_from_conf()
+    assert list(files) == []
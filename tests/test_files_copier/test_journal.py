@@ -0,0 +1,34 @@
+"""Module with tests for testing the class 'CopyJournal'."""
+
+from files_copier.journal import CopyJournal
+
+
+def test_recorded_file_is_completed(tmp_path):
+    journal_file_path = str(tmp_path / "journal.db")
+    journal = CopyJournal(journal_file_path, "config.xml")
+    journal.record("/source/file.txt", "/destination")
+    journal.close()
+
+    journal = CopyJournal(journal_file_path, "config.xml")
+    assert journal.is_completed("/source/file.txt", "/destination") is True
+    assert journal.is_completed("/source/file.txt", "/other") is False
+    journal.close()
+
+
+def test_journals_of_configs_are_separated(tmp_path):
+    journal_file_path = str(tmp_path / "journal.db")
+    journal = CopyJournal(journal_file_path, "config.xml")
+    journal.record("/source/file.txt", "/destination")
+    journal.close()
+
+    journal = CopyJournal(journal_file_path, "other_config.xml")
+    assert journal.is_completed("/source/file.txt", "/destination") is False
+    journal.close()
+
+
+def test_finish(tmp_path):
+    journal = CopyJournal(str(tmp_path / "journal.db"), "config.xml")
+    journal.record("/source/file.txt", "/destination")
+    journal.finish()
+    assert journal.is_completed("/source/file.txt", "/destination") is False
+    journal.close()
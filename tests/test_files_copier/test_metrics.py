@@ -0,0 +1,57 @@
+"""Module with tests for testing the class 'JobMetrics'."""
+
+import json
+
+from files_copier import metrics
+
+
+def make_metrics() -> metrics.JobMetrics:
+    """Make the metrics of the job that copied 100 files."""
+    job_metrics = metrics.JobMetrics(slowest_files_count=2)
+    job_metrics.start()
+    for num in range(1, 101):
+        job_metrics.record(metrics.PARSE, 0.001)
+        job_metrics.record_copy(
+            f"file{num}.txt",
+            "copied",
+            seconds=num / 100,
+            size=10,
+            backend="buffered",
+        )
+    job_metrics.finish()
+    return job_metrics
+
+
+def test_summary():
+    summary = make_metrics().get_summary()
+    assert summary["files"] == {"copied": 100}
+    assert summary["bytes"] == 1000
+    assert summary["backends"] == {"buffered": 100}
+    latency = summary["latency_seconds"][metrics.COPY]
+    assert (latency["p50"], latency["p95"], latency["p99"]) == (
+        0.5,
+        0.95,
+        0.99,
+    )
+    assert [file["file"] for file in summary["slowest_files"]] == [
+        "file100.txt",
+        "file99.txt",
+    ]
+
+
+def test_write_json(tmp_path):
+    report_path = tmp_path / "report.json"
+    make_metrics().write_json(str(report_path))
+    report = json.loads(report_path.read_text())
+    assert report["latency_seconds"][metrics.PARSE]["count"] == 100
+
+
+def test_write_prometheus(tmp_path):
+    report_path = tmp_path / "report.prom"
+    make_metrics().write_prometheus(str(report_path))
+    lines = report_path.read_text().splitlines()
+    assert 'files_copier_files_total{status="copied"} 100' in lines
+    assert "files_copier_bytes_total 1000" in lines
+    assert (
+        'files_copier_latency_seconds{phase="copy",quantile="0.99"} 0.99'
+    ) in lines
@@ -0,0 +1,98 @@
+"""Module with tests for testing the module 'plan_cache'."""
+
+import os
+
+from files_copier.copier import FilesCopier
+from files_copier.plan_cache import PlanCache, get_config_key
+
+
+def create_config(tmp_path) -> str:
+    """Create the configuration file."""
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text("<files></files>")
+    return str(config_file_path)
+
+
+def test_saved_plan_is_loaded(tmp_path):
+    config_file_path = create_config(tmp_path)
+    cache = PlanCache()
+    entries = [("file", "file.txt", "/source", "/destination")]
+    cache.save(config_file_path, get_config_key(config_file_path), entries)
+    assert os.path.exists(tmp_path / ".config.xml.plan")
+    assert cache.load(config_file_path) == entries
+
+
+def test_plan_of_changed_config_isnt_loaded(tmp_path):
+    config_file_path = create_config(tmp_path)
+    cache = PlanCache(str(tmp_path / "cache"))
+    cache.save(config_file_path, get_config_key(config_file_path), [])
+    with open(config_file_path, "a") as config_file:
+        config_file.write("\n")
+    assert cache.load(config_file_path) is None
+
+
+def test_plan_isnt_saved_if_config_is_changed(tmp_path):
+    config_file_path = create_config(tmp_path)
+    cache = PlanCache()
+    config_key = get_config_key(config_file_path)
+    with open(config_file_path, "a") as config_file:
+        config_file.write("\n")
+    cache.save(config_file_path, config_key, [])
+    assert cache.load(config_file_path) is None
+
+
+def test_copier_uses_plan(tmp_path, prepare_correct_config, monkeypatch):
+    _, paths = prepare_correct_config
+    _, _, config_file_path, log_file_path = paths
+    copier = FilesCopier(
+        config_file_path,
+        log_file_path,
+        use_plan_cache=True,
+        plan_cache_directory=str(tmp_path),
+    )
+    expected = copier.get_copied_files_from_conf()
+
+    def parse_config():
+        raise AssertionError("Config is parsed")
+
+    monkeypatch.setattr(copier, "_iter_config_entries", parse_config)
+    assert copier.get_copied_files_from_conf() == expected
+
+
+def test_incorrect_files_are_checked_again(tmp_path):
+    source_path = tmp_path / "source"
+    source_path.mkdir()
+    (source_path / "a.txt").write_text("a")
+    destination_path = tmp_path / "destination"
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text(
+        f"""<?xml version="1.0"?>
+        <files>
+            <file>
+                <name>a.txt</name>
+                <source_path>{source_path}</source_path>
+                <destination_path>{destination_path}</destination_path>
+            </file>
+            <file>
+                <name>b.txt</name>
+                <source_path>{source_path}</source_path>
+                <destination_path>{destination_path}</destination_path>
+            </file>
+        </files>""",
+    )
+    copier = FilesCopier(
+        str(config_file_path),
+        str(tmp_path / "copier.log"),
+        use_plan_cache=True,
+        plan_cache_directory=str(tmp_path / "cache"),
+    )
+    assert [task.name for task in copier.get_copied_files_from_conf()] == [
+        "a.txt",
+    ]
+    (source_path / "b.txt").write_text("b")
+    copier.validation_cache.clear()
+    assert copier.plan_cache.load(str(config_file_path)) is not None
+    assert [task.name for task in copier.get_copied_files_from_conf()] == [
+        "a.txt",
+        "b.txt",
+    ]
@@ -0,0 +1,102 @@
+"""Module with tests for testing the class 'Progress'."""
+
+import io
+import logging
+
+from files_copier.progress import Progress, format_duration, format_size
+
+
+class TerminalStream(io.StringIO):
+    """Stream that looks like the terminal."""
+
+    def isatty(self) -> bool:
+        return True
+
+
+def create_files(tmp_path, sizes: dict) -> dict:
+    """Create files of the given sizes and get their paths."""
+    paths = {}
+    for name, size in sizes.items():
+        file_path = tmp_path / name
+        file_path.write_bytes(b"x" * size)
+        paths[name] = str(file_path)
+    return paths
+
+
+def test_progress_is_weighted_by_sizes(tmp_path):
+    paths = create_files(tmp_path, {"small.txt": 100, "large.txt": 300})
+    progress = Progress(logging.getLogger(__name__), io.StringIO())
+    progress.plan(
+        [(path, "/destination") for path in paths.values()],
+        workers=2,
+    )
+    assert progress.total_bytes == 400
+    progress.start_file(paths["small.txt"], "/destination")
+    progress.start_file(paths["large.txt"], "/destination")
+    assert "workers 2/2" in progress.get_line()
+    progress.finish_file(paths["large.txt"], "/destination")
+    line = progress.get_line()
+    assert "75.0%" in line
+    assert "1/2 files" in line
+    assert "workers 1/2" in line
+
+
+def test_partially_copied_file_is_counted(tmp_path):
+    paths = create_files(tmp_path, {"large.txt": 1000})
+    progress = Progress(logging.getLogger(__name__), io.StringIO())
+    progress.plan([(paths["large.txt"], "/destination")])
+    progress.start_file(paths["large.txt"], "/destination")
+    progress.update_file(paths["large.txt"], "/destination", 250)
+    assert "25.0%" in progress.get_line()
+
+
+def test_file_copied_to_several_directories(tmp_path):
+    path_to_file = create_files(tmp_path, {"large.txt": 1000})["large.txt"]
+    destinations = [f"/destination_{number}" for number in range(4)]
+    progress = Progress(logging.getLogger(__name__), io.StringIO())
+    progress.plan(
+        [(path_to_file, destination) for destination in destinations],
+        workers=4,
+    )
+    assert progress.total_bytes == 4000
+    for destination in destinations:
+        progress.start_file(path_to_file, destination)
+    assert "workers 4/4" in progress.get_line()
+    progress.finish_file(path_to_file, destinations[0])
+    line = progress.get_line()
+    assert "25.0%" in line
+    assert "1/4 files" in line
+
+
+def test_progress_of_unknown_files():
+    progress = Progress(logging.getLogger(__name__), io.StringIO())
+    progress.plan(None)
+    progress.finish_file("file.txt", "/destination")
+    assert progress.get_line().startswith("[1 files]")
+
+
+def test_progress_is_redrawn_in_terminal(tmp_path):
+    stream = TerminalStream()
+    progress = Progress(logging.getLogger(__name__), stream, interval=0.01)
+    progress.plan([])
+    progress.start()
+    progress.stop()
+    assert "100.0%" in stream.getvalue()
+    assert stream.getvalue().endswith("\r\n")
+
+
+def test_progress_is_logged_without_terminal(caplog):
+    stream = io.StringIO()
+    progress = Progress(logging.getLogger(__name__), stream)
+    progress.plan([])
+    with caplog.at_level(logging.INFO):
+        progress.start()
+        progress.stop()
+    assert not stream.getvalue()
+    assert "Progress - " in caplog.text
+
+
+def test_format():
+    assert format_size(512) == "512.0 B"
+    assert format_size(3 * 2 ** 20) == "3.0 MB"
+    assert format_duration(3725) == "1:02:05"
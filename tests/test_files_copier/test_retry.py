@@ -0,0 +1,144 @@
+"""Module with tests for testing the module 'retry'."""
+
+import errno
+import os
+
+import pytest
+
+from files_copier import retry, transfer
+from files_copier.copier import FilesCopier
+from files_copier.retry import RetryPolicy, RetryQueue
+
+
+def test_delays_grow_up_to_maximum():
+    policy = RetryPolicy(attempts=5, backoff=1, max_backoff=5)
+    delays = [policy.get_delay(attempt) for attempt in range(4)]
+    assert delays == [1, 2, 4, 5]
+
+
+def test_only_transient_errors_are_retried():
+    policy = RetryPolicy(attempts=1)
+    assert policy.is_retryable(OSError(errno.EIO, "I/O error"), 0)
+    assert not policy.is_retryable(OSError(errno.EIO, "I/O error"), 1)
+    assert not policy.is_retryable(OSError(errno.ENOENT, "No file"), 0)
+    custom_policy = RetryPolicy(attempts=1, retryable_errnos=[errno.ENOENT])
+    assert custom_policy.is_retryable(OSError(errno.ENOENT, "No file"), 0)
+
+
+def test_incorrect_policy():
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=-1)
+    with pytest.raises(ValueError):
+        RetryPolicy(backoff=-1)
+
+
+def test_queue_waits_for_delay():
+    queue = RetryQueue(RetryPolicy(attempts=2, backoff=0))
+    error = OSError(errno.EIO, "I/O error")
+    assert queue.schedule("file", error) == 0
+    assert queue.get_attempt("file") == 1
+    assert queue.is_resumed("file")
+    assert queue.pop_ready() == "file"
+    assert not queue
+    assert queue.schedule("file", error) == 0
+    assert queue.pop_ready() == "file"
+    assert queue.schedule("file", error) is None
+    assert queue.retries == 2
+
+    delayed_queue = RetryQueue(RetryPolicy(attempts=1, backoff=60))
+    delayed_queue.schedule("file", error)
+    assert delayed_queue.pop_ready() is None
+    assert 0 < delayed_queue.get_timeout() <= 60
+
+
+def test_resume_offset_is_verified(tmp_path):
+    source_file = tmp_path / "file.bin"
+    source_file.write_bytes(b"abcdefghij")
+    partial_file = tmp_path / "partial.bin"
+    partial_file.write_bytes(b"abcdefg")
+    assert retry.get_resume_offset(source_file, partial_file, 3) == 6
+    partial_file.write_bytes(b"abcXefg")
+    assert retry.get_resume_offset(source_file, partial_file, 3) == 3
+    partial_file.write_bytes(b"abcdefghijkl")
+    assert retry.get_resume_offset(source_file, partial_file, 3) == 0
+    assert retry.get_resume_offset(source_file, tmp_path / "no.bin") == 0
+
+
+def test_partial_copy_is_resumed(tmp_path):
+    content = os.urandom(3 * retry.VERIFY_BLOCK_SIZE + 100)
+    source_file = tmp_path / "file.bin"
+    source_file.write_bytes(content)
+    destination_path = tmp_path / "destination"
+    destination_path.mkdir()
+    partial_file = destination_path / "file.bin"
+    partial_file.write_bytes(content[:2 * retry.VERIFY_BLOCK_SIZE + 10])
+    result = transfer.copy_file(
+        str(source_file),
+        str(destination_path),
+        transfer.TransferOptions(),
+        resume=True,
+    )
+    assert result.backend == retry.RESUMED
+    assert result.resumed_size == 2 * retry.VERIFY_BLOCK_SIZE
+    assert partial_file.read_bytes() == content
+    assert partial_file.stat().st_mtime_ns == source_file.stat().st_mtime_ns
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"workers": 1},
+        {"workers": 2},
+        {"workers": 2, "workers_per_device": 1},
+    ],
+)
+def test_failed_files_are_retried(
+    monkeypatch,
+    remove_files_in_destination,
+    prepare_correct_config,
+    parameters,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+    copy_file = transfer.copy_file
+    failed_files = []
+
+    def fail_once(path_to_file, *args):
+        if path_to_file not in failed_files:
+            failed_files.append(path_to_file)
+            raise OSError(errno.EIO, "I/O error", path_to_file)
+        return copy_file(path_to_file, *args)
+
+    monkeypatch.setattr(transfer, "copy_file", fail_once)
+    copier = FilesCopier(
+        config_file_path,
+        log_file_path,
+        retry_attempts=1,
+        retry_backoff=0,
+        **parameters,
+    )
+    copier.copy_files()
+    assert sorted(os.listdir(destination_path)) == [
+        "file_one.txt",
+        "file_two.txt",
+    ]
+    assert copier.statistics[transfer.COPIED] == 2
+    assert copier.retry_queue.retries == 2
+
+
+def test_files_are_failed_without_retries(
+    monkeypatch,
+    remove_files_in_destination,
+    prepare_correct_config,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, log_file_path = paths
+
+    def fail(path_to_file, *args):
+        raise OSError(errno.EIO, "I/O error", path_to_file)
+
+    monkeypatch.setattr(transfer, "copy_file", fail)
+    copier = FilesCopier(config_file_path, log_file_path, retry_attempts=0)
+    copier.copy_files()
+    assert copier.statistics[transfer.FAILED] == 2
+    assert copier.retry_queue.retries == 0
@@ -0,0 +1,46 @@
+"""Module with tests for testing the class 'DeviceScheduler'."""
+
+import pytest
+
+from files_copier.scheduler import DeviceScheduler
+
+
+def create_files(tmp_path, names: list) -> list:
+    """Create files in the temporary directory."""
+    files = []
+    for name in names:
+        file_path = tmp_path / name
+        file_path.write_text(name)
+        files.append(str(file_path))
+    return files
+
+
+def test_group_limit(tmp_path):
+    scheduler = DeviceScheduler(workers_per_device=1)
+    for path_to_file in create_files(tmp_path, ["a.txt", "b.txt"]):
+        scheduler.add(path_to_file, path_to_file, str(tmp_path))
+    group, first_task = scheduler.next_task()
+    assert scheduler.next_task() is None
+    scheduler.release(group)
+    _, second_task = scheduler.next_task()
+    assert {first_task, second_task} == {
+        str(tmp_path / "a.txt"),
+        str(tmp_path / "b.txt"),
+    }
+    assert len(scheduler) == 0
+
+
+def test_groups_are_taken_in_turn(tmp_path):
+    scheduler = DeviceScheduler(workers_per_device=2)
+    files = create_files(tmp_path, ["a.txt", "b.txt"])
+    for path_to_file in files:
+        scheduler.add(path_to_file, path_to_file, str(tmp_path))
+    scheduler.add("missing", str(tmp_path / "missing.txt"), str(tmp_path))
+    first_group, _ = scheduler.next_task()
+    second_group, _ = scheduler.next_task()
+    assert first_group != second_group
+
+
+def test_incorrect_workers_per_device():
+    with pytest.raises(ValueError):
+        DeviceScheduler(workers_per_device=0)
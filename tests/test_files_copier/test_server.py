@@ -0,0 +1,291 @@
+"""Module with tests for testing the copier server and its client."""
+
+import errno
+import os
+
+import pytest
+
+from files_copier import checksums, transfer
+from files_copier.server import CopierClient, CopierServer, JobFilesCopier
+
+
+@pytest.fixture()
+def server(tmp_path):
+    """Start the server and stop it after the test."""
+    copier_server = CopierServer(
+        str(tmp_path / "copier.sock"),
+        str(tmp_path / "copier.log"),
+        workers=2,
+    )
+    copier_server.start()
+    yield copier_server
+    copier_server.shutdown()
+
+
+def create_entries(tmp_path, name: str, count: int) -> list:
+    """Create source files and get their entries."""
+    source_path = tmp_path / name / "source"
+    source_path.mkdir(parents=True)
+    entries = []
+    for number in range(count):
+        (source_path / f"file_{number}.txt").write_text(str(number))
+        entries.append(
+            {
+                "name": f"file_{number}.txt",
+                "source_path": str(source_path),
+                "destination_path": str(tmp_path / name / "destination"),
+            },
+        )
+    return entries
+
+
+def test_inline_job(tmp_path, server):
+    entries = create_entries(tmp_path, "job", 3)
+    client = CopierClient(server.socket_path)
+    try:
+        events = list(client.submit(entries=entries))
+    finally:
+        client.close()
+    assert events[0]["event"] == "accepted"
+    file_events = [event for event in events if event["event"] == "file"]
+    assert len(file_events) == 3
+    assert {event["status"] for event in file_events} == {transfer.COPIED}
+    assert events[-1]["event"] == "finished"
+    assert events[-1]["statistics"] == {transfer.COPIED: 3}
+    destination_path = tmp_path / "job" / "destination"
+    assert len(os.listdir(destination_path)) == 3
+
+
+def test_config_job(
+    server,
+    prepare_correct_config,
+    remove_files_in_destination,
+):
+    _, paths = prepare_correct_config
+    _, destination_path, config_file_path, _ = paths
+    client = CopierClient(server.socket_path)
+    try:
+        events = list(client.submit(config_file_path))
+        assert client.status() == {"event": "status", "jobs": []}
+    finally:
+        client.close()
+    assert events[-1]["statistics"] == {transfer.COPIED: 2}
+    files_in_destination = sorted(os.listdir(destination_path))
+    assert files_in_destination == ["file_one.txt", "file_two.txt"]
+
+
+def test_jobs_are_copied_in_turn(tmp_path, server):
+    large_job = server.submit(entries=create_entries(tmp_path, "large", 50))
+    small_job = server.submit(entries=create_entries(tmp_path, "small", 2))
+    finished = []
+    for job in (small_job, large_job):
+        while True:
+            event = job.events.get(timeout=10)
+            if event["event"] == "finished":
+                finished.append(event["job"])
+                break
+    assert finished == [small_job.job_id, large_job.job_id]
+    assert small_job.copier.statistics[transfer.COPIED] == 2
+    assert large_job.copier.statistics[transfer.COPIED] == 50
+
+
+def test_missing_config_and_bad_request(tmp_path, server):
+    client = CopierClient(server.socket_path)
+    try:
+        events = list(client.submit(str(tmp_path / "missing.xml")))
+        assert events[-1] == {"event": "finished", "job": 1, "statistics": {}}
+        client._file.write(b"not json\n")
+        client._file.flush()
+        assert client._receive()["event"] == "error"
+    finally:
+        client.close()
+
+
+def test_validation_cache_is_shared(tmp_path, server):
+    server.submit(entries=create_entries(tmp_path, "first", 1))
+    job = server.submit(entries=create_entries(tmp_path, "second", 1))
+    assert job.copier.validation_cache is server.validation_cache
+
+
+def test_failed_files_are_retried(tmp_path, monkeypatch):
+    copy_file = transfer.copy_file
+    failed_files = []
+
+    def fail_once(path_to_file, *args, **kwargs):
+        if path_to_file not in failed_files:
+            failed_files.append(path_to_file)
+            raise OSError(errno.EIO, "I/O error", path_to_file)
+        return copy_file(path_to_file, *args, **kwargs)
+
+    monkeypatch.setattr(transfer, "copy_file", fail_once)
+    copier_server = CopierServer(
+        str(tmp_path / "copier.sock"),
+        str(tmp_path / "copier.log"),
+        workers=2,
+        retry_attempts=1,
+        retry_backoff=0,
+    )
+    copier_server.start()
+    try:
+        job = copier_server.submit(entries=create_entries(tmp_path, "job", 3))
+        events = []
+        while not events or events[-1]["event"] != "finished":
+            events.append(job.events.get(timeout=10))
+    finally:
+        copier_server.shutdown()
+    assert events[-1]["statistics"] == {transfer.COPIED: 3}
+    assert len(failed_files) == 3
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [["oops"], [{"name": 1}], {"name": "file.txt"}],
+)
+def test_incorrect_entries(tmp_path, server, entries):
+    client = CopierClient(server.socket_path)
+    try:
+        events = list(client.submit(entries=entries))
+        assert [event["event"] for event in events] == ["error"]
+        entries = create_entries(tmp_path, "job", 1)
+        events = list(client.submit(entries=entries))
+    finally:
+        client.close()
+    assert events[-1]["statistics"] == {transfer.COPIED: 1}
+
+
+def test_broken_job_doesnt_stop_server(tmp_path, monkeypatch, server):
+    check_task = JobFilesCopier._check_task
+
+    def fail_on_broken_file(copier, task):
+        if task.name == "file_0.txt":
+            raise RuntimeError("broken entry")
+        return check_task(copier, task)
+
+    monkeypatch.setattr(JobFilesCopier, "_check_task", fail_on_broken_file)
+    client = CopierClient(server.socket_path)
+    try:
+        events = list(client.submit(entries=create_entries(tmp_path, "a", 1)))
+        assert events[-1]["event"] == "error"
+        assert "broken entry" in events[-1]["message"]
+        entries = create_entries(tmp_path, "b", 2)[1:]
+        events = list(client.submit(entries=entries))
+    finally:
+        client.close()
+    assert events[-1]["statistics"] == {transfer.COPIED: 1}
+
+
+def test_checksums_are_written_to_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.sha256"
+    copier_server = CopierServer(
+        str(tmp_path / "copier.sock"),
+        str(tmp_path / "copier.log"),
+        checksum=checksums.SHA256,
+        checksum_manifest_path=str(manifest_path),
+    )
+    copier_server.start()
+    try:
+        client = CopierClient(copier_server.socket_path)
+        try:
+            for name in ("first", "second"):
+                entries = create_entries(tmp_path, name, 2)
+                events = list(client.submit(entries=entries))
+                assert events[-1]["statistics"] == {transfer.COPIED: 2}
+        finally:
+            client.close()
+    finally:
+        copier_server.shutdown()
+    lines = manifest_path.read_text().splitlines()
+    assert sorted(line.split("  ")[1] for line in lines) == [
+        str(tmp_path / name / "destination" / f"file_{number}.txt")
+        for name in ("first", "second")
+        for number in range(2)
+    ]
+
+
+def test_failed_worker_doesnt_stop_server(tmp_path, monkeypatch, server):
+    copy_file = transfer.copy_file
+
+    def fail_in_broken_job(path_to_file, *args, **kwargs):
+        if os.sep + "broken" + os.sep in path_to_file:
+            raise RuntimeError("worker is broken")
+        return copy_file(path_to_file, *args, **kwargs)
+
+    monkeypatch.setattr(transfer, "copy_file", fail_in_broken_job)
+    client = CopierClient(server.socket_path)
+    try:
+        entries = create_entries(tmp_path, "broken", 2)
+        events = list(client.submit(entries=entries))
+        assert events[-1]["event"] == "error"
+        assert "worker is broken" in events[-1]["message"]
+        events = list(client.submit(entries=create_entries(tmp_path, "b", 2)))
+    finally:
+        client.close()
+    assert events[-1]["statistics"] == {transfer.COPIED: 2}
+
+
+def test_only_socket_is_removed(tmp_path):
+    socket_path = tmp_path / "copier.sock"
+    socket_path.write_text("not a socket")
+    copier_server = CopierServer(str(socket_path), str(tmp_path / "log"))
+    with pytest.raises(FileExistsError):
+        copier_server.start()
+    assert socket_path.read_text() == "not a socket"
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"journal_file_path": "journal.db"},
+        {"workers_per_device": 1},
+        {"deduplicate": True},
+        {"deduplicate_content": True},
+        {"allow_hardlinks": True},
+    ],
+)
+def test_unsupported_options(tmp_path, options):
+    with pytest.raises(ValueError):
+        CopierServer(
+            str(tmp_path / "copier.sock"),
+            str(tmp_path / "copier.log"),
+            **options,
+        )
+
+
+def test_chunks_are_reported(tmp_path, monkeypatch):
+    get_chunks_progress = JobFilesCopier._get_chunks_progress
+    reported_chunks = []
+
+    def record_chunks(copier, path_to_file, destination_path):
+        report_chunk = get_chunks_progress(
+            copier,
+            path_to_file,
+            destination_path,
+        )
+
+        def record_chunk(copied_chunks, total_chunks, copied_bytes):
+            reported_chunks.append((copied_chunks, total_chunks))
+            report_chunk(copied_chunks, total_chunks, copied_bytes)
+
+        return record_chunk
+
+    monkeypatch.setattr(JobFilesCopier, "_get_chunks_progress", record_chunks)
+    copier_server = CopierServer(
+        str(tmp_path / "copier.sock"),
+        str(tmp_path / "copier.log"),
+        large_file_threshold=1024,
+        chunk_size=1024,
+    )
+    copier_server.start()
+    try:
+        entries = create_entries(tmp_path, "job", 1)
+        source_file = os.path.join(entries[0]["source_path"], "file_0.txt")
+        with open(source_file, "wb") as large_file:
+            large_file.write(os.urandom(4096))
+        job = copier_server.submit(entries=entries)
+        events = []
+        while not events or events[-1]["event"] != "finished":
+            events.append(job.events.get(timeout=10))
+    finally:
+        copier_server.shutdown()
+    assert events[-1]["statistics"] == {transfer.COPIED: 1}
+    assert sorted(reported_chunks)[-1] == (4, 4)
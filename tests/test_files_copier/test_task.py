@@ -0,0 +1,46 @@
+"""Module with tests for testing the class 'CopyTask'."""
+
+import os
+import pickle
+
+import pytest
+
+from files_copier.task import CopyTask
+
+
+def test_task_has_precomputed_paths():
+    task = CopyTask("file.txt", "/source/dir", "/destination/dir")
+    assert task.source_file == os.path.join("/source/dir", "file.txt")
+    assert task.destination_file == os.path.join(
+        "/destination/dir",
+        "file.txt",
+    )
+    assert task.get_parameters() == {
+        "name": "file.txt",
+        "source_path": "/source/dir",
+        "destination_path": "/destination/dir",
+    }
+
+
+def test_task_has_no_attribute_dictionary():
+    task = CopyTask("file.txt", "/source/dir", "/destination/dir")
+    assert not hasattr(task, "__dict__")
+    assert "destination_file" in CopyTask.__slots__
+    with pytest.raises(AttributeError):
+        task.size = 1
+
+
+def test_tasks_share_directories():
+    source_path = "".join(["/source/", "dir"])
+    first = CopyTask("one.txt", source_path, "/destination/dir")
+    second = CopyTask("two.txt", "".join(["/source/", "dir"]), "/dst")
+    assert first.source_path is second.source_path
+
+
+def test_task_is_compared_and_pickled():
+    task = CopyTask("file.txt", "/source/dir", "/destination/dir")
+    restored = pickle.loads(pickle.dumps(task))
+    assert restored == task
+    assert hash(restored) == hash(task)
+    assert restored.source_file == task.source_file
+    assert task != CopyTask("other.txt", "/source/dir", "/destination/dir")
@@ -0,0 +1,116 @@
+"""Module with tests for testing the module 'throttle'."""
+
+import threading
+import time
+
+import pytest
+
+from files_copier import backends, transfer
+from files_copier import throttle as throttle_module
+from files_copier.throttle import Throttle, TokenBucket, drop_page_cache
+
+
+def test_unlimited_bucket_does_not_wait():
+    bucket = TokenBucket()
+    started_at = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire(10 ** 9)
+    assert time.monotonic() - started_at < 0.5
+
+
+def test_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+    started_at = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - started_at >= 0.09
+
+
+def test_bucket_is_shared_by_threads():
+    bucket = TokenBucket(rate=100, capacity=1)
+    bucket.acquire()
+    started_at = time.monotonic()
+    threads = [
+        threading.Thread(target=bucket.acquire) for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started_at >= 0.09
+
+
+def test_rate_is_changed():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+    bucket.set_rate(None)
+    started_at = time.monotonic()
+    bucket.acquire(100)
+    assert time.monotonic() - started_at < 0.5
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_incorrect_rate(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate)
+
+
+def test_throttle_limits_files(tmp_path):
+    throttle = Throttle(files_per_second=100)
+    assert throttle.is_limited
+    assert throttle.get_byte_limit() is None
+    started_at = time.monotonic()
+    for _ in range(110):
+        throttle.acquire_file(str(tmp_path / "file.txt"))
+    assert time.monotonic() - started_at >= 0.09
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [backends.COPY_FILE_RANGE, backends.SENDFILE, backends.BUFFERED],
+)
+def test_bytes_are_limited_by_blocks(tmp_path, backend):
+    source_file = tmp_path / "file.bin"
+    source_file.write_bytes(b"x" * (3 * backends.BUFFER_SIZE))
+    destination_path = tmp_path / "destination"
+    destination_path.mkdir()
+    throttle = Throttle(bytes_per_second=2 * backends.BUFFER_SIZE)
+    limit = throttle.get_byte_limit()
+    charged = []
+
+    def record(amount):
+        charged.append(amount)
+        limit(amount)
+
+    started_at = time.monotonic()
+    throttle.acquire_file(str(source_file))
+    assert time.monotonic() - started_at < 0.1
+    transfer.copy_file(
+        str(source_file),
+        str(destination_path),
+        transfer.TransferOptions(backends=(backend, backends.BUFFERED)),
+        limit=record,
+    )
+    assert time.monotonic() - started_at >= 0.45
+    assert sum(charged) == 3 * backends.BUFFER_SIZE
+
+
+def test_worker_limit(monkeypatch):
+    monkeypatch.setattr(throttle_module, "_worker_bytes", None)
+    assert throttle_module.get_worker_limit() is None
+    throttle_module.init_worker(bytes_per_second=1000)
+    assert throttle_module.get_worker_limit() is not None
+
+
+def test_throttle_without_limits(tmp_path):
+    throttle = Throttle()
+    assert not throttle.is_limited
+    throttle.acquire_file(str(tmp_path / "missing.txt"))
+
+
+def test_drop_page_cache(tmp_path):
+    cached_file = tmp_path / "file.txt"
+    cached_file.write_bytes(b"content")
+    drop_page_cache(str(cached_file))
+    drop_page_cache(str(tmp_path / "missing.txt"))
+    assert cached_file.read_bytes() == b"content"
@@ -0,0 +1,129 @@
+"""Module with tests for testing the module 'transfer'."""
+
+import os
+
+import pytest
+
+from files_copier import transfer
+
+
+def create_source_file(tmp_path, text: str = "text") -> str:
+    """Create the copied file and the destination directory."""
+    (tmp_path / "source").mkdir()
+    (tmp_path / "destination").mkdir()
+    path_to_file = tmp_path / "source" / "file.txt"
+    path_to_file.write_text(text)
+    return str(path_to_file)
+
+
+def test_copy_file(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    destination_path = str(tmp_path / "destination")
+    options = transfer.TransferOptions()
+    result = transfer.copy_file(path_to_file, destination_path, options)
+    assert result.status == transfer.COPIED
+    with open(result.destination_file) as copied_file:
+        assert copied_file.read() == "text"
+
+
+def test_incremental_copy_skips_same_file(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    destination_path = str(tmp_path / "destination")
+    options = transfer.TransferOptions(incremental=True, compare_content=True)
+    first = transfer.copy_file(path_to_file, destination_path, options)
+    second = transfer.copy_file(path_to_file, destination_path, options)
+    assert (first.status, second.status) == (transfer.COPIED, transfer.SKIPPED)
+
+
+def test_incremental_copy_copies_changed_file(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    destination_path = str(tmp_path / "destination")
+    options = transfer.TransferOptions(incremental=True)
+    transfer.copy_file(path_to_file, destination_path, options)
+    with open(path_to_file, "w") as changed_file:
+        changed_file.write("changed text")
+    result = transfer.copy_file(path_to_file, destination_path, options)
+    assert result.status == transfer.COPIED
+
+
+def test_content_is_compared(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    destination_file = str(tmp_path / "destination" / "file.txt")
+    with open(destination_file, "w") as changed_file:
+        changed_file.write("TEXT")
+    source_stat = os.stat(path_to_file)
+    os.utime(
+        destination_file,
+        ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns),
+    )
+    assert transfer.is_up_to_date(path_to_file, destination_file) is True
+    assert transfer.is_up_to_date(
+        path_to_file,
+        destination_file,
+        compare_content=True,
+    ) is False
+
+
+def test_joined_destination_file_is_used(tmp_path, monkeypatch):
+    path_to_file = create_source_file(tmp_path)
+    destination_path = str(tmp_path / "destination")
+    destination_file = os.path.join(destination_path, "file.txt")
+
+    def join_paths(*args):
+        raise AssertionError("Destination file is joined again")
+
+    monkeypatch.setattr(transfer, "get_destination_file", join_paths)
+    result = transfer.copy_file(
+        path_to_file,
+        destination_path,
+        transfer.TransferOptions(),
+        destination_file=destination_file,
+    )
+    assert result.destination_file == destination_file
+    with open(destination_file) as copied_file:
+        assert copied_file.read() == "text"
+
+
+def test_modify_window(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    destination_path = str(tmp_path / "destination")
+    options = transfer.TransferOptions(incremental=True, modify_window=2)
+    transfer.copy_file(path_to_file, destination_path, options)
+    destination_file = os.path.join(destination_path, "file.txt")
+    source_stat = os.stat(path_to_file)
+    os.utime(
+        destination_file,
+        ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10 ** 9),
+    )
+    assert transfer.is_up_to_date(path_to_file, destination_file) is False
+    assert transfer.is_up_to_date(
+        path_to_file,
+        destination_file,
+        modify_window=1,
+    ) is True
+    result = transfer.copy_file(path_to_file, destination_path, options)
+    assert result.status == transfer.SKIPPED
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(modify_window=-1)
+
+
+def test_sparse_copy_reports_physical_size(tmp_path):
+    path_to_file = create_source_file(tmp_path)
+    with open(path_to_file, "r+b") as sparse_file:
+        sparse_file.truncate(8 * 1024 * 1024)
+    destination_path = str(tmp_path / "destination")
+    options = transfer.TransferOptions(
+        sparse=True,
+        large_file_threshold=1024,
+    )
+    result = transfer.copy_file(path_to_file, destination_path, options)
+    assert result.size == 8 * 1024 * 1024
+    if result.backend == "sparse":
+        assert result.physical_size < result.size
+    with open(result.destination_file, "rb") as copied_file:
+        assert copied_file.read(4) == b"text"
+
+
+def test_sparse_copy_with_checksum():
+    with pytest.raises(ValueError):
+        transfer.TransferOptions(sparse=True, checksum="sha256")
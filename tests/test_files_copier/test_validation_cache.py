@@ -0,0 +1,47 @@
+"""Module with tests for testing the class 'ValidationCache'."""
+
+from files_copier.validation_cache import ValidationCache
+
+
+def make_counted_check(result: bool) -> tuple:
+    """Make a directory check that counts its calls."""
+    calls = []
+
+    def check_directory(directory_path: str) -> bool:
+        calls.append(directory_path)
+        return result
+
+    return check_directory, calls
+
+
+def test_directory_is_checked_once():
+    cache = ValidationCache()
+    check_directory, calls = make_counted_check(True)
+    for _ in range(3):
+        assert cache.check("source", "/tmp", check_directory) is True
+    assert calls == ["/tmp"]
+
+
+def test_kinds_of_checks_are_cached_separately():
+    cache = ValidationCache()
+    check_directory, calls = make_counted_check(False)
+    assert cache.check("source", "/tmp", check_directory) is False
+    assert cache.check("destination", "/tmp", check_directory) is False
+    assert len(calls) == 2
+
+
+def test_expired_result_is_checked_again():
+    cache = ValidationCache(lifetime=0)
+    check_directory, calls = make_counted_check(True)
+    cache.check("source", "/tmp", check_directory)
+    cache.check("source", "/tmp", check_directory)
+    assert len(calls) == 2
+
+
+def test_clear():
+    cache = ValidationCache()
+    check_directory, calls = make_counted_check(True)
+    cache.check("source", "/tmp", check_directory)
+    cache.clear()
+    cache.check("source", "/tmp", check_directory)
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+"""Module with tests for testing the module 'walker'."""
+
+import os
+
+import pytest
+
+from files_copier import walker
+
+
+def create_tree(tmp_path) -> str:
+    """Create the directory tree for walking."""
+    for relative_path in (
+        "a.txt",
+        "b.log",
+        os.path.join("sub", "c.txt"),
+        os.path.join("sub", "deep", "d.txt"),
+        os.path.join("tmp", "e.txt"),
+    ):
+        file_path = tmp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(relative_path)
+    return str(tmp_path)
+
+
+def test_recursive_walk(tmp_path):
+    files = sorted(walker.walk(create_tree(tmp_path), workers=3))
+    assert files == [
+        ("", "a.txt"),
+        ("", "b.log"),
+        ("sub", "c.txt"),
+        (os.path.join("sub", "deep"), "d.txt"),
+        ("tmp", "e.txt"),
+    ]
+
+
+def test_not_recursive_walk(tmp_path):
+    files = sorted(walker.walk(create_tree(tmp_path), recursive=False))
+    assert files == [("", "a.txt"), ("", "b.log")]
+
+
+def test_include_and_exclude(tmp_path):
+    files = walker.walk(
+        create_tree(tmp_path),
+        include=["*.txt"],
+        exclude=["tmp", "deep"],
+    )
+    assert sorted(files) == [("", "a.txt"), ("sub", "c.txt")]
+
+
+def test_stopped_walk(tmp_path):
+    files = walker.walk(create_tree(tmp_path))
+    next(files)
+    files.close()
+
+
+def test_nonexistent_directory(tmp_path):
+    with pytest.raises(OSError):
+        list(walker.walk(str(tmp_path / "nonexistent")))
@@ -0,0 +1,147 @@
+"""Module with tests for testing the watch mode of copying."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from files_copier.watch_copier import WatchFilesCopier
+from files_copier.watcher import InotifyWatcher, PollingWatcher
+
+WATCHERS = [
+    pytest.param(lambda: PollingWatcher(interval=0.05), id="polling"),
+    pytest.param(InotifyWatcher, id="inotify"),
+]
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    """Wait until the condition is true."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def read_changes(watcher, timeout: float = 2) -> set:
+    """Read the changes until something is changed."""
+    changed = set()
+    deadline = time.monotonic() + timeout
+    while not changed and time.monotonic() < deadline:
+        changed = watcher.read(0.1)
+    return changed
+
+
+@pytest.mark.parametrize("create_watcher", WATCHERS)
+def test_changed_file_is_found(tmp_path, create_watcher):
+    (tmp_path / "file.txt").write_text("one")
+    watcher = create_watcher()
+    try:
+        watcher.add(str(tmp_path))
+        assert watcher.read(0.1) == set()
+        time.sleep(0.01)
+        (tmp_path / "file.txt").write_text("two, three")
+        assert read_changes(watcher) == {str(tmp_path / "file.txt")}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("create_watcher", WATCHERS)
+def test_file_in_new_subdirectory_is_found(tmp_path, create_watcher):
+    watcher = create_watcher()
+    try:
+        watcher.add(str(tmp_path), recursive=True)
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "file.txt").write_text("one")
+        expected = str(tmp_path / "nested" / "file.txt")
+        assert wait_for(lambda: expected in read_changes(watcher, 0.5))
+    finally:
+        watcher.close()
+
+
+def write_config(tmp_path, source_path, destination_path) -> str:
+    """Write the configuration with one file and one directory."""
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text(
+        f"""<?xml version="1.0"?>
+        <files>
+            <file>
+                <name>file.txt</name>
+                <source_path>{source_path}</source_path>
+                <destination_path>{destination_path}</destination_path>
+            </file>
+            <directory>
+                <source_path>{source_path}/tree</source_path>
+                <destination_path>{destination_path}/tree</destination_path>
+            </directory>
+        </files>""",
+    )
+    return str(config_file_path)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_copies_changed_files(tmp_path, use_inotify):
+    source_path = tmp_path / "source"
+    destination_path = tmp_path / "destination"
+    (source_path / "tree").mkdir(parents=True)
+    (source_path / "file.txt").write_text("one")
+    config_file_path = write_config(tmp_path, source_path, destination_path)
+    copier = WatchFilesCopier(
+        config_file_path,
+        str(tmp_path / "copier.log"),
+        workers=2,
+        incremental=True,
+    )
+    stop = threading.Event()
+    watching = threading.Thread(
+        target=copier.watch,
+        kwargs={
+            "stop": stop,
+            "debounce": 0.05,
+            "poll_interval": 0.05,
+            "use_inotify": use_inotify,
+        },
+    )
+    watching.start()
+    try:
+        copied_file = destination_path / "file.txt"
+        assert wait_for(copied_file.exists)
+        (source_path / "file.txt").write_text("one, two")
+        assert wait_for(lambda: copied_file.read_text() == "one, two")
+        (source_path / "tree" / "new.txt").write_text("new")
+        new_file = destination_path / "tree" / "new.txt"
+        assert wait_for(new_file.exists)
+        expected = ["file.txt", "tree"]
+        assert sorted(os.listdir(destination_path)) == expected
+    finally:
+        stop.set()
+        watching.join()
+
+
+def test_watch_loads_changed_config(tmp_path):
+    source_path = tmp_path / "source"
+    destination_path = tmp_path / "destination"
+    (source_path / "tree").mkdir(parents=True)
+    (source_path / "file.txt").write_text("one")
+    config_file_path = tmp_path / "config.xml"
+    config_file_path.write_text("<files></files>")
+    copier = WatchFilesCopier(
+        str(config_file_path),
+        str(tmp_path / "copier.log"),
+        workers=2,
+    )
+    stop = threading.Event()
+    watching = threading.Thread(
+        target=copier.watch,
+        kwargs={"stop": stop, "debounce": 0.05},
+    )
+    watching.start()
+    try:
+        time.sleep(0.2)
+        write_config(tmp_path, source_path, destination_path)
+        assert wait_for((destination_path / "file.txt").exists)
+    finally:
+        stop.set()
+        watching.join()